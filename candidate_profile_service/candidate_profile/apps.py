@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CandidateProfileConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'candidate_profile'
+
+    def ready(self):
+        from . import signals  # noqa: F401
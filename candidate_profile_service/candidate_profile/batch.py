@@ -0,0 +1,244 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from .jobs import cv_storage, enqueue_cv_parse, finish_job, keep_alive, start_job
+from .logger import logger
+from .models import Candidate, CVParseJob
+from .nlp import get_nlp, warm_up
+from .parse_cache import content_key, parse_cache
+from .parser import ResumeParser, ResumeParserError
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class BatchUploadError(Exception):
+    """Raised when a batch upload cannot be read."""
+    pass
+
+
+def _init_worker():
+    # Each pool process opens its own DB connection and loads the spaCy model exactly once. The
+    # inherited connections belong to the parent: drop them without closing the parent's sessions
+    for conn in connections.all():
+        conn.connection = None
+    warm_up()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            processes = settings.CV_BATCH_PROCESSES or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+            )
+            # The processes are forked on the first submit; they must not inherit an open connection
+            connections.close_all()
+            logger.info(f"Started CV batch pool with {processes} processes")
+        return _pool
+
+
+def _parse_chunk(items: List[Dict], job_role: str, job_description: str, key_skills: List[str], tenant_id=None,
+                 job_listing_id=None) -> List[Dict]:
+    """Runs inside a pool process: extract every PDF, run NER over the chunk with nlp.pipe, then parse."""
+    parsers = [
+        ResumeParser(item["candidate_id"], job_role, job_description, key_skills, tenant_id=tenant_id, job_listing_id=job_listing_id)
+        for item in items
+    ]
+    texts = []
+    for parser, item in zip(parsers, items):
+        if parse_cache.get(content_key(item["content"])):
+            # Already parsed once; parse() will serve text, entities and sections from the cache
+            texts.append(None)
+            continue
+        try:
+            texts.append(parser.extract_text_from_pdf(item["content"]))
+        except ResumeParserError as e:
+            texts.append(e)
+
+    valid = [i for i, text in enumerate(texts) if isinstance(text, str)]
+    doc_scope = settings.NER_SCOPE
+    if doc_scope == "header":
+        ner_inputs = []
+        for i in valid:
+            lines = texts[i].split('\n')
+            ner_inputs.append(parsers[i].header_text(lines, parsers[i].find_section_bounds(lines)))
+    else:
+        ner_inputs = [texts[i] for i in valid]
+    docs = dict(zip(valid, get_nlp().pipe(ner_inputs, batch_size=settings.CV_BATCH_PIPE_SIZE)))
+
+    results = []
+    for i, (parser, item) in enumerate(zip(parsers, items)):
+        result = {"filename": item["filename"], "candidate_id": item["candidate_id"]}
+        if isinstance(texts[i], ResumeParserError):
+            result.update({"status": "error", "error": str(texts[i]), "retryable": texts[i].retryable})
+        else:
+            parsed_data = parser.parse(item["content"], text=texts[i], doc=docs.get(i), doc_scope=doc_scope)
+            if parsed_data["metadata"]["status"] == "error":
+                result.update({"status": "error", "error": parsed_data["error"], "retryable": parsed_data["metadata"]["retryable"]})
+            else:
+                result.update({"status": "success", "parsed_data": parsed_data})
+        results.append(result)
+    return results
+
+
+def _normalize_uuid(value) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+def candidate_id_from_filename(filename: str) -> str:
+    """Archive entries are named '<candidate_id>.pdf' or '<candidate_id>_<anything>.pdf'."""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return stem.split("_", 1)[0]
+
+
+def read_archive(archive) -> List[Dict]:
+    """The PDFs of a zip archive, refused before anything is decompressed if they are too many or too large."""
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            entries = [info for info in zf.infolist() if not info.is_dir() and info.filename.lower().endswith(".pdf")]
+            check_batch_size([(info.filename, info.file_size) for info in entries])
+            return [
+                {
+                    "filename": os.path.basename(info.filename),
+                    "candidate_id": candidate_id_from_filename(info.filename),
+                    "content": zf.read(info),
+                }
+                for info in entries
+            ]
+    except zipfile.BadZipFile as e:
+        raise BatchUploadError(f"Invalid zip archive: {str(e)}")
+
+
+def check_batch_size(files: List[Tuple[str, int]]):
+    """Refuse a batch of (filename, uncompressed size) over the file count or byte limits."""
+    if len(files) > settings.CV_BATCH_MAX_FILES:
+        raise BatchUploadError(f"Batch contains more than {settings.CV_BATCH_MAX_FILES} PDFs")
+    for filename, size in files:
+        if size > settings.CV_BATCH_MAX_FILE_BYTES:
+            raise BatchUploadError(f"{os.path.basename(filename)} is larger than {settings.CV_BATCH_MAX_FILE_BYTES} bytes")
+    if sum(size for _, size in files) > settings.CV_BATCH_MAX_TOTAL_BYTES:
+        raise BatchUploadError(f"Batch is larger than {settings.CV_BATCH_MAX_TOTAL_BYTES} bytes")
+
+
+def _reset_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next batch starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+    logger.warning("CV batch pool broken, it will be restarted")
+
+
+def parse_jobs(jobs: List[CVParseJob], items: List[Dict], job_role: str, job_description: str, key_skills: List[str],
+               tenant_id=None, job_listing_id=None):
+    """Run queued jobs now, chunk by chunk across the process pool, and record each outcome on its job."""
+    for job in jobs:
+        start_job(job)
+
+    chunk_size = settings.CV_BATCH_CHUNK_SIZE
+    chunks = [list(range(i, min(i + chunk_size, len(jobs)))) for i in range(0, len(jobs), chunk_size)]
+    pool = get_pool()
+    futures = [
+        (chunk, pool.submit(_parse_chunk, [items[i] for i in chunk], job_role, job_description, key_skills, tenant_id, job_listing_id))
+        for chunk in chunks
+    ]
+    broken = False
+    with keep_alive([job.id for job in jobs]):
+        for chunk, future in futures:
+            try:
+                outcomes = future.result()
+            except BrokenProcessPool as e:
+                logger.error(f"CV batch chunk failed: {e}", exc_info=True)
+                broken = True
+                outcomes = [{"status": "error", "error": "Internal server error"}] * len(chunk)
+            except Exception as e:
+                logger.error(f"CV batch chunk failed: {e}", exc_info=True)
+                outcomes = [{"status": "error", "error": "Internal server error"}] * len(chunk)
+            for index, outcome in zip(chunk, outcomes):
+                if outcome["status"] == "success":
+                    finish_job(jobs[index], outcome["parsed_data"], None)
+                else:
+                    finish_job(jobs[index], None, outcome["error"], outcome.get("retryable", True))
+    if broken:
+        _reset_pool(pool)
+
+
+def submit_batch(items: List[Dict], tenant_id, job_role: str, job_description: str, key_skills: List[str],
+                 job_listing_id=None) -> Dict:
+    """Store each {filename, candidate_id, content} item and queue a CV parse job for it.
+
+    Only candidates of `tenant_id` are accepted. With CV_PARSE_ASYNC the jobs are left to the
+    CV workers, which parse them one at a time; otherwise they are parsed now in chunks across
+    the process pool with nlp.pipe, which is the bulk path.
+    """
+    start = time.perf_counter()
+    for item in items:
+        item["candidate_id"] = _normalize_uuid(item["candidate_id"]) or str(item["candidate_id"])
+    candidates = {
+        str(candidate.id): candidate
+        for candidate in Candidate.objects.filter(
+            tenant_id=tenant_id, id__in=[item["candidate_id"] for item in items if _normalize_uuid(item["candidate_id"])]
+        )
+    }
+
+    results: List[Dict] = []
+    jobs, queued_items = [], []
+    storage = cv_storage()
+    for item in items:
+        result = {"filename": item["filename"], "candidate_id": item["candidate_id"]}
+        candidate = candidates.get(item["candidate_id"])
+        if candidate is None:
+            result.update({"status": "failed", "error": "Candidate does not exist"})
+        else:
+            filename = storage.save(f"{item['candidate_id']}_{item['filename']}", ContentFile(item["content"]))
+            job = enqueue_cv_parse(candidate, filename, job_role, job_description, key_skills,
+                                   max_attempts=None if settings.CV_PARSE_ASYNC else 1, job_listing_id=job_listing_id)
+            jobs.append(job)
+            queued_items.append(item)
+            result.update({"status": job.status, "job_id": str(job.id),
+                           "status_url": f"/candidates/{candidate.id}/cv-jobs/{job.id}/"})
+        results.append(result)
+
+    if jobs and not settings.CV_PARSE_ASYNC:
+        parse_jobs(jobs, queued_items, job_role, job_description, key_skills, tenant_id, job_listing_id)
+        by_id = {str(job.id): job for job in jobs}
+        for result in results:
+            job = by_id.get(result.get("job_id"))
+            if job is None:
+                continue
+            result["status"] = job.status
+            if job.status == 'succeeded':
+                result["parsed_data"] = job.parsed_data
+            else:
+                result["error"] = job.error
+
+    elapsed = time.perf_counter() - start
+    counts = Counter(result["status"] for result in results)
+    summary = {
+        "total": len(items),
+        "queued": counts["queued"],
+        "succeeded": counts["succeeded"],
+        "failed": counts["failed"],
+        "elapsed_seconds": round(elapsed, 3),
+        "cvs_per_second": round(counts["succeeded"] / elapsed, 2) if elapsed and not settings.CV_PARSE_ASYNC else None,
+    }
+    logger.info(f"Submitted CV batch of {len(items)} files in {elapsed:.2f}s: {summary}")
+    return {"summary": summary, "results": results}
@@ -0,0 +1,292 @@
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import fitz
+from django.conf import settings
+from .metrics import current_rss_bytes, peak_rss_bytes
+from .parser import ResumeParser
+from .skills import vocabulary
+
+FIRST_NAMES = ["Aarav", "Priya", "John", "Maria", "Wei", "Fatima", "Lucas", "Ananya", "Omar", "Sofia"]
+LAST_NAMES = ["Sharma", "Patel", "Smith", "Garcia", "Chen", "Khan", "Silva", "Iyer", "Haddad", "Rossi"]
+CITIES = ["Pune, India", "Bengaluru, India", "Austin, USA", "Berlin, Germany", "Toronto, Canada"]
+SKILLS = [
+    "Python", "Django", "REST APIs", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS", "React",
+    "JavaScript", "TypeScript", "Go", "Java", "Spring Boot", "Kafka", "Terraform", "CI/CD", "Machine Learning",
+]
+TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "DevOps Engineer", "Team Lead"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries"]
+DEGREES = ["Bachelor of Technology in Computer Science", "Master of Science in Data Science", "Diploma in IT"]
+UNIVERSITIES = ["IIT Bombay", "University of Toronto", "TU Munich", "Pune University"]
+VERBS = ["built", "designed", "migrated", "optimised", "maintained", "led", "automated", "shipped"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def generate_resume(rng: random.Random, jobs: int = 3, bullets: int = 4) -> Dict:
+    """Build a synthetic resume and the fields a correct parse should recover from it."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    city = rng.choice(CITIES)
+    email = f"{first.lower()}.{last.lower()}@example.com"
+    skills = rng.sample(SKILLS, 6)
+    lines = [f"{first} {last}", city, f"{email} | +91 98{rng.randint(10000000, 99999999)}", "", "Professional Summary",
+             f"Engineer with {rng.randint(2, 15)} years of experience building reliable systems.", "",
+             "Technical Skills", f"Languages: {', '.join(skills[:3])}", f"Tools: {', '.join(skills[3:])}", "",
+             "Work Experience"]
+    year = 2024
+    for _ in range(jobs):
+        start = year - rng.randint(1, 4)
+        lines.append(rng.choice(TITLES))
+        lines.append(f"{rng.choice(MONTHS)} {start} – {rng.choice(MONTHS)} {year}")
+        lines.append(rng.choice(COMPANIES))
+        for _ in range(bullets):
+            lines.append(f"• {rng.choice(VERBS).capitalize()} {rng.choice(SKILLS)} services handling {rng.randint(1, 900)}k requests/day")
+        year = start
+    lines.extend(["", "Education", rng.choice(DEGREES), f"{rng.choice(UNIVERSITIES)} {year - 4}-{year}", "",
+                  "Certifications", "• AWS Certified Solutions Architect", "• Certified Kubernetes Administrator"])
+    return {
+        "text": "\n".join(lines),
+        "expected": {"first_name": first, "last_name": last, "email": email, "location": city, "skills": skills,
+                     "experience_count": jobs},
+    }
+
+
+def generate_corpus(size: int, seed: int = 42) -> List[Dict]:
+    rng = random.Random(seed)
+    return [generate_resume(rng, jobs=rng.randint(1, 8), bullets=rng.randint(2, 8)) for _ in range(size)]
+
+
+def run_text_stage(parser: ResumeParser, text: str) -> Dict:
+    """The parse steps that run after NER: section detection and field extraction."""
+    lines = text.split('\n')
+    bounds = parser.find_section_bounds(lines)
+    return {
+        "personal_info": parser.parse_personal_info([], text),
+        "skills": parser.parse_skills(parser.get_section_lines(lines, bounds, ["skills", "technical skills", "core competencies"])),
+        "experience": parser.parse_experience(parser.get_section_lines(lines, bounds, ["experience", "professional experience"])),
+        "education": parser.parse_education(parser.get_section_lines(lines, bounds, ["education"])),
+        "certifications": parser.parse_certifications(parser.get_section_lines(lines, bounds, ["certifications"])),
+    }
+
+
+def benchmark_text_stage(corpus: List[Dict], repeat: int = 3) -> Dict:
+    parser = ResumeParser("benchmark", "Software Engineer", "", [])
+    total_lines = sum(len(item["text"].split('\n')) for item in corpus)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in corpus:
+            run_text_stage(parser, item["text"])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "resumes": len(corpus),
+        "lines": total_lines,
+        "seconds": round(best, 4),
+        "lines_per_second": round(total_lines / best, 1),
+    }
+
+
+PERSONAL_FIELDS = ("first_name", "last_name", "location")
+
+
+def field_matches(field: str, found: Optional[str], expected: Optional[str]) -> bool:
+    found, expected = (found or "").strip().lower(), (expected or "").strip().lower()
+    # NER usually tags only the city of "Pune, India", so locations count when either contains the other
+    return found == expected or (field == "location" and bool(found) and (found in expected or expected in found))
+
+
+def evaluate_ner_scope(corpus: List[Dict], scope: str) -> Dict:
+    """Personal-info accuracy and NER latency of one NER scope over resumes labelled with their expected fields."""
+    parser = ResumeParser("benchmark", "Software Engineer", "", [])
+    latencies, correct, fallbacks = [], dict.fromkeys(PERSONAL_FIELDS, 0), 0
+    for item in corpus:
+        text = item["text"]
+        lines = text.split('\n')
+        bounds = parser.find_section_bounds(lines)
+        start = time.perf_counter()
+        entities, used_scope = parser.extract_entities(text, lines, bounds, scope=scope)
+        latencies.append(time.perf_counter() - start)
+        fallbacks += scope == "header" and used_scope == "full"
+        info = parser.parse_personal_info(entities, text)
+        for field in PERSONAL_FIELDS:
+            correct[field] += field_matches(field, info[field], item["expected"].get(field))
+
+    latencies.sort()
+    total = len(corpus) or 1
+    return {
+        "scope": scope,
+        "resumes": len(corpus),
+        "accuracy": {field: round(count / total, 4) for field, count in correct.items()},
+        "fallback_rate": round(fallbacks / total, 4),
+        "ner_ms_mean": round(sum(latencies) / total * 1000, 3),
+        "ner_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 3) if latencies else 0.0,
+    }
+
+
+# Page geometry of the synthetic PDF layouts: font size and how many text lines fit on a page
+PDF_LAYOUTS = {
+    "standard": {"fontsize": 11, "lines_per_page": 48},
+    "compact": {"fontsize": 8, "lines_per_page": 75},
+    "spacious": {"fontsize": 13, "lines_per_page": 28},
+}
+# Jobs per resume for each length class; "long" resumes run over several pages
+RESUME_LENGTHS = {"short": (1, 2), "medium": (3, 5), "long": (8, 15)}
+
+
+def render_pdf(text: str, layout: str = "standard") -> bytes:
+    geometry = PDF_LAYOUTS[layout]
+    lines = text.split('\n')
+    doc = fitz.open()
+    # TextWriter embeds a Unicode font, so en dashes and bullets survive extraction unlike with insert_text
+    font = fitz.Font("helv")
+    for start in range(0, len(lines), geometry["lines_per_page"]):
+        page = doc.new_page()
+        writer = fitz.TextWriter(page.rect)
+        writer.fill_textbox(fitz.Rect(50, 50, page.rect.width - 40, page.rect.height - 40),
+                            "\n".join(lines[start:start + geometry["lines_per_page"]]), font=font, fontsize=geometry["fontsize"])
+        writer.write_text(page)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def generate_pdf_corpus(size: int, seed: int = 42) -> List[Dict]:
+    """Synthetic resume PDFs of mixed length and layout, each with the golden fields a parse should recover."""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(size):
+        length = rng.choice(list(RESUME_LENGTHS))
+        layout = rng.choice(list(PDF_LAYOUTS))
+        resume = generate_resume(rng, jobs=rng.randint(*RESUME_LENGTHS[length]), bullets=rng.randint(2, 6))
+        corpus.append({
+            "name": f"{index:05d}-{length}-{layout}",
+            "pdf": render_pdf(resume["text"], layout),
+            "expected": resume["expected"],
+        })
+    return corpus
+
+
+def save_corpus(corpus: List[Dict], directory: str):
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for item in corpus:
+        (path / f"{item['name']}.pdf").write_bytes(item["pdf"])
+        (path / f"{item['name']}.json").write_text(json.dumps(item["expected"], indent=2))
+
+
+def load_corpus(directory: str) -> List[Dict]:
+    """Every <name>.pdf in the directory that has a golden <name>.json next to it."""
+    corpus = []
+    for pdf_path in sorted(Path(directory).glob("*.pdf")):
+        golden = pdf_path.with_suffix(".json")
+        if golden.exists():
+            corpus.append({"name": pdf_path.stem, "pdf": pdf_path.read_bytes(), "expected": json.loads(golden.read_text())})
+    return corpus
+
+
+class BenchmarkResumeParser(ResumeParser):
+    """Runs the full parse without touching the parse cache or the database."""
+    cache = None
+
+    def save_to_db(self, parsed_data: Dict, mode: Optional[str] = None) -> Dict:
+        return {"mode": "dry-run"}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))]
+
+
+def score_fields(parsed: Dict, expected: Dict) -> Dict[str, float]:
+    scores = {field: float(field_matches(field, parsed["personal_info"].get(field), expected.get(field)))
+              for field in (*PERSONAL_FIELDS, "email") if field in expected}
+    if "skills" in expected:
+        found = {vocabulary.normalize(skill) for skill in parsed["skills"]}
+        wanted = {vocabulary.normalize(skill) for skill in expected["skills"]}
+        scores["skills_recall"] = len(found & wanted) / len(wanted) if wanted else 1.0
+    if "experience_count" in expected:
+        scores["experience_count"] = float(len(parsed["experience"]) == expected["experience_count"])
+    return scores
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def benchmark_parser(corpus: List[Dict], warmup: int = 3) -> Dict:
+    """Parse every PDF end to end with DB writes stubbed and summarise latency, throughput, memory and accuracy."""
+    parser_args = ("benchmark", "Software Engineer", "Backend engineer building Python and Django services", ["Python", "Django"])
+    for item in corpus[:warmup]:
+        BenchmarkResumeParser(*parser_args).parse(item["pdf"])
+
+    rss_before = current_rss_bytes()
+    latencies, pages, errors = [], 0, 0
+    field_totals: Dict[str, float] = {}
+    stage_totals: Dict[str, float] = {}
+    start = time.perf_counter()
+    for item in corpus:
+        parser = BenchmarkResumeParser(*parser_args)
+        parse_start = time.perf_counter()
+        parsed = parser.parse(item["pdf"])
+        latencies.append(time.perf_counter() - parse_start)
+        if parsed["metadata"]["status"] != "success":
+            errors += 1
+            continue
+        pages += (parsed["metadata"]["extraction"] or {}).get("pages", 0)
+        for field, value in score_fields(parsed, item["expected"]).items():
+            field_totals[field] = field_totals.get(field, 0.0) + value
+        for stage, seconds in parsed["metadata"]["stages"]["stages"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    parsed_count = max(len(corpus) - errors, 1)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "spacy_model": settings.SPACY_MODEL,
+            "ner_scope": settings.NER_SCOPE,
+            "resumes": len(corpus),
+            "errors": errors,
+        },
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "mean": round(sum(latencies) / max(len(latencies), 1) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "throughput": {
+            "resumes_per_second": round(len(corpus) / elapsed, 2) if elapsed else None,
+            "pages_per_second": round(pages / elapsed, 2) if elapsed else None,
+        },
+        "memory": {"peak_rss_bytes": peak_rss_bytes(), "rss_growth_bytes": max(current_rss_bytes() - rss_before, 0)},
+        "stages_ms_mean": {stage: round(total / parsed_count * 1000, 3) for stage, total in stage_totals.items()},
+        "accuracy": {field: round(total / parsed_count, 4) for field, total in field_totals.items()},
+    }
+
+
+def compare_results(current: Dict, baseline: Dict) -> List[str]:
+    """Human-readable deltas between two saved benchmark runs."""
+    lines = [f"baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('created_at')})"]
+    for section in ("latency_ms", "throughput", "accuracy"):
+        for key, value in current[section].items():
+            previous = baseline.get(section, {}).get(key)
+            if value is None or previous is None:
+                continue
+            change = f" ({(value - previous) / previous:+.1%})" if previous else ""
+            lines.append(f"{section}.{key}: {previous} -> {value}{change}")
+    return lines
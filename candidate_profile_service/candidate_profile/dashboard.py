@@ -0,0 +1,141 @@
+import json
+from datetime import timedelta
+from typing import Dict, List
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .logger import logger
+from .models import Candidate, CandidateDashboard, Interview
+from .serializers import InterviewInsightSerializer
+
+# Shared with job_listing_service (job_listing/events.py): change both together
+APPLICATION_SAVED = "saved"
+APPLICATION_DELETED = "deleted"
+
+RECRUITER_ACTION_STATUSES = ('shortlisted', 'interviewed', 'offered', 'rejected')
+
+
+def parse_timestamp(value: str):
+    return timezone.datetime.fromisoformat(value)
+
+
+def interview_fields(candidate_id) -> Dict:
+    """The interview part of a dashboard row, read from this service's own tables."""
+    schedules = Interview.objects.filter(candidate_id=candidate_id, status='SCHEDULED').values_list('scheduled_at', flat=True)
+    latest_interview = Interview.objects.filter(
+        candidate_id=candidate_id, status='COMPLETED', video_url__isnull=False
+    ).select_related('insights').order_by('-updated_at').first()
+
+    insights = None
+    if latest_interview and hasattr(latest_interview, 'insights'):
+        insights = dict(InterviewInsightSerializer(latest_interview.insights).data)
+    return {
+        "interview_schedules": [scheduled_at.isoformat() for scheduled_at in schedules],
+        "video_url": latest_interview.video_url if latest_interview else None,
+        "insights": insights,
+    }
+
+
+def build_dashboard(candidate: Candidate) -> CandidateDashboard:
+    """The candidate's dashboard row, created from local data if it does not exist yet.
+
+    Applications arrive through application events only; see the `rebuild_dashboards` command.
+    """
+    dashboard, _ = CandidateDashboard.objects.get_or_create(candidate=candidate, defaults=interview_fields(candidate.id))
+    return dashboard
+
+
+def refresh_interviews(candidate_id):
+    CandidateDashboard.objects.filter(candidate_id=candidate_id).update(**interview_fields(candidate_id), updated_at=timezone.now())
+
+
+def mark_recommendations_stale(candidate_id):
+    CandidateDashboard.objects.filter(candidate_id=candidate_id).update(
+        skills_version=F('skills_version') + 1, updated_at=timezone.now()
+    )
+
+
+def apply_application_event(event: Dict[str, str]) -> bool:
+    """Fold one job service application event into the owning candidate's dashboard.
+
+    Events are idempotent: an application is stored under its id and an event older than the
+    stored copy is ignored, so replaying the stream or the backfill is safe. A deleted
+    application leaves a tombstone with the time of the delete, so replayed saves from before
+    it cannot bring the application back. Returns False for events about candidates this
+    service does not know.
+    """
+    candidate = Candidate.objects.filter(user_id=event["candidate_id"]).first()
+    if candidate is None:
+        logger.debug(f"Dropping application event for unknown candidate {event['candidate_id']}")
+        return False
+
+    build_dashboard(candidate)
+    with transaction.atomic():
+        dashboard = CandidateDashboard.objects.select_for_update().get(candidate=candidate)
+        application_id = event["application_id"]
+        stored = dashboard.applications.get(application_id)
+        if stored is not None:
+            stored_at, event_at = parse_timestamp(stored["updated_at"]), parse_timestamp(event["updated_at"])
+            if stored_at > event_at or (stored.get("deleted") and stored_at == event_at):
+                return True
+        if event["type"] == APPLICATION_DELETED:
+            dashboard.applications[application_id] = {"deleted": True, "updated_at": event["updated_at"]}
+        else:
+            dashboard.applications[application_id] = json.loads(event["data"])
+        dashboard.save(update_fields=["applications", "updated_at"])
+    return True
+
+
+def recommendations_stale(dashboard: CandidateDashboard, now) -> bool:
+    if dashboard.recommendations_version != dashboard.skills_version or dashboard.recommendations_updated_at is None:
+        return True
+    return now - dashboard.recommendations_updated_at > timedelta(seconds=settings.DASHBOARD_RECOMMENDATIONS_TTL)
+
+
+def store_recommendations(dashboard: CandidateDashboard, jobs: List[Dict], now) -> bool:
+    """Save recommendations computed for the skills version read with `dashboard`.
+
+    Nothing is written when the skills changed in the meantime, so the next read recomputes them.
+    """
+    dashboard.recommended_jobs = jobs
+    dashboard.recommendations_version = dashboard.skills_version
+    dashboard.recommendations_updated_at = now
+    return bool(CandidateDashboard.objects.filter(
+        candidate_id=dashboard.candidate_id, skills_version=dashboard.skills_version
+    ).update(recommended_jobs=jobs, recommendations_version=dashboard.skills_version, recommendations_updated_at=now))
+
+
+def dashboard_payload(dashboard: CandidateDashboard, now) -> Dict:
+    """The dashboard response; the 30 day windows are applied to the stored rows at read time."""
+    last_30_days = now - timedelta(days=30)
+    applications = [app for app in dashboard.applications.values() if not app.get("deleted")]
+    return {
+        "stats": {
+            "jobs_applied": sum(1 for app in applications if parse_timestamp(app['applied_at']) >= last_30_days),
+            "recruiter_actions": sum(
+                1 for app in applications
+                if parse_timestamp(app['updated_at']) >= last_30_days and app['status'] in RECRUITER_ACTION_STATUSES
+            ),
+            "interview_schedules": sum(
+                1 for scheduled_at in dashboard.interview_schedules if parse_timestamp(scheduled_at) >= last_30_days
+            ),
+        },
+        "video_url": dashboard.video_url,
+        "insights": dashboard.insights,
+        "recommended_jobs": dashboard.recommended_jobs,
+        "recent_applications": sorted(applications, key=lambda app: parse_timestamp(app['applied_at']), reverse=True)[:5],
+    }
+
+
+def rebuild_dashboard(candidate: Candidate, reset_applications: bool = False) -> CandidateDashboard:
+    """Recompute the locally owned parts of a dashboard row and force fresh recommendations."""
+    dashboard = build_dashboard(candidate)
+    fields = interview_fields(candidate.id)
+    if reset_applications:
+        fields["applications"] = {}
+    CandidateDashboard.objects.filter(candidate=candidate).update(
+        **fields, skills_version=F('skills_version') + 1, updated_at=timezone.now()
+    )
+    dashboard.refresh_from_db()
+    return dashboard
@@ -0,0 +1,66 @@
+from typing import Dict, Iterator
+import fitz
+from .metrics import current_rss_bytes, registry
+
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+RSS_BUCKETS = tuple(mb * 1024 * 1024 for mb in (1, 5, 10, 25, 50, 100, 250, 500, 1000))
+
+pdf_bytes_read = registry.counter("resume_pdf_bytes_read_total", "Bytes of PDF content opened for text extraction.")
+pdf_pages_processed = registry.counter("resume_pdf_pages_processed_total", "PDF pages whose text was extracted.")
+pdf_truncated = registry.counter("resume_pdf_truncated_total", "Documents cut short by an extraction budget.", ["limit"])
+pdf_pages_per_document = registry.histogram("resume_pdf_pages_per_document", "Pages extracted per document.", buckets=PAGE_BUCKETS)
+pdf_peak_rss = registry.histogram(
+    "resume_pdf_extract_peak_rss_bytes", "Peak resident memory growth while extracting one document.", buckets=RSS_BUCKETS
+)
+
+
+class PdfPageStream:
+    """Yields the text of a PDF one page at a time, stopping at the page and character budgets.
+
+    Only the current page is loaded, so the size of the document no longer bounds worker
+    memory. After iteration `stats` describes what was read.
+    """
+
+    def __init__(self, pdf_content: bytes, max_pages: int, max_chars: int):
+        self.pdf_content = pdf_content
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.stats: Dict = {}
+
+    def __iter__(self) -> Iterator[str]:
+        rss_before = peak = current_rss_bytes()
+        pages = chars = 0
+        truncated = None
+        doc = fitz.open(stream=self.pdf_content, filetype="pdf")
+        page_count = doc.page_count
+        try:
+            for number in range(page_count):
+                if self.max_pages and pages >= self.max_pages:
+                    truncated = "pages"
+                    break
+                text = doc.load_page(number).get_text()
+                if self.max_chars and chars + len(text) > self.max_chars:
+                    text = text[:self.max_chars - chars]
+                    truncated = "chars"
+                pages += 1
+                chars += len(text)
+                peak = max(peak, current_rss_bytes())
+                yield text
+                if truncated:
+                    break
+        finally:
+            doc.close()
+            self.stats = {
+                "bytes": len(self.pdf_content),
+                "pages": pages,
+                "page_count": page_count,
+                "chars": chars,
+                "truncated": truncated,
+                "peak_rss_bytes": max(peak - rss_before, 0),
+            }
+            pdf_bytes_read.inc(len(self.pdf_content))
+            pdf_pages_processed.inc(pages)
+            pdf_pages_per_document.observe(pages)
+            pdf_peak_rss.observe(self.stats["peak_rss_bytes"])
+            if truncated:
+                pdf_truncated.inc(limit=truncated)
@@ -0,0 +1,82 @@
+import json
+import math
+from collections import Counter
+from typing import Dict, Optional
+import numpy as np
+import redis
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from .logger import logger
+from .metrics import registry
+from .redis_client import redis_client
+
+# Written by job_listing_service (job_listing/job_vectors.py) whenever a Job is saved: bump both together
+CACHE_VERSION = 1
+MAX_FEATURES = 5000
+
+# Same preprocessing, tokenisation and stop words as the TfidfVectorizer used for scoring
+analyze = TfidfVectorizer(stop_words="english").build_analyzer()
+
+job_vector_requests = registry.counter("job_vector_cache_requests_total", "Shared job vector cache lookups.", ["result"])
+
+
+def term_counts(text: str) -> Counter:
+    return Counter(analyze(text or ""))
+
+
+def cache_key(job_id) -> str:
+    return f"jobvec:v{CACHE_VERSION}:{job_id}"
+
+
+def get_job_features(job_id) -> Optional[Dict]:
+    """Term counts of the listed job's title, description and skills, as last saved in the job service."""
+    if not job_id or redis_client is None:
+        return None
+    try:
+        raw = redis_client.get(cache_key(job_id))
+    except redis.RedisError as e:
+        logger.warning(f"Job vector cache read failed for {job_id}: {e}")
+        return None
+    if raw is None:
+        job_vector_requests.inc(result="miss")
+        return None
+    job_vector_requests.inc(result="hit")
+    entry = json.loads(raw)
+    return {"version": entry["version"], **{field: Counter(entry[field]) for field in ("title", "description", "skills")}}
+
+
+def pairwise_tfidf_cosine(a: Counter, b: Counter, max_features: int = MAX_FEATURES) -> float:
+    """Cosine similarity of two documents under a TfidfVectorizer fitted on just those two.
+
+    Matches `fit_transform([a, b])` with smooth IDF and L2 norm: terms in both documents get
+    an IDF of 1, terms in one get ln(3/2) + 1.
+    """
+    vocabulary = a.keys() | b.keys()
+    if len(vocabulary) > max_features:
+        vocabulary = set(sorted(vocabulary, key=lambda term: (-(a[term] + b[term]), term))[:max_features])
+    single_idf = math.log(1.5) + 1
+    dot = norm_a = norm_b = 0.0
+    for term in vocabulary:
+        idf = 1.0 if term in a and term in b else single_idf
+        weight_a, weight_b = a[term] * idf, b[term] * idf
+        dot += weight_a * weight_b
+        norm_a += weight_a * weight_a
+        norm_b += weight_b * weight_b
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / math.sqrt(norm_a * norm_b)
+
+
+def vector_from_counts(vectorizer: TfidfVectorizer, counts: Counter) -> csr_matrix:
+    """The row `vectorizer.transform` would produce for the text these counts came from."""
+    columns, values = [], []
+    for term, count in counts.items():
+        column = vectorizer.vocabulary_.get(term)
+        if column is not None:
+            columns.append(column)
+            values.append(1 + math.log(count) if vectorizer.sublinear_tf else count)
+    values = np.asarray(values, dtype=np.float64) * vectorizer.idf_[columns]
+    norm = np.linalg.norm(values)
+    if norm:
+        values /= norm
+    return csr_matrix((values, ([0] * len(columns), columns)), shape=(1, len(vectorizer.vocabulary_)))
@@ -0,0 +1,206 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from .logger import logger
+from .metrics import registry
+from .models import Candidate, CVParseJob
+from .parser import ResumeParser
+
+cv_jobs_gauge = registry.gauge("cv_parse_jobs", "CV parse jobs by status.", ["status"])
+cv_oldest_queued_gauge = registry.gauge("cv_parse_oldest_queued_seconds", "Age of the oldest runnable queued CV parse job.")
+cv_latency_gauge = registry.gauge(
+    "cv_parse_latency_seconds", "Latency of CV parse jobs finished in the last 15 minutes.", ["phase", "quantile"]
+)
+
+
+def cv_storage() -> FileSystemStorage:
+    return FileSystemStorage(location=settings.MEDIA_ROOT / 'cvs')
+
+
+def enqueue_cv_parse(candidate: Candidate, file_path: str, job_role: str, job_description: str,
+                     key_skills: List[str], max_attempts: Optional[int] = None, job_listing_id=None,
+                     profile: bool = False) -> CVParseJob:
+    job = CVParseJob.objects.create(
+        candidate=candidate,
+        tenant_id=candidate.tenant_id,
+        file_path=file_path,
+        job_role=job_role,
+        job_description=job_description,
+        key_skills=key_skills,
+        job_listing_id=job_listing_id,
+        profile=profile,
+        max_attempts=max_attempts or settings.CV_JOB_MAX_ATTEMPTS,
+    )
+    logger.info(f"Queued CV parse job {job.id} for candidate {candidate.id}")
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """Put back running jobs whose worker stopped renewing their lease, or fail them once out of attempts."""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.CV_JOB_LEASE)
+    stale = CVParseJob.objects.filter(status='running').filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=now, error="Worker stopped responding"
+    )
+    count = stale.filter(attempts__lt=F('max_attempts')).update(
+        status='queued', available_at=now, error="Worker stopped responding"
+    )
+    if failed:
+        logger.error(f"Failed {failed} stale CV parse jobs that were out of attempts")
+    if count:
+        logger.warning(f"Requeued {count} stale CV parse jobs")
+    return count
+
+
+def start_job(job: CVParseJob):
+    """Mark a job running for one more attempt, with a fresh lease."""
+    job.status = 'running'
+    job.attempts += 1
+    job.started_at = job.heartbeat_at = timezone.now()
+    job.save(update_fields=['status', 'attempts', 'started_at', 'heartbeat_at', 'updated_at'])
+
+
+@contextmanager
+def keep_alive(job_ids: List):
+    """Renew the lease of running jobs every CV_JOB_HEARTBEAT_INTERVAL seconds while the block runs."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.CV_JOB_HEARTBEAT_INTERVAL):
+                CVParseJob.objects.filter(id__in=job_ids, status='running').update(heartbeat_at=timezone.now())
+        except Exception as e:
+            logger.error(f"CV parse job heartbeat failed: {e}", exc_info=True)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def claim_next_job() -> Optional[CVParseJob]:
+    """Lock and mark running the oldest runnable job whose tenant is below its concurrency limit.
+
+    The per-tenant limit is checked against committed running jobs, so concurrent
+    claims can briefly exceed it by the number of workers polling at once.
+    """
+    limit = settings.CV_JOB_TENANT_CONCURRENCY
+    with transaction.atomic():
+        running = CVParseJob.objects.filter(status='running').values('tenant_id').annotate(total=Count('id'))
+        saturated = [row['tenant_id'] for row in running if row['total'] >= limit]
+
+        candidates = CVParseJob.objects.select_for_update(skip_locked=True).filter(
+            status='queued', available_at__lte=timezone.now()
+        )
+        if None in saturated:
+            candidates = candidates.exclude(tenant_id__isnull=True)
+        saturated = [tenant_id for tenant_id in saturated if tenant_id is not None]
+        if saturated:
+            candidates = candidates.exclude(tenant_id__in=saturated)
+
+        job = candidates.order_by('available_at', 'created_at').first()
+        if job is None:
+            return None
+        start_job(job)
+        return job
+
+
+def run_job(job: CVParseJob) -> CVParseJob:
+    """Parse the CV of a claimed job and record the outcome, scheduling a retry on unexpected failures."""
+    retryable = True
+    try:
+        with cv_storage().open(job.file_path, 'rb') as cv_file:
+            pdf_content = cv_file.read()
+        parser = ResumeParser(str(job.candidate_id), job.job_role, job.job_description, job.key_skills, tenant_id=job.tenant_id,
+                              job_listing_id=job.job_listing_id)
+        with keep_alive([job.id]):
+            parsed_data = parser.parse(pdf_content, profile=job.profile)
+        error = parsed_data.get("error") if parsed_data["metadata"]["status"] == "error" else None
+        retryable = parsed_data["metadata"].get("retryable", True)
+    except Exception as e:
+        logger.error(f"CV parse job {job.id} crashed: {e}", exc_info=True)
+        parsed_data, error = None, str(e)
+    return finish_job(job, parsed_data, error, retryable)
+
+
+def finish_job(job: CVParseJob, parsed_data: Optional[Dict], error: Optional[str], retryable: bool = True) -> CVParseJob:
+    """Record the outcome of a running job, scheduling a retry of retryable errors while attempts remain.
+
+    The outcome is only written while the job is still on this attempt: a job the lease reaper
+    requeued or failed, or another worker claimed since, is left as it is.
+    """
+    finished_at = timezone.now()
+    if error is None:
+        fields = {"status": 'succeeded', "parsed_data": parsed_data, "error": ''}
+        logger.info(f"CV parse job {job.id} succeeded in {(finished_at - job.started_at).total_seconds():.2f}s")
+    elif retryable and job.attempts < job.max_attempts:
+        available_at = finished_at + timedelta(seconds=settings.CV_JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1))
+        fields = {"status": 'queued', "error": error, "available_at": available_at}
+        logger.warning(f"CV parse job {job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying: {error}")
+    elif retryable:
+        fields = {"status": 'failed', "error": error}
+        logger.error(f"CV parse job {job.id} failed permanently after {job.attempts} attempts: {error}")
+    else:
+        fields = {"status": 'failed', "error": error}
+        logger.error(f"CV parse job {job.id} failed: {error}")
+
+    updated = CVParseJob.objects.filter(id=job.id, status='running', attempts=job.attempts).update(
+        finished_at=finished_at, updated_at=finished_at, **fields
+    )
+    if not updated:
+        logger.warning(f"CV parse job {job.id} changed while attempt {job.attempts} ran, its outcome was not recorded")
+        job.refresh_from_db()
+        return job
+    job.finished_at = finished_at
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return job
+
+
+def run_inline(job: CVParseJob) -> CVParseJob:
+    start_job(job)
+    return run_job(job)
+
+
+def _quantile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def collect_queue_metrics() -> Dict:
+    counts = dict(CVParseJob.objects.values_list('status').annotate(total=Count('id')))
+    for status_value, _ in CVParseJob.STATUS_CHOICES:
+        cv_jobs_gauge.set(counts.get(status_value, 0), status=status_value)
+
+    oldest = CVParseJob.objects.filter(status='queued', available_at__lte=timezone.now()).order_by('created_at').first()
+    oldest_age = (timezone.now() - oldest.created_at).total_seconds() if oldest else 0
+    cv_oldest_queued_gauge.set(oldest_age)
+
+    recent = list(CVParseJob.objects.filter(
+        status='succeeded', finished_at__gte=timezone.now() - timedelta(minutes=15)
+    ).order_by('-finished_at').values_list('created_at', 'started_at', 'finished_at')[:1000])
+    latencies = {
+        "parse": [(finished - started).total_seconds() for _, started, finished in recent],
+        "total": [(finished - created).total_seconds() for created, _, finished in recent],
+    }
+    for phase, values in latencies.items():
+        for q in (0.5, 0.95, 0.99):
+            cv_latency_gauge.set(_quantile(values, q) if values else 0, phase=phase, quantile=str(q))
+    return {"counts": counts, "oldest_queued_seconds": oldest_age}
+
+
+registry.add_collector(collect_queue_metrics)
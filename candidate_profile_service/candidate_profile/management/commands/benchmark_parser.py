@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from candidate_profile.benchmark import benchmark_parser, compare_results, generate_pdf_corpus, load_corpus, save_corpus
+
+
+class Command(BaseCommand):
+    help = ("Parse a corpus of resume PDFs end to end (no DB writes, no parse cache) and report latency percentiles, "
+            "throughput, peak RSS and field accuracy against golden JSON. Results are saved for comparison across commits.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', help="Directory of <name>.pdf files with golden <name>.json. Generated when omitted.")
+        parser.add_argument('--save-corpus', help="Write the generated corpus to this directory for later runs.")
+        parser.add_argument('--resumes', type=int, default=200, help="Size of the generated corpus.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--output', help="Results file. Defaults to benchmarks/parser-<timestamp>-<commit>.json.")
+        parser.add_argument('--compare', help="Earlier results file to diff against.")
+
+    def handle(self, *args, **options):
+        if options['corpus']:
+            corpus = load_corpus(options['corpus'])
+            if not corpus:
+                raise CommandError(f"No PDFs with golden JSON found in {options['corpus']}")
+        else:
+            corpus = generate_pdf_corpus(options['resumes'], seed=options['seed'])
+            if options['save_corpus']:
+                save_corpus(corpus, options['save_corpus'])
+
+        result = benchmark_parser(corpus, warmup=options['warmup'])
+        result["meta"]["corpus"] = options['corpus'] or f"synthetic:{options['resumes']}:{options['seed']}"
+
+        latency, throughput = result["latency_ms"], result["throughput"]
+        self.stdout.write(
+            f"{result['meta']['resumes']} resumes ({result['meta']['errors']} errors): "
+            f"p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms, "
+            f"{throughput['resumes_per_second']} resumes/s, {throughput['pages_per_second']} pages/s, "
+            f"peak RSS {result['memory']['peak_rss_bytes'] / 1024 / 1024:.1f} MB"
+        )
+        self.stdout.write("stages (mean ms): " + ", ".join(f"{stage} {ms}" for stage, ms in result["stages_ms_mean"].items()))
+        self.stdout.write("accuracy: " + ", ".join(f"{field} {value:.1%}" for field, value in result["accuracy"].items()))
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' /
+                      f"parser-{datetime.now():%Y%m%d-%H%M%S}-{result['meta']['commit'] or 'nocommit'}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=2))
+        self.stdout.write(f"Saved results to {output}")
+
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+            for line in compare_results(result, baseline):
+                self.stdout.write(line)
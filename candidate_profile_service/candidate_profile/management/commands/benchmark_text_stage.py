@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from candidate_profile.benchmark import benchmark_text_stage, generate_corpus
+
+
+class Command(BaseCommand):
+    help = "Measure section detection and field extraction throughput (lines/second) on synthetic resumes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        corpus = generate_corpus(options['resumes'], seed=options['seed'])
+        result = benchmark_text_stage(corpus, repeat=options['repeat'])
+        self.stdout.write(
+            f"{result['resumes']} resumes, {result['lines']} lines in {result['seconds']}s "
+            f"-> {result['lines_per_second']} lines/s"
+        )
@@ -0,0 +1,79 @@
+import os
+import signal
+import socket
+import time
+import redis
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from candidate_profile.dashboard import apply_application_event
+from candidate_profile.logger import logger
+from candidate_profile.redis_client import redis_client
+
+ERROR_BACKOFF = 5
+
+
+class Command(BaseCommand):
+    help = "Apply the job service's application events to candidate dashboards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumer', default=f"{socket.gethostname()}-{os.getpid()}",
+                            help="Consumer name within the group; reuse it after a restart to retry its unacknowledged events.")
+        parser.add_argument('--count', type=int, default=settings.DASHBOARD_EVENTS_BATCH)
+        parser.add_argument('--block', type=int, default=2000, help="Milliseconds to wait for new events.")
+
+    def handle(self, *args, **options):
+        if redis_client is None:
+            raise CommandError("Redis is not available")
+        stream, group, consumer = settings.APPLICATION_EVENTS_STREAM, settings.DASHBOARD_EVENTS_GROUP, options['consumer']
+        try:
+            # A new group starts from the beginning of the stream so nothing published before it is missed
+            redis_client.xgroup_create(stream, group, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+        stopping = False
+
+        def shutdown(signum, frame):
+            nonlocal stopping
+            logger.info("Stopping dashboard event consumer")
+            stopping = True
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        # Events this consumer read but never acknowledged come first, then new ones
+        position = '0'
+        applied = 0
+        self.stdout.write(f"Consuming {stream} as {group}/{consumer}")
+        while not stopping:
+            try:
+                response = redis_client.xreadgroup(
+                    group, consumer, {stream: position}, count=options['count'],
+                    block=options['block'] if position == '>' else None
+                )
+            except redis.RedisError as e:
+                logger.error(f"Reading {stream} failed: {e}")
+                time.sleep(ERROR_BACKOFF)
+                continue
+
+            entries = response[0][1] if response else []
+            if position != '>':
+                if not entries:
+                    position = '>'
+                    continue
+                position = entries[-1][0]
+
+            for message_id, fields in entries:
+                event = {key.decode(): value.decode() for key, value in fields.items()}
+                try:
+                    apply_application_event(event)
+                except Exception as e:
+                    # Left pending; it is retried when this consumer restarts
+                    logger.error(f"Applying application event {message_id.decode()} failed: {e}", exc_info=True)
+                    connections.close_all()
+                    continue
+                redis_client.xack(stream, group, message_id)
+                applied += 1
+        self.stdout.write(f"Applied {applied} events")
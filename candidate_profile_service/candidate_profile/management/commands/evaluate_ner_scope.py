@@ -0,0 +1,41 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from candidate_profile.benchmark import evaluate_ner_scope, generate_corpus
+from candidate_profile.parser import ResumeParser, ResumeParserError
+
+
+class Command(BaseCommand):
+    help = "Compare personal-info accuracy and NER latency of header-only and full-text NER on a labelled sample."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--labels', help="JSONL of {\"text\" or \"pdf\": ..., \"expected\": {first_name, last_name, location}}. "
+                                             "Defaults to synthetic resumes.")
+        parser.add_argument('--resumes', type=int, default=200, help="Synthetic sample size when --labels is not given.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        corpus = self.load_labels(options['labels']) if options['labels'] else generate_corpus(options['resumes'], seed=options['seed'])
+        for scope in ("full", "header"):
+            result = evaluate_ner_scope(corpus, scope)
+            accuracy = ", ".join(f"{field} {value:.1%}" for field, value in result['accuracy'].items())
+            self.stdout.write(
+                f"{scope:>6}: {result['resumes']} resumes, NER mean {result['ner_ms_mean']} ms, p95 {result['ner_ms_p95']} ms, "
+                f"full-text fallback {result['fallback_rate']:.1%}, accuracy {accuracy}"
+            )
+
+    def load_labels(self, path):
+        parser = ResumeParser("evaluation", "", "", [])
+        corpus = []
+        try:
+            with open(path) as labels:
+                for line in labels:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    if "pdf" in item:
+                        with open(item["pdf"], 'rb') as pdf:
+                            item["text"] = parser.extract_text_from_pdf(pdf.read())
+                    corpus.append(item)
+        except (OSError, ValueError, ResumeParserError) as e:
+            raise CommandError(f"Could not read labels from {path}: {e}")
+        return corpus
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from candidate_profile.dashboard import rebuild_dashboard
+from candidate_profile.models import Candidate
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or rebuild candidate dashboards from this service's data. Applications come from the job "
+        "service's events: run its publish_application_events command to backfill them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidate', action='append', dest='candidates', help="Rebuild only this candidate (repeatable).")
+        parser.add_argument('--reset-applications', action='store_true',
+                            help="Drop stored applications too, before replaying the job service's events.")
+
+    def handle(self, *args, **options):
+        candidates = Candidate.objects.all()
+        if options['candidates']:
+            candidates = candidates.filter(id__in=options['candidates'])
+
+        rebuilt = 0
+        for candidate in candidates.iterator():
+            rebuild_dashboard(candidate, reset_applications=options['reset_applications'])
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} dashboards"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from candidate_profile.models import Candidate
+from candidate_profile.relevance import fit_model
+
+
+class Command(BaseCommand):
+    help = "Refit the per-tenant and global TF-IDF models used for relevance scoring. Run it from cron; workers reload the files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', action='append', dest='tenants', help="Refit only this tenant (repeatable).")
+        parser.add_argument('--skip-global', action='store_true', help="Do not refit the model shared by all tenants.")
+
+    def handle(self, *args, **options):
+        tenants = options['tenants']
+        if tenants is None:
+            tenants = Candidate.objects.exclude(tenant_id__isnull=True).values_list('tenant_id', flat=True).distinct()
+        if not options['skip_global']:
+            tenants = [None, *tenants]
+
+        for tenant_id in tenants:
+            result = fit_model(tenant_id)
+            name = tenant_id or "global"
+            if result is None:
+                self.stdout.write(f"{name}: skipped, not enough documents")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{name}: {result['documents']} documents, {result['terms']} terms -> {result['path']}"))
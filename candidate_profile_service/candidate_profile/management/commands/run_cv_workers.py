@@ -0,0 +1,64 @@
+import multiprocessing
+import signal
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from candidate_profile.jobs import claim_next_job, requeue_stale_jobs, run_job
+from candidate_profile.logger import logger
+from candidate_profile.nlp import warm_up
+
+STALE_CHECK_INTERVAL = 60
+
+
+def worker_loop(worker_number: int, poll_interval: float, stop_event):
+    # Connections inherited from the parent must not be shared across processes
+    connections.close_all()
+    warm_up()
+    logger.info(f"CV worker {worker_number} started")
+    last_stale_check = 0.0
+    while not stop_event.is_set():
+        try:
+            if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+                requeue_stale_jobs()
+                last_stale_check = time.monotonic()
+            job = claim_next_job()
+            if job is None:
+                stop_event.wait(poll_interval)
+                continue
+            run_job(job)
+        except Exception as e:
+            logger.error(f"CV worker {worker_number} loop error: {e}", exc_info=True)
+            connections.close_all()
+            stop_event.wait(poll_interval)
+    logger.info(f"CV worker {worker_number} stopped")
+
+
+class Command(BaseCommand):
+    help = "Run local worker processes that parse queued CV uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.CV_WORKER_PROCESSES)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        stop_event = multiprocessing.Event()
+
+        def shutdown(signum, frame):
+            logger.info("Stopping CV workers")
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=worker_loop, args=(number, options['poll_interval'], stop_event), daemon=True)
+            for number in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} CV workers")
+
+        for worker in workers:
+            worker.join()
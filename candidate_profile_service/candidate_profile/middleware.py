@@ -6,7 +6,8 @@ from .logger import logger
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     def process_request(self, request: HttpRequest):
-        if request.path.startswith('/admin/'):
+        # /metrics/ is scraped by Prometheus, which authenticates with METRICS_SCRAPE_TOKEN instead
+        if request.path.startswith('/admin/') or request.path == '/metrics/':
             return None
 
         token = request.headers.get('Authorization', '').replace('Bearer ', '')
@@ -2,6 +2,14 @@ from django.db import models
 import uuid
 from django.utils import timezone
 
+class CandidateQuerySet(models.QuerySet):
+    def with_profile(self):
+        """Everything `CandidateSerializer` nests, loaded in a fixed number of queries however long the profile."""
+        return self.prefetch_related(
+            'education', 'work_experience', 'skills', 'certifications',
+            models.Prefetch('interviews', queryset=Interview.objects.select_related('insights')),
+        )
+
 class Candidate(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user_id = models.UUIDField(unique=True)
@@ -15,12 +23,20 @@ class Candidate(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CandidateQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
     class Meta:
         unique_together = ('user_id', 'tenant_id')
 
+# Where an education, experience, skill or certification row came from; CV parses only replace their own rows
+ROW_SOURCES = (
+    ('cv', 'Parsed from a CV'),
+    ('manual', 'Entered by the candidate'),
+)
+
 class Education(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='education')
@@ -28,6 +44,7 @@ class Education(models.Model):
     university = models.CharField(max_length=255)
     start_year = models.IntegerField()
     end_year = models.IntegerField(null=True, blank=True)
+    source = models.CharField(max_length=10, choices=ROW_SOURCES, default='manual')
 
     def __str__(self):
         return f"{self.degree} at {self.university}"
@@ -39,6 +56,7 @@ class WorkExperience(models.Model):
     job_title = models.CharField(max_length=100)
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)
+    source = models.CharField(max_length=10, choices=ROW_SOURCES, default='manual')
 
     def __str__(self):
         return f"{self.job_title} at {self.company_name}"
@@ -47,6 +65,7 @@ class Skill(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='skills')
     skill_name = models.CharField(max_length=100)
+    source = models.CharField(max_length=10, choices=ROW_SOURCES, default='manual')
 
     def __str__(self):
         return self.skill_name
@@ -57,6 +76,7 @@ class Certification(models.Model):
     title = models.CharField(max_length=100)
     issued_by = models.CharField(max_length=255)
     issue_date = models.DateField(null=True, blank=True)
+    source = models.CharField(max_length=10, choices=ROW_SOURCES, default='manual')
 
     def __str__(self):
         return self.title
@@ -90,4 +110,60 @@ class InterviewInsight(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Insights for Interview {self.interview.id}"
\ No newline at end of file
+        return f"Insights for Interview {self.interview.id}"
+
+class CVParseJob(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='cv_jobs')
+    tenant_id = models.UUIDField(null=True, blank=True)
+    file_path = models.CharField(max_length=500)
+    job_role = models.CharField(max_length=255, blank=True)
+    job_description = models.TextField(blank=True)
+    key_skills = models.JSONField(default=list)
+    job_listing_id = models.UUIDField(null=True, blank=True)
+    profile = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    available_at = models.DateTimeField(default=timezone.now)
+    parsed_data = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Renewed by the worker while it parses; a running job whose lease runs out is requeued
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"CV parse job {self.id} for {self.candidate_id} ({self.status})"
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'available_at'])]
+
+class CandidateDashboard(models.Model):
+    """What the dashboard shows for a candidate, kept current by candidate_profile/dashboard.py so a read is one row."""
+    candidate = models.OneToOneField(Candidate, on_delete=models.CASCADE, primary_key=True, related_name='dashboard')
+    # Application id -> the job service's application, as received in its application events,
+    # or {"deleted": True, "updated_at"} once it is deleted
+    applications = models.JSONField(default=dict)
+    # scheduled_at of each SCHEDULED interview; counted against the 30 day window when read
+    interview_schedules = models.JSONField(default=list)
+    video_url = models.URLField(null=True, blank=True)
+    insights = models.JSONField(null=True, blank=True)
+    recommended_jobs = models.JSONField(null=True, blank=True)
+    # Bumped on every skill change; recommendations are stale unless computed for the current version
+    skills_version = models.IntegerField(default=0)
+    recommendations_version = models.IntegerField(null=True, blank=True)
+    recommendations_updated_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Dashboard for {self.candidate_id}"
@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Dict, List, Optional
+import spacy
+from django.conf import settings
+from .logger import logger
+from .metrics import registry, current_rss_bytes
+
+DEFAULT_MODEL = "en_core_web_lg"
+FALLBACK_MODEL = "en_core_web_sm"
+# ResumeParser only reads doc.ents, so the dependency parser and lemmatizer are dead weight
+DEFAULT_EXCLUDED_COMPONENTS = ["parser", "lemmatizer"]
+
+_models: Dict[str, spacy.language.Language] = {}
+_model_stats: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+model_load_seconds = registry.gauge(
+    "resume_parser_spacy_model_load_seconds", "Time taken to load a spaCy model into this process.", ["model"]
+)
+model_rss_bytes = registry.gauge(
+    "resume_parser_spacy_model_rss_bytes", "Resident memory added by loading a spaCy model.", ["model"]
+)
+
+
+def _excluded_components() -> List[str]:
+    return list(getattr(settings, "SPACY_EXCLUDED_COMPONENTS", DEFAULT_EXCLUDED_COMPONENTS))
+
+
+def _load(name: str) -> spacy.language.Language:
+    excluded = _excluded_components()
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    nlp = spacy.load(name, exclude=excluded)
+    load_seconds = time.perf_counter() - start
+    rss_delta = max(current_rss_bytes() - rss_before, 0)
+
+    _model_stats[name] = {
+        "load_seconds": round(load_seconds, 3),
+        "rss_bytes": rss_delta,
+        "pipeline": list(nlp.pipe_names),
+        "excluded": excluded,
+    }
+    model_load_seconds.set(load_seconds, model=name)
+    model_rss_bytes.set(rss_delta, model=name)
+    logger.info(f"Loaded spaCy model {name} in {load_seconds:.2f}s (+{rss_delta / 1024 / 1024:.1f} MB RSS), pipeline: {nlp.pipe_names}")
+    return nlp
+
+
+def get_nlp(name: Optional[str] = None) -> spacy.language.Language:
+    """Return the process-wide spaCy model, loading it on first use."""
+    name = name or getattr(settings, "SPACY_MODEL", DEFAULT_MODEL)
+    nlp = _models.get(name)
+    if nlp is not None:
+        return nlp
+
+    with _lock:
+        nlp = _models.get(name)
+        if nlp is not None:
+            return nlp
+        try:
+            nlp = _load(name)
+        except OSError:
+            fallback = getattr(settings, "SPACY_FALLBACK_MODEL", FALLBACK_MODEL)
+            logger.warning(f"{name} not found. Using {fallback}.")
+            nlp = _models.get(fallback) or _load(fallback)
+            _models[fallback] = nlp
+        _models[name] = nlp
+        return nlp
+
+
+def warm_up(names: Optional[List[str]] = None):
+    """Load models ahead of the first request, e.g. in the WSGI master before workers fork."""
+    for name in names or [getattr(settings, "SPACY_MODEL", DEFAULT_MODEL)]:
+        get_nlp(name)
+
+
+def model_stats() -> Dict[str, Dict]:
+    return {name: dict(stats) for name, stats in _model_stats.items()}
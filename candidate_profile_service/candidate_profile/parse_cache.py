@@ -0,0 +1,89 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+import redis
+from django.conf import settings
+from .logger import logger
+from .metrics import registry
+from .redis_client import redis_client
+
+# Bump when the cached text, entity or section format changes so stale entries are ignored
+CACHE_VERSION = 2
+
+cache_requests = registry.counter("resume_parse_cache_requests_total", "Parse cache lookups by tier and result.", ["tier", "result"])
+
+
+def content_key(pdf_content: bytes) -> str:
+    """Keyed by the PDF bytes and the extraction budgets, which decide how much of the text is kept."""
+    budgets = f"p{settings.PDF_MAX_PAGES}c{settings.PDF_MAX_CHARS}"
+    return f"cvparse:v{CACHE_VERSION}:{budgets}:{hashlib.sha256(pdf_content).hexdigest()}"
+
+
+class ParseCache:
+    """Two-tier cache of the job-independent parse stages, keyed by the SHA-256 of the PDF bytes
+    and the PDF extraction budgets.
+
+    Entries hold the extracted text, the spaCy entities and the section bounds. The
+    in-process tier is a size-bounded LRU; the Redis tier is shared by every worker.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, client=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.client = client
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            cache_requests.inc(tier="memory", result="hit")
+            return entry
+        cache_requests.inc(tier="memory", result="miss")
+
+        if self.client is None:
+            return None
+        try:
+            raw = self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Parse cache read failed: {e}")
+            return None
+        if raw is None:
+            cache_requests.inc(tier="redis", result="miss")
+            return None
+        cache_requests.inc(tier="redis", result="hit")
+        entry = json.loads(raw)
+        self._remember(key, entry)
+        return entry
+
+    def set(self, key: str, entry: Dict):
+        self._remember(key, entry)
+        if self.client is None:
+            return
+        try:
+            self.client.setex(key, self.ttl, json.dumps(entry))
+        except redis.RedisError as e:
+            logger.warning(f"Parse cache write failed: {e}")
+
+    def _remember(self, key: str, entry: Dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+parse_cache = ParseCache(
+    max_entries=settings.PARSE_CACHE_MAX_ENTRIES,
+    ttl=settings.PARSE_CACHE_TTL,
+    client=redis_client if settings.PARSE_CACHE_USE_REDIS else None,
+)
@@ -1,19 +1,65 @@
 import re
+import time
 import spacy
-import fitz
 from .logger import logger
-import functools
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from dateutil.parser import parse as date_parse
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from django.conf import settings
+from django.db import transaction
 from .models import Candidate, Education, WorkExperience, Skill, Certification
+from .dashboard import mark_recommendations_stale
+from .profile_cache import profile_cache
+from .extraction import PdfPageStream
+from .job_vectors import get_job_features, pairwise_tfidf_cosine, term_counts
+from .nlp import get_nlp
+from .relevance import relevance_scores, score as relevance_score, vectorizer_store
+from .parse_cache import content_key, parse_cache
+from .profiling import StageTimer
+from .metrics import registry
+from .skills import coverage_scores
+
+ner_fallbacks = registry.counter("resume_ner_full_text_fallbacks_total", "Header-only NER runs that found no name or location and reran on the full text.")
 
 class ResumeParserError(Exception):
-    """Custom exception for resume parsing errors."""
-    pass
+    """Custom exception for resume parsing errors; only `retryable` ones may pass on another attempt."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+class SectionDetector:
+    """Finds section bounds one line at a time so text can be fed as each PDF page is read.
+
+    A section's bounds are final once the next header is seen; `close()` ends the last one.
+    """
+
+    def __init__(self, header_re: re.Pattern):
+        self.header_re = header_re
+        self.bounds: Dict[str, Tuple[int, Optional[int]]] = {}
+        self.last_key = None
+        self.line_count = 0
+
+    def feed(self, lines: List[str]):
+        for line in lines:
+            i = self.line_count
+            self.line_count += 1
+            line = line.strip()
+            lower_line = line.lower()
+            if len(lower_line.split()) > 5 or not self.header_re.search(lower_line):
+                continue
+            if self.last_key is not None and self.last_key != line:
+                self.bounds[self.last_key] = (self.bounds[self.last_key][0], i)
+            self.bounds[line] = (i + 1, None)
+            self.last_key = line
+            logger.debug(f"Found section: {line} at line {i}")
+
+    def close(self) -> Dict[str, Tuple[int, Optional[int]]]:
+        if self.last_key is not None:
+            self.bounds[self.last_key] = (self.bounds[self.last_key][0], self.line_count)
+        else:
+            self.bounds["personal details"] = (0, self.line_count)
+        return self.bounds
 
 class ResumeParser:
     CONFIG = {
@@ -37,58 +83,87 @@ class ResumeParser:
         "max_description_lines": 20
     }
 
-    def __init__(self, candidate_id: str, job_role: str, job_description: str, key_skills: List[str]):
+    # Patterns are compiled once per process; the header, keyword and degree matchers are
+    # single alternations so each line is scanned once instead of once per configured entry.
+    EMAIL_RE = re.compile(CONFIG["email_pattern"])
+    PHONE_RE = re.compile(CONFIG["phone_pattern"])
+    LINKEDIN_RE = re.compile(CONFIG["linkedin_pattern"])
+    GITHUB_RE = re.compile(CONFIG["github_pattern"])
+    DATE_RE = re.compile(CONFIG["date_pattern"])
+    HEADER_RE = re.compile("|".join(re.escape(h) for h in sorted(CONFIG["section_headers"], key=len, reverse=True)))
+    BULLET_MARKERS = tuple(CONFIG["bullet_markers"])
+    BULLET_PREFIX_RE = re.compile(r'^[•\-\*◦]\s*')
+    LEADING_NUMBER_RE = re.compile(r'^\d+\b')
+    NUMBER_RE = re.compile(r'^\d+$')
+    SKILL_SPLIT_RE = re.compile(r'[,:;]')
+    NON_SKILL_RE = re.compile(r'experience|education|intern')
+    DEGREE_RE = re.compile(r'bachelor|master|diploma|b\.tech|mtech')
+    YEAR_RE = re.compile(r'\b\d{4}\b')
+    YEAR_RANGE_RE = re.compile(r'\b\d{4}[-–]?\s*(?:\d{4}|Present)?')
+    NAME_RE = re.compile(r'[A-Za-z]+\s+[A-Za-z]+')
+    LOCATION_RE = re.compile(r'[A-Za-z]+,\s*[A-Za-z]+')
+    UPPERCASE_START_RE = re.compile(r'[A-Z]')
+
+    PERSONAL_SECTIONS = ["personal details", "contact information"]
+    # Shared cache of the job-independent stages; subclasses set None to always parse from scratch
+    cache = parse_cache
+
+    def __init__(self, candidate_id: str, job_role: str, job_description: str, key_skills: List[str], tenant_id=None,
+                 job_listing_id=None):
         self.candidate_id = candidate_id
         self.job_role = job_role
         self.job_description = job_description
         self.key_skills = key_skills
+        self.tenant_id = tenant_id
+        self.job_listing_id = job_listing_id
+        self.extraction = None
+        self.relevance_model = None
+
+    @property
+    def nlp(self) -> spacy.language.Language:
+        return get_nlp()
+
+    def extract_text_and_sections(self, pdf_content: bytes) -> Tuple[str, Dict[str, Tuple[int, Optional[int]]]]:
+        """Stream the PDF page by page into the section detector, within the configured budgets.
+
+        Only the current page is held by fitz, and section headers are found while later pages are
+        still being read instead of in a second pass over the joined text.
+        """
+        pages = PdfPageStream(pdf_content, settings.PDF_MAX_PAGES, settings.PDF_MAX_CHARS)
+        detector = SectionDetector(self.HEADER_RE)
+        texts = []
         try:
-            self.nlp = spacy.load("en_core_web_lg")
-        except OSError:
-            logger.warning("en_core_web_lg not found. Using en_core_web_sm.")
-            self.nlp = spacy.load("en_core_web_sm")
+            for page_text in pages:
+                texts.append(page_text)
+                detector.feed(page_text.split('\n'))
+        except Exception as e:
+            logger.error(f"Failed to extract text from PDF: {str(e)}")
+            raise ResumeParserError(f"Failed to extract text from PDF: {str(e)}")
+        self.extraction = pages.stats
+        if pages.stats["truncated"]:
+            logger.warning(f"Stopped extracting CV for candidate {self.candidate_id} at the {pages.stats['truncated']} budget "
+                           f"({pages.stats['pages']}/{pages.stats['page_count']} pages)")
+        text = "\n".join(texts)
+        if not text.strip():
+            raise ResumeParserError("Empty or unreadable PDF content")
+        logger.debug(f"Extracted text: {text[:100]}...")
+        return text, detector.close()
 
     def extract_text_from_pdf(self, pdf_content: bytes) -> str:
-        @functools.lru_cache(maxsize=128)
-        def _extract(pdf_bytes: bytes) -> str:
-            try:
-                doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-                text = "\n".join(page.get_text() for page in doc)
-                doc.close()
-                if not text.strip():
-                    raise ResumeParserError("Empty or unreadable PDF content")
-                logger.debug(f"Extracted text: {text[:100]}...")
-                return text
-            except Exception as e:
-                logger.error(f"Failed to extract text from PDF: {str(e)}")
-                raise ResumeParserError(f"Failed to extract text from PDF: {str(e)}")
-        return _extract(pdf_content)
+        return self.extract_text_and_sections(pdf_content)[0]
 
     def find_section_bounds(self, lines: List[str]) -> Dict[str, Tuple[int, Optional[int]]]:
-        bounds = {}
-        for i, line in enumerate(lines):
-            line = line.strip()
-            lower_line = line.lower()
-            for header in self.CONFIG["section_headers"]:
-                if header in lower_line and len(lower_line.split()) <= 5:
-                    if bounds and list(bounds.keys())[-1] != line:
-                        bounds[list(bounds.keys())[-1]] = (bounds[list(bounds.keys())[-1]][0], i)
-                    bounds[line] = (i + 1, None)
-                    logger.debug(f"Found section: {line} at line {i}")
-                    break
-        if bounds:
-            last_key = list(bounds.keys())[-1]
-            bounds[last_key] = (bounds[last_key][0], len(lines))
-        else:
-            bounds["personal details"] = (0, len(lines))
-        return bounds
+        detector = SectionDetector(self.HEADER_RE)
+        detector.feed(lines)
+        return detector.close()
 
     def get_section_lines(self, lines: List[str], bounds: Dict, sections: List[str]) -> List[str]:
         result = []
         seen_indices = set()
         for section in sections:
+            section = section.lower()
             for key in bounds:
-                if section.lower() in key.lower():
+                if section in key.lower():
                     start, end = bounds[key]
                     cleaned_lines = [line.strip() for line in lines[start:end] if line.strip() and start not in seen_indices]
                     result.extend(cleaned_lines)
@@ -98,35 +173,79 @@ class ResumeParser:
         return result
 
     def is_bullet_line(self, line: str) -> bool:
-        return any(line.startswith(marker) for marker in self.CONFIG["bullet_markers"]) or \
-               (line and not line[0].isupper() and not re.match(r'^\d+\b', line))
-
-    def parse_personal_info(self, doc: spacy.tokens.Doc, text: str) -> Dict:
+        return line.startswith(self.BULLET_MARKERS) or \
+               (line and not line[0].isupper() and not self.LEADING_NUMBER_RE.match(line))
+
+    def is_section_header(self, line: str) -> bool:
+        return self.HEADER_RE.search(line.lower()) is not None
+
+    @staticmethod
+    def _first_match(pattern: re.Pattern, text: str) -> Optional[str]:
+        match = pattern.search(text)
+        return match.group() if match else None
+
+    def header_text(self, lines: List[str], bounds: Dict) -> str:
+        """The first NER_HEADER_LINES lines plus any personal details section: where names and locations sit."""
+        limit = settings.NER_HEADER_LINES
+        header = lines[:limit]
+        for key, (start, end) in bounds.items():
+            # A CV without headers gets a synthetic "personal details" section spanning the whole text
+            if start and any(section in key.lower() for section in self.PERSONAL_SECTIONS):
+                header.extend(lines[max(start, limit):end])
+        return "\n".join(header)
+
+    @staticmethod
+    def has_person(entities: List[Tuple[str, str]]) -> bool:
+        return any(label == "PERSON" and len(ent_text.split()) >= 2 for ent_text, label in entities)
+
+    @staticmethod
+    def has_location(entities: List[Tuple[str, str]]) -> bool:
+        return any(label in ("GPE", "LOC") for _, label in entities)
+
+    def extract_entities(self, text: str, lines: List[str], bounds: Dict, doc: Optional[spacy.tokens.Doc] = None,
+                         doc_scope: str = "full", scope: Optional[str] = None) -> Tuple[List[Tuple[str, str]], str]:
+        """Entities for parse_personal_info and the scope NER ran on.
+
+        With NER_SCOPE=header only the header block goes through spaCy; the full document is
+        processed only when no name or no location turns up there. `doc` is an already computed
+        doc of either scope.
+        """
+        if doc is None and (scope or settings.NER_SCOPE) == "header":
+            doc, doc_scope = self.nlp(self.header_text(lines, bounds)), "header"
+        if doc is not None:
+            entities = [(ent.text, ent.label_) for ent in doc.ents]
+            if doc_scope == "full" or (self.has_person(entities) and self.has_location(entities)):
+                return entities, doc_scope
+            ner_fallbacks.inc()
+            logger.debug(f"No name or location in CV header for candidate {self.candidate_id}, running NER on the full text")
+        return [(ent.text, ent.label_) for ent in self.nlp(text).ents], "full"
+
+    def parse_personal_info(self, entities: List[Tuple[str, str]], text: str) -> Dict:
         lines = text.split('\n')
         personal_info = {
             "first_name": None,
             "last_name": None,
             "location": None,
-            "email": next(iter(re.findall(self.CONFIG["email_pattern"], text)), None),
-            "phone": next(iter(re.findall(self.CONFIG["phone_pattern"], text)), None),
-            "linkedin": next(iter(re.findall(self.CONFIG["linkedin_pattern"], text)), None),
-            "github": next(iter(re.findall(self.CONFIG["github_pattern"], text)), None)
+            "email": self._first_match(self.EMAIL_RE, text),
+            "phone": self._first_match(self.PHONE_RE, text),
+            "linkedin": self._first_match(self.LINKEDIN_RE, text),
+            "github": self._first_match(self.GITHUB_RE, text)
         }
 
-        for ent in doc.ents:
-            if ent.label_ == "PERSON" and not personal_info["first_name"] and len(ent.text.split()) >= 2:
-                names = ent.text.split()
+        for ent_text, label in entities:
+            if label == "PERSON" and not personal_info["first_name"] and len(ent_text.split()) >= 2:
+                names = ent_text.split()
                 personal_info["first_name"] = names[0]
                 personal_info["last_name"] = " ".join(names[1:])
-                logger.debug(f"NER found name: {ent.text}")
-            elif ent.label_ in ["GPE", "LOC"] and not personal_info["location"]:
-                personal_info["location"] = ent.text
-                logger.debug(f"NER found location: {ent.text}")
+                logger.debug(f"NER found name: {ent_text}")
+            elif label in ["GPE", "LOC"] and not personal_info["location"]:
+                personal_info["location"] = ent_text
+                logger.debug(f"NER found location: {ent_text}")
 
         if not personal_info["first_name"]:
             for line in lines:
-                if (re.search(r'[A-Za-z]+\s+[A-Za-z]+', line) and not any(h.lower() in line.lower() for h in self.CONFIG["section_headers"])
-                    and len(line.split()) <= 5 and personal_info["email"] not in line):
+                if (self.NAME_RE.search(line) and not self.is_section_header(line)
+                    and len(line.split()) <= 5 and not (personal_info["email"] and personal_info["email"] in line)):
                     names = line.strip().split()
                     personal_info["first_name"] = names[0]
                     personal_info["last_name"] = " ".join(names[1:]) if len(names) > 1 else "Unknown"
@@ -135,7 +254,7 @@ class ResumeParser:
 
         if not personal_info["location"]:
             for line in lines:
-                if "India" in line or re.search(r'[A-Za-z]+,\s*[A-Za-z]+', line):
+                if "India" in line or self.LOCATION_RE.search(line):
                     personal_info["location"] = line.strip()
                     logger.debug(f"Heuristic found location: {line.strip()}")
                     break
@@ -146,40 +265,37 @@ class ResumeParser:
             logger.warning("No valid name found, using placeholder.")
         return personal_info
 
+    def _add_skill_parts(self, skills: set, text: str, source: str):
+        for part in self.SKILL_SPLIT_RE.split(text):
+            part = part.strip()
+            if (part and len(part) >= self.CONFIG["min_skill_length"] and
+                not self.NUMBER_RE.match(part) and
+                not self.NON_SKILL_RE.search(part.lower())):
+                skills.add(part)
+                logger.debug(f"Extracted skill from {source}: {part}")
+
     def parse_skills(self, lines: List[str]) -> List[str]:
         skills = set(self.key_skills)
         for line in lines:
-            clean_line = re.sub(r'^[•\-\*◦]\s*', '', line).strip()
+            clean_line = self.BULLET_PREFIX_RE.sub('', line).strip()
             if ':' in clean_line:
-                parts = re.split(r':', clean_line)[1].strip()
-                skill_parts = re.split(r'[,:;]', parts)
-                for part in skill_parts:
-                    part = part.strip()
-                    if (part and len(part) >= self.CONFIG["min_skill_length"] and
-                        not re.match(r'^\d+$', part) and
-                        not any(kw in part.lower() for kw in ["experience", "education", "intern"])):
-                        skills.add(part)
-                        logger.debug(f"Extracted skill from colon: {part}")
-            elif self.is_bullet_line(line) and not re.search(self.CONFIG["date_pattern"], line):
-                skill_parts = re.split(r'[,:;]', clean_line)
-                for part in skill_parts:
-                    part = part.strip()
-                    if (part and len(part) >= self.CONFIG["min_skill_length"] and
-                        not re.match(r'^\d+$', part) and
-                        not any(kw in part.lower() for kw in ["experience", "education", "intern"])):
-                        skills.add(part)
-                        logger.debug(f"Extracted skill from bullet: {part}")
+                self._add_skill_parts(skills, clean_line.split(':')[1].strip(), "colon")
+            elif self.is_bullet_line(line) and not self.DATE_RE.search(line):
+                self._add_skill_parts(skills, clean_line, "bullet")
         return sorted(list(skills))
 
     def parse_experience(self, lines: List[str]) -> List[Dict]:
         experiences = []
         current_exp = {}
         description_lines = []
+        # Each line is matched once up front; the state machine below only reads the results
+        dates = [self.DATE_RE.search(line) for line in lines]
+        bullets = [bool(self.is_bullet_line(line)) for line in lines]
         i = 0
 
         while i < len(lines):
             line = lines[i]
-            date_match = re.search(self.CONFIG["date_pattern"], line)
+            date_match = dates[i]
             if date_match:
                 if current_exp.get("title") and description_lines:
                     current_exp["description"] = " ".join(description_lines[:self.CONFIG["max_description_lines"]])
@@ -189,7 +305,7 @@ class ResumeParser:
                     description_lines = []
                 current_exp["duration"] = date_match.group()
                 i += 1
-                if i < len(lines) and not self.is_bullet_line(lines[i]):
+                if i < len(lines) and not bullets[i]:
                     if not current_exp.get("title"):
                         current_exp["title"] = lines[i]
                     elif not current_exp.get("company"):
@@ -197,15 +313,15 @@ class ResumeParser:
                     i += 1
                 continue
 
-            if (not self.is_bullet_line(line) and not date_match and i + 1 < len(lines) and
-                (re.search(self.CONFIG["date_pattern"], lines[i + 1]) or (current_exp.get("duration") and not current_exp.get("title")))):
+            if (not bullets[i] and i + 1 < len(lines) and
+                (dates[i + 1] or (current_exp.get("duration") and not current_exp.get("title")))):
                 current_exp["title"] = line
                 i += 1
                 continue
 
-            if ((self.is_bullet_line(line) or (description_lines and not re.match(r'[A-Z]', line))) and
-                current_exp.get("title") and not re.search(self.CONFIG["date_pattern"], line)):
-                description_lines.append(re.sub(r'^[•\-\*◦]\s*', '', line).strip())
+            if ((bullets[i] or (description_lines and not self.UPPERCASE_START_RE.match(line))) and
+                current_exp.get("title")):
+                description_lines.append(self.BULLET_PREFIX_RE.sub('', line).strip())
                 i += 1
                 continue
 
@@ -224,20 +340,20 @@ class ResumeParser:
 
         while i < len(lines):
             line = lines[i]
-            if any(kw in line.lower() for kw in ["bachelor", "master", "diploma", "b.tech", "mtech"]):
+            if self.DEGREE_RE.search(line.lower()):
                 if current_edu.get("degree") and any(current_edu.get(k) for k in ["start_year", "institution"]):
                     education.append(current_edu)
                     current_edu = {}
                 current_edu["degree"] = line
                 i += 1
-                while i < len(lines) and not any(h.lower() in lines[i].lower() for h in self.CONFIG["section_headers"]):
-                    year_match = re.search(r'\b\d{4}\b', lines[i])
+                while i < len(lines) and not self.is_section_header(lines[i]):
+                    year_match = self.YEAR_RE.search(lines[i])
                     if year_match:
                         current_edu["start_year"] = year_match.group()
-                        institution = re.sub(r'\b\d{4}[-–]?\s*(?:\d{4}|Present)?', '', lines[i]).strip()
+                        institution = self.YEAR_RANGE_RE.sub('', lines[i]).strip()
                         if institution and not current_edu.get("institution"):
                             current_edu["institution"] = institution
-                    elif not current_edu.get("institution") and lines[i].strip() and not re.match(r'^\d+$', lines[i]) and not self.is_bullet_line(lines[i]):
+                    elif not current_edu.get("institution") and lines[i].strip() and not self.NUMBER_RE.match(lines[i]) and not self.is_bullet_line(lines[i]):
                         current_edu["institution"] = lines[i].strip()
                     i += 1
                 continue
@@ -251,7 +367,7 @@ class ResumeParser:
     def parse_certifications(self, lines: List[str]) -> List[Dict]:
         certifications = []
         for line in lines:
-            clean_line = re.sub(r'^[•\-\*◦]\s*', '', line).strip()
+            clean_line = self.BULLET_PREFIX_RE.sub('', line).strip()
             if self.is_bullet_line(line) and len(clean_line) > 5 and not any(kw in clean_line.lower() for kw in ["email", "phone", "@"]):
                 certifications.append({"title": clean_line})
                 logger.debug(f"Extracted certification: {clean_line}")
@@ -261,120 +377,249 @@ class ResumeParser:
         if not self.key_skills:
             logger.warning("No key skills provided for matching.")
             return 0.0
-        matched = sum(1 for key_skill in self.key_skills if any(key_skill.lower() in skill.lower() for skill in extracted_skills))
-        score = round((matched / len(self.key_skills)) * 100, 2)
-        logger.debug(f"Skill match score: {score}% (Matched {matched}/{len(self.key_skills)})")
+        # Skills are compared by canonical id, so "JS" on a CV satisfies a "JavaScript" key skill
+        score = round(float(coverage_scores(extracted_skills, [self.key_skills])[0]), 2)
+        logger.debug(f"Skill match score: {score}%")
         return score
 
     def calculate_relevance_score(self, resume_text: str) -> float:
+        """Cosine similarity of the CV and the job under the tenant's pre-fitted TF-IDF model.
+
+        Falls back to TF-IDF over just the two documents until a model has been fitted with
+        `manage.py refit_tfidf`. When the job comes from the job service its term counts are
+        read from the shared job vector cache instead of being recomputed for every CV.
+        """
+        job_text = f"{self.job_description} {self.job_role}"
+        job_features = get_job_features(self.job_listing_id)
+        job_counts = job_features["description"] + job_features["title"] if job_features else None
         try:
-            vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
-            documents = [resume_text, f"{self.job_description} {self.job_role}"]
-            tfidf_matrix = vectorizer.fit_transform(documents)
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            self.relevance_model, vectorizer = vectorizer_store.get(self.tenant_id)
+            if vectorizer is not None:
+                similarity = relevance_score(vectorizer, resume_text, job_text, job_counts=job_counts)
+            else:
+                self.relevance_model = "pairwise"
+                similarity = pairwise_tfidf_cosine(term_counts(resume_text), job_counts if job_counts is not None else term_counts(job_text))
+            relevance_scores.inc(model=self.relevance_model)
             score = round(similarity * 100, 2)
-            logger.debug(f"Relevance score: {score}%")
+            logger.debug(f"Relevance score: {score}% ({self.relevance_model} model)")
             return score
         except Exception as e:
             logger.error(f"Failed to calculate relevance score: {str(e)}")
             return 0.0
 
-    def save_to_db(self, parsed_data: Dict):
-        try:
-            candidate = Candidate.objects.get(id=self.candidate_id)
-            personal_info = parsed_data["personal_info"]
-            candidate.first_name = personal_info["first_name"]
-            candidate.last_name = personal_info["last_name"]
-            candidate.location = personal_info["location"]
-            candidate.phone = personal_info["phone"]
-            candidate.save()
-
-            for edu in parsed_data["education"]:
-                Education.objects.create(
-                    candidate=candidate,
-                    degree=edu["degree"],
-                    university=edu.get("institution"),
-                    start_year=int(edu["start_year"]) if edu.get("start_year") else None
-                )
+    # Fields that identify a parsed child row when diffing against what is already stored
+    ROW_KEYS = {
+        Education: ("degree", "university", "start_year"),
+        WorkExperience: ("company_name", "job_title", "start_date", "end_date"),
+        Skill: ("skill_name",),
+        Certification: ("title",),
+    }
+
+    def build_child_rows(self, candidate: Candidate, parsed_data: Dict) -> Dict:
+        """Rows to store for the parse, marked as parsed from a CV.
 
-            for exp in parsed_data["experience"]:
-                duration = exp["duration"].split('–')
-                start_date = date_parse(duration[0].strip()) if duration[0] else None
-                end_date = date_parse(duration[1].strip()) if len(duration) > 1 and duration[1].strip() not in ["Present", "Current"] else None
-                WorkExperience.objects.create(
+        Degrees without a start year and jobs without a start date are left out, as those
+        columns cannot be empty; they stay in parsed_data for the candidate to add by hand.
+        """
+        rows = {
+            Education: [
+                Education(
                     candidate=candidate,
-                    company_name=exp.get("company"),
-                    job_title=exp["title"],
-                    start_date=start_date,
-                    end_date=end_date
+                    degree=edu["degree"],
+                    university=edu.get("institution") or "",
+                    start_year=int(edu["start_year"]),
+                    source='cv'
                 )
+                for edu in parsed_data["education"] if edu.get("start_year")
+            ],
+            WorkExperience: [],
+            Skill: [Skill(candidate=candidate, skill_name=skill, source='cv') for skill in parsed_data["skills"]],
+            Certification: [Certification(candidate=candidate, title=cert["title"], source='cv') for cert in parsed_data["certifications"]],
+        }
+        for exp in parsed_data["experience"]:
+            duration = exp["duration"].split('–')
+            start_date = date_parse(duration[0].strip()) if duration[0] else None
+            if start_date is None:
+                continue
+            end_date = date_parse(duration[1].strip()) if len(duration) > 1 and duration[1].strip() not in ["Present", "Current"] else None
+            rows[WorkExperience].append(WorkExperience(
+                candidate=candidate,
+                company_name=exp.get("company") or "",
+                job_title=exp["title"],
+                start_date=start_date.date(),
+                end_date=end_date.date() if end_date else None,
+                source='cv'
+            ))
+        skipped = len(parsed_data["education"]) - len(rows[Education]) + len(parsed_data["experience"]) - len(rows[WorkExperience])
+        if skipped:
+            logger.info(f"Not storing {skipped} undated education or experience entries for candidate {self.candidate_id}")
+        return rows
+
+    def row_key(self, model, row) -> Tuple:
+        return tuple(getattr(row, field) for field in self.ROW_KEYS[model])
+
+    def replace_rows(self, candidate: Candidate, model, rows: List) -> Dict:
+        deleted, _ = model.objects.filter(candidate=candidate, source='cv').delete()
+        created = model.objects.bulk_create(rows, batch_size=settings.CV_SAVE_BATCH_SIZE)
+        return {"inserted": len(created), "deleted": deleted, "unchanged": 0}
+
+    def diff_rows(self, candidate: Candidate, model, rows: List) -> Dict:
+        fields = self.ROW_KEYS[model]
+        existing = {}
+        for pk, *values in model.objects.filter(candidate=candidate, source='cv').values_list("pk", *fields):
+            existing.setdefault(tuple(values), []).append(pk)
+
+        wanted = {}
+        for row in rows:
+            wanted.setdefault(self.row_key(model, row), row)
+
+        stale = [pk for key, pks in existing.items() for pk in (pks if key not in wanted else pks[1:])]
+        new_rows = [row for key, row in wanted.items() if key not in existing]
+        if stale:
+            model.objects.filter(pk__in=stale).delete()
+        model.objects.bulk_create(new_rows, batch_size=settings.CV_SAVE_BATCH_SIZE)
+        return {"inserted": len(new_rows), "deleted": len(stale), "unchanged": len(wanted) - len(new_rows)}
+
+    def save_to_db(self, parsed_data: Dict, mode: Optional[str] = None) -> Dict:
+        """Write the parse result in one transaction and return per-table row counts and DB time.
+
+        "replace" drops the education, experience, skill and certification rows earlier parses
+        stored and bulk inserts the parsed ones; "diff" only inserts and deletes the rows that
+        changed. Rows the candidate added or edited by hand are never touched.
+        """
+        mode = mode or settings.CV_SAVE_MODE
+        if mode not in ("replace", "diff"):
+            raise ResumeParserError(f"Unknown save mode: {mode}")
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                candidate = Candidate.objects.select_for_update().get(id=self.candidate_id)
+                personal_info = parsed_data["personal_info"]
+                candidate.first_name = personal_info["first_name"]
+                candidate.last_name = personal_info["last_name"]
+                # Keep what is on file when the CV does not mention a phone number or location
+                candidate.location = personal_info["location"] or candidate.location
+                candidate.phone = personal_info["phone"] or candidate.phone
+                candidate.save(update_fields=["first_name", "last_name", "location", "phone", "updated_at"])
+
+                write_rows = self.replace_rows if mode == "replace" else self.diff_rows
+                tables = {
+                    model._meta.db_table: write_rows(candidate, model, rows)
+                    for model, rows in self.build_child_rows(candidate, parsed_data).items()
+                }
+                candidate_id = candidate.id
+                transaction.on_commit(lambda: mark_recommendations_stale(candidate_id))
+                transaction.on_commit(lambda: profile_cache.invalidate(candidate_id))
 
-            for skill in parsed_data["skills"]:
-                Skill.objects.create(candidate=candidate, skill_name=skill)
-
-            for cert in parsed_data["certifications"]:
-                Certification.objects.create(candidate=candidate, title=cert["title"])
-
-            logger.info(f"Saved parsed data to DB for candidate {self.candidate_id}")
+            stats = {"mode": mode, "tables": tables, "db_seconds": round(time.perf_counter() - start, 4)}
+            logger.info(f"Saved parsed data to DB for candidate {self.candidate_id} ({mode}, {stats['db_seconds']}s)")
+            return stats
         except Candidate.DoesNotExist:
             logger.error(f"Candidate {self.candidate_id} not found during DB save")
             raise ResumeParserError(f"Candidate {self.candidate_id} does not exist")
         except Exception as e:
             logger.error(f"Failed to save parsed data to DB: {str(e)}")
-            raise ResumeParserError(f"Database save failed: {str(e)}")
+            raise ResumeParserError(f"Database save failed: {str(e)}", retryable=True)
+
+    def parse(self, pdf_content: bytes, text: Optional[str] = None, doc: Optional[spacy.tokens.Doc] = None,
+              profile: bool = False, doc_scope: str = "full") -> Dict:
+        """Parse a resume. Batch callers pass the already extracted text and the doc produced by nlp.pipe
+        over either the full text or the header block (`doc_scope`).
 
-    def parse(self, pdf_content: bytes) -> Dict:
+        Text extraction, NER and section splitting depend only on the PDF bytes and are
+        served from the parse cache when the same file was parsed before. Each stage is timed
+        into metadata["stages"]; with `profile` the whole parse also runs under cProfile.
+        """
         start_time = datetime.now()
+        timer = StageTimer(self.candidate_id, profile=profile or settings.PARSE_PROFILE)
+        timer.start_profile()
         try:
             logger.info(f"Starting resume parsing for candidate {self.candidate_id}")
-            text = self.extract_text_from_pdf(pdf_content)
-            doc = self.nlp(text)
-            lines = text.split('\n')
-            bounds = self.find_section_bounds(lines)
-
-            skills_lines = self.get_section_lines(lines, bounds, ["skills", "technical skills", "core competencies"])
-            exp_lines = self.get_section_lines(lines, bounds, ["experience", "professional experience"])
-            edu_lines = self.get_section_lines(lines, bounds, ["education"])
-            cert_lines = self.get_section_lines(lines, bounds, ["certifications"])
-
-            parsed_data = {
-                "candidate_id": self.candidate_id,
-                "job_role": self.job_role,
-                "personal_info": self.parse_personal_info(doc, text),
-                "skills": self.parse_skills(skills_lines),
-                "experience": self.parse_experience(exp_lines),
-                "education": self.parse_education(edu_lines),
-                "certifications": self.parse_certifications(cert_lines),
-                "skill_match_score": 0.0,
-                "relevance_score": 0.0,
-                "metadata": {
-                    "processing_time": None,
-                    "resume_length": len(text),
-                    "status": "success",
-                    "sections_detected": list(bounds.keys())
+            cached = None
+            if self.cache is not None:
+                with timer.stage("cache_lookup"):
+                    cache_key = content_key(pdf_content)
+                    cached = self.cache.get(cache_key)
+            if cached and cached["ner_scope"] == "header" and settings.NER_SCOPE == "full":
+                cached = None  # Entities were taken from the header only; redo NER over the full text
+            if cached:
+                text = cached["text"]
+                entities = [tuple(entity) for entity in cached["entities"]]
+                bounds = cached["bounds"]
+                ner_scope = cached["ner_scope"]
+                lines = text.split('\n')
+            else:
+                if text is None:
+                    with timer.stage("extract"):
+                        text, bounds = self.extract_text_and_sections(pdf_content)
+                    lines = text.split('\n')
+                else:
+                    with timer.stage("sections"):
+                        lines = text.split('\n')
+                        bounds = self.find_section_bounds(lines)
+                with timer.stage("ner"):
+                    entities, ner_scope = self.extract_entities(text, lines, bounds, doc=doc, doc_scope=doc_scope)
+                if self.cache is not None:
+                    self.cache.set(cache_key, {"text": text, "entities": entities, "bounds": bounds, "ner_scope": ner_scope})
+
+            with timer.stage("fields"):
+                skills_lines = self.get_section_lines(lines, bounds, ["skills", "technical skills", "core competencies"])
+                exp_lines = self.get_section_lines(lines, bounds, ["experience", "professional experience"])
+                edu_lines = self.get_section_lines(lines, bounds, ["education"])
+                cert_lines = self.get_section_lines(lines, bounds, ["certifications"])
+
+                parsed_data = {
+                    "candidate_id": self.candidate_id,
+                    "job_role": self.job_role,
+                    "personal_info": self.parse_personal_info(entities, text),
+                    "skills": self.parse_skills(skills_lines),
+                    "experience": self.parse_experience(exp_lines),
+                    "education": self.parse_education(edu_lines),
+                    "certifications": self.parse_certifications(cert_lines),
+                    "skill_match_score": 0.0,
+                    "relevance_score": 0.0,
+                    "metadata": {
+                        "processing_time": None,
+                        "resume_length": len(text),
+                        "status": "success",
+                        "sections_detected": list(bounds.keys()),
+                        "cache": "hit" if cached else "miss",
+                        "ner_scope": ner_scope,
+                        "extraction": self.extraction
+                    }
                 }
-            }
 
-            parsed_data["skill_match_score"] = self.calculate_skill_match(parsed_data["skills"])
-            parsed_data["relevance_score"] = self.calculate_relevance_score(text)
+            with timer.stage("scoring"):
+                parsed_data["skill_match_score"] = self.calculate_skill_match(parsed_data["skills"])
+                parsed_data["relevance_score"] = self.calculate_relevance_score(text)
+            parsed_data["metadata"]["relevance_model"] = self.relevance_model
             parsed_data["metadata"]["processing_time"] = (datetime.now() - start_time).total_seconds()
 
-            self.save_to_db(parsed_data)
+            with timer.stage("db_save"):
+                parsed_data["metadata"]["db"] = self.save_to_db(parsed_data)
+            parsed_data["metadata"]["stages"] = timer.breakdown()
+            profile_stats = timer.stop_profile()
+            if profile_stats is not None:
+                parsed_data["metadata"]["profile"] = profile_stats
 
             logger.info(f"Successfully parsed resume for candidate {self.candidate_id}")
             return parsed_data
 
         except ResumeParserError as e:
+            timer.stop_profile()
             logger.error(f"Resume parsing failed for {self.candidate_id}: {str(e)}")
             return {
                 "candidate_id": self.candidate_id,
                 "error": str(e),
-                "metadata": {"status": "error", "processing_time": (datetime.now() - start_time).total_seconds()}
+                "metadata": {"status": "error", "retryable": e.retryable,
+                             "processing_time": (datetime.now() - start_time).total_seconds(), "stages": timer.breakdown()}
             }
         except Exception as e:
+            timer.stop_profile()
             logger.error(f"Unexpected error for {self.candidate_id}: {str(e)}", exc_info=True)
             return {
                 "candidate_id": self.candidate_id,
                 "error": "Internal server error",
-                "metadata": {"status": "error", "processing_time": (datetime.now() - start_time).total_seconds()}
+                "metadata": {"status": "error", "retryable": True,
+                             "processing_time": (datetime.now() - start_time).total_seconds(), "stages": timer.breakdown()}
             }
\ No newline at end of file
@@ -0,0 +1,19 @@
+import hmac
+from django.conf import settings
+
+
+def _token_matches(token: str, expected: str) -> bool:
+    return bool(expected) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def is_service_request(request) -> bool:
+    """True when the caller presents the shared service token in `X-Service-Token`.
+
+    Service-only endpoints refuse every request while `SERVICE_TOKEN` is unset.
+    """
+    return _token_matches(request.headers.get('X-Service-Token', ''), settings.SERVICE_TOKEN)
+
+
+def is_metrics_scrape(request) -> bool:
+    """True when the caller sends `Authorization: Bearer <METRICS_SCRAPE_TOKEN>`; always False while it is unset."""
+    return _token_matches(request.headers.get('Authorization', '').replace('Bearer ', ''), settings.METRICS_SCRAPE_TOKEN)
@@ -0,0 +1,71 @@
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+import redis
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+from .logger import logger
+from .metrics import registry
+from .redis_client import redis_client
+
+# Bump when the cached entry or CandidateSerializer output changes so stale entries are ignored
+CACHE_VERSION = 1
+
+cache_requests = registry.counter("profile_cache_requests_total", "Candidate profile cache lookups by result.", ["result"])
+
+
+def profile_entry(user_id, data: Dict) -> Dict:
+    """A serialized profile with its owner, checked on hits, and the ETag of its body."""
+    body = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+    return {"user_id": str(user_id), "etag": f'"{hashlib.sha1(body.encode()).hexdigest()}"', "body": body}
+
+
+class ProfileCache:
+    """Serialized `CandidateSerializer` output in Redis, keyed by tenant and candidate.
+
+    Every write to a profile bumps the candidate's version stamp. Readers take the version
+    before loading from the database and store under it, so a read racing a write can only
+    leave an entry behind under a version nobody asks for any more.
+    """
+
+    def __init__(self, ttl: int, client=None):
+        self.ttl = ttl
+        self.client = client
+
+    def version_key(self, candidate_id) -> str:
+        return f"profile:v{CACHE_VERSION}:version:{candidate_id}"
+
+    def entry_key(self, tenant_id, candidate_id, version: int) -> str:
+        return f"profile:v{CACHE_VERSION}:{tenant_id or '-'}:{candidate_id}:{version}"
+
+    def lookup(self, tenant_id, candidate_id) -> Tuple[Optional[int], Optional[Dict]]:
+        """The current version stamp and the entry stored under it; (None, None) without Redis."""
+        if self.client is None:
+            return None, None
+        try:
+            version = int(self.client.get(self.version_key(candidate_id)) or 0)
+            raw = self.client.get(self.entry_key(tenant_id, candidate_id, version))
+        except redis.RedisError as e:
+            logger.warning(f"Profile cache read failed for {candidate_id}: {e}")
+            return None, None
+        cache_requests.inc(result="hit" if raw is not None else "miss")
+        return version, json.loads(raw) if raw is not None else None
+
+    def store(self, tenant_id, candidate_id, version: Optional[int], entry: Dict):
+        if self.client is None or version is None:
+            return
+        try:
+            self.client.setex(self.entry_key(tenant_id, candidate_id, version), self.ttl, json.dumps(entry))
+        except redis.RedisError as e:
+            logger.warning(f"Profile cache write failed for {candidate_id}: {e}")
+
+    def invalidate(self, candidate_id):
+        if self.client is None:
+            return
+        try:
+            self.client.incr(self.version_key(candidate_id))
+        except redis.RedisError as e:
+            logger.warning(f"Profile cache invalidation failed for {candidate_id}: {e}")
+
+
+profile_cache = ProfileCache(ttl=settings.PROFILE_CACHE_TTL, client=redis_client)
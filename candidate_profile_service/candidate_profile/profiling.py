@@ -0,0 +1,94 @@
+import cProfile
+import pstats
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from django.conf import settings
+from .logger import logger
+from .metrics import registry
+
+PROFILE_HEADER = "X-Profile-Parse"
+
+stage_seconds = registry.histogram("resume_parse_stage_seconds", "Time spent in each resume parse stage.", ["stage"])
+
+# Callables invoked as observer(stage, seconds, candidate_id) after every timed stage
+_stage_observers: List[Callable[[str, float, str], None]] = []
+
+
+def add_stage_observer(observer: Callable[[str, float, str], None]):
+    _stage_observers.append(observer)
+
+
+def remove_stage_observer(observer: Callable[[str, float, str], None]):
+    if observer in _stage_observers:
+        _stage_observers.remove(observer)
+
+
+def profile_requested(request) -> bool:
+    """Whether an upload asked for a cProfile capture; the header is only honoured when enabled in settings."""
+    return settings.PARSE_PROFILE_HEADER_ENABLED and request.headers.get(PROFILE_HEADER) == "1"
+
+
+class StageTimer:
+    """Times the stages of one parse and optionally profiles the whole run with cProfile."""
+
+    def __init__(self, candidate_id: str, profile: bool = False):
+        self.candidate_id = candidate_id
+        self.stages: Dict[str, float] = {}
+        self.profiler: Optional[cProfile.Profile] = None
+        self.profile = profile
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            stage_seconds.observe(elapsed, stage=name)
+            for observer in _stage_observers:
+                try:
+                    observer(name, elapsed, self.candidate_id)
+                except Exception as e:
+                    logger.warning(f"Parse stage observer failed: {e}")
+
+    def start_profile(self):
+        if not self.profile:
+            return
+        self.profiler = cProfile.Profile()
+        try:
+            self.profiler.enable()
+        except ValueError as e:
+            # Another profiler is already active on this thread
+            logger.warning(f"Parse profiling skipped: {e}")
+            self.profiler = None
+
+    def stop_profile(self) -> Optional[List[Dict]]:
+        if self.profiler is None:
+            return None
+        self.profiler.disable()
+        if settings.PARSE_PROFILE_DIR:
+            path = Path(settings.PARSE_PROFILE_DIR)
+            path.mkdir(parents=True, exist_ok=True)
+            self.profiler.dump_stats(path / f"{self.candidate_id}-{int(time.time() * 1000)}.prof")
+        stats = pstats.Stats(self.profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+        top = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            top.append({
+                "function": f"{Path(filename).name}:{line}({function})",
+                "calls": calls,
+                "own_seconds": round(own, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            })
+        top.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+        self.profiler = None
+        return top[:settings.PARSE_PROFILE_TOP]
+
+    def breakdown(self) -> Dict:
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "total": round(time.perf_counter() - self._start, 6),
+        }
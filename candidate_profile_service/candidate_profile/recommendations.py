@@ -0,0 +1,155 @@
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+import redis
+from django.conf import settings
+from .logger import logger
+from .metrics import registry
+from .redis_client import redis_client
+from .services import get_json, submit
+from .skills import coverage_scores
+
+# Bump when the cached entry format or the scoring changes so stale entries are ignored
+CACHE_VERSION = 2
+# Shared with job_listing_service (job_listing/events.py): change both together
+ALL_TENANTS = "all"
+
+cache_requests = registry.counter("job_recommendation_cache_requests_total", "Job recommendation cache lookups by result.", ["result"])
+
+
+def jobs_version_key(tenant_id) -> str:
+    return f"jobs:version:{tenant_id}"
+
+
+def service_headers(request) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {request.headers.get('Authorization', '').replace('Bearer ', '')}"
+        if request.headers.get('Authorization')
+        else ""
+    }
+
+
+# Helper function to fetch jobs from the job service: the closest to a candidate's skills, or the best matches for a search
+def fetch_recommended_jobs(headers, candidate_id, candidate_skills, k, search_query=None, timeout=None):
+    if search_query:
+        url, params = f"{settings.JOB_SERVICE_URL}/jobs/search/", {"q": search_query, "limit": k}
+    else:
+        url, params = f"{settings.JOB_SERVICE_URL}/jobs/recommend/", {"candidate_id": str(candidate_id), "k": k, "skills": candidate_skills}
+    return get_json(url, headers, params, timeout=timeout)
+
+
+def score_recommended_jobs(candidate_skills, jobs):
+    """Jobs covering more than 30% of the candidate's skills, best first."""
+    recommended_jobs = []
+    for job, match_score in zip(jobs, coverage_scores(candidate_skills, [job.get('key_skills', []) for job in jobs])):
+        if match_score > 30:
+            job['match_score'] = float(match_score)
+            recommended_jobs.append(job)
+    recommended_jobs.sort(key=lambda x: x['match_score'], reverse=True)
+    return recommended_jobs
+
+
+def skills_version(candidate_skills: List[str]) -> str:
+    """Changes whenever the candidate's set of skills does, whatever order they are stored in."""
+    skills = sorted({skill.strip().lower() for skill in candidate_skills})
+    return hashlib.sha1("\n".join(skills).encode()).hexdigest()[:16]
+
+
+class RecommendationCache:
+    """Scored job recommendations per tenant, candidate, skill set and search, in Redis.
+
+    Each entry records the tenant's jobs version, which the job service bumps whenever a job
+    is saved or deleted or the recommendation index is rebuilt. Entries from an older jobs
+    version, or older than `stale_after` seconds, are still served while one request per
+    key refreshes them in the background; `ttl` bounds how long they can be served at all.
+    """
+
+    def __init__(self, ttl: int, stale_after: int, refresh_timeout: int, client=None):
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self.refresh_timeout = refresh_timeout
+        self.client = client
+
+    def key(self, tenant_id, candidate_id, candidate_skills: List[str], search_query: str) -> str:
+        search = hashlib.sha1(search_query.strip().lower().encode()).hexdigest()[:16] if search_query else "-"
+        return f"jobrecs:v{CACHE_VERSION}:{tenant_id or '-'}:{candidate_id}:{skills_version(candidate_skills)}:{search}"
+
+    def jobs_version(self, tenant_id) -> int:
+        try:
+            return int(self.client.get(jobs_version_key(tenant_id or ALL_TENANTS)) or 0)
+        except redis.RedisError as e:
+            logger.warning(f"Jobs version read failed for tenant {tenant_id}: {e}")
+            return -1
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            raw = self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Job recommendation cache read failed: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, entry: Dict):
+        try:
+            self.client.setex(key, self.ttl, json.dumps(entry))
+        except redis.RedisError as e:
+            logger.warning(f"Job recommendation cache write failed: {e}")
+
+    def claim_refresh(self, key: str) -> bool:
+        """True for the one caller, across processes, that should refresh `key` now."""
+        try:
+            return bool(self.client.set(f"{key}:refreshing", 1, nx=True, ex=self.refresh_timeout))
+        except redis.RedisError as e:
+            logger.warning(f"Job recommendation refresh claim failed: {e}")
+            return False
+
+    def is_stale(self, entry: Dict, jobs_version: int) -> bool:
+        return entry["jobs_version"] != jobs_version or time.time() - entry["computed_at"] > self.stale_after
+
+    def compute(self, key: str, headers, candidate_id, candidate_skills: List[str], search_query: str, jobs_version: int) -> List[Dict]:
+        # jobs_version was read before the fetch, so a job change during it leaves the entry stale
+        jobs = fetch_recommended_jobs(headers, candidate_id, candidate_skills, settings.RECOMMENDED_JOBS_K, search_query)
+        scored = score_recommended_jobs(candidate_skills, jobs)
+        if self.client is not None and jobs_version >= 0:
+            self.set(key, {"jobs_version": jobs_version, "computed_at": time.time(), "jobs": scored})
+        return scored
+
+    def refresh(self, key: str, headers, candidate_id, candidate_skills: List[str], search_query: str, jobs_version: int):
+        try:
+            self.compute(key, headers, candidate_id, candidate_skills, search_query, jobs_version)
+        except Exception as e:
+            logger.warning(f"Background job recommendation refresh failed for candidate {candidate_id}: {e}")
+        finally:
+            try:
+                self.client.delete(f"{key}:refreshing")
+            except redis.RedisError:
+                pass
+
+    def recommended_jobs(self, headers, tenant_id, candidate_id, candidate_skills: List[str], search_query: str = "") -> List[Dict]:
+        """Scored recommendations; only a candidate's first request for a skill set and search waits on the job service."""
+        if self.client is None:
+            return self.compute(None, headers, candidate_id, candidate_skills, search_query, -1)
+
+        key = self.key(tenant_id, candidate_id, candidate_skills, search_query)
+        jobs_version = self.jobs_version(tenant_id)
+        entry = self.get(key)
+        if entry is None:
+            cache_requests.inc(result="miss")
+            return self.compute(key, headers, candidate_id, candidate_skills, search_query, jobs_version)
+
+        if self.is_stale(entry, jobs_version):
+            cache_requests.inc(result="stale")
+            if self.claim_refresh(key):
+                submit(self.refresh, key, headers, candidate_id, candidate_skills, search_query, jobs_version)
+        else:
+            cache_requests.inc(result="fresh")
+        return entry["jobs"]
+
+
+recommendation_cache = RecommendationCache(
+    ttl=settings.JOB_RECOMMENDATION_CACHE_TTL,
+    stale_after=settings.JOB_RECOMMENDATION_STALE_AFTER,
+    refresh_timeout=settings.JOB_RECOMMENDATION_REFRESH_TIMEOUT,
+    client=redis_client,
+)
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import joblib
+from django.conf import settings
+from sklearn.feature_extraction.text import TfidfVectorizer
+from .extraction import PdfPageStream
+from .job_vectors import vector_from_counts
+from .logger import logger
+from .metrics import registry
+from .models import CVParseJob
+
+GLOBAL_MODEL = "global"
+
+relevance_scores = registry.counter("resume_relevance_scores_total", "Relevance scores computed, by vectorizer source.", ["model"])
+
+
+def model_path(tenant_id=None) -> Path:
+    return Path(settings.TFIDF_MODEL_DIR) / f"{tenant_id or GLOBAL_MODEL}.joblib"
+
+
+def build_corpus(tenant_id=None) -> List[str]:
+    """Text of every stored CV and every distinct job description the tenant has parsed against."""
+    from .jobs import cv_storage  # jobs imports the parser, which imports this module
+
+    jobs = CVParseJob.objects.filter(status='succeeded')
+    if tenant_id:
+        jobs = jobs.filter(tenant_id=tenant_id)
+
+    documents = []
+    storage = cv_storage()
+    for file_path in jobs.values_list('file_path', flat=True).distinct():
+        try:
+            with storage.open(file_path, 'rb') as cv_file:
+                pages = PdfPageStream(cv_file.read(), settings.PDF_MAX_PAGES, settings.PDF_MAX_CHARS)
+                text = "\n".join(pages)
+        except Exception as e:
+            logger.warning(f"Skipping {file_path} while building TF-IDF corpus: {e}")
+            continue
+        if text.strip():
+            documents.append(text)
+
+    for job_role, job_description in jobs.values_list('job_role', 'job_description').distinct():
+        text = f"{job_description} {job_role}".strip()
+        if text:
+            documents.append(text)
+    return documents
+
+
+def fit_model(tenant_id=None, documents: Optional[List[str]] = None) -> Optional[Dict]:
+    """Fit and persist the tenant's vectorizer. Returns None when the corpus is too small to be useful."""
+    if documents is None:
+        documents = build_corpus(tenant_id)
+    if len(documents) < settings.TFIDF_MIN_DOCUMENTS:
+        logger.info(f"Not fitting TF-IDF model {tenant_id or GLOBAL_MODEL}: {len(documents)} documents "
+                    f"(need {settings.TFIDF_MIN_DOCUMENTS})")
+        return None
+
+    vectorizer = TfidfVectorizer(stop_words="english", max_features=settings.TFIDF_MAX_FEATURES, sublinear_tf=True)
+    vectorizer.fit(documents)
+
+    path = model_path(tenant_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so workers polling the file never load a partial model
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    joblib.dump(vectorizer, tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"Fitted TF-IDF model {path.name} on {len(documents)} documents ({len(vectorizer.vocabulary_)} terms)")
+    return {"path": str(path), "documents": len(documents), "terms": len(vectorizer.vocabulary_)}
+
+
+class VectorizerStore:
+    """Loads persisted vectorizers on first use and reloads them when the file on disk changes."""
+
+    def __init__(self):
+        self._models: Dict[str, Tuple[int, TfidfVectorizer]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, name: str) -> Optional[TfidfVectorizer]:
+        path = model_path(name)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._models.pop(name, None)
+            return None
+        cached = self._models.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            cached = self._models.get(name)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            try:
+                vectorizer = joblib.load(path)
+            except Exception as e:
+                logger.error(f"Failed to load TF-IDF model {path}: {e}")
+                return cached[1] if cached else None
+            self._models[name] = (mtime, vectorizer)
+            logger.info(f"Loaded TF-IDF model {path.name}")
+            return vectorizer
+
+    def get(self, tenant_id=None) -> Tuple[Optional[str], Optional[TfidfVectorizer]]:
+        """The tenant's model, else the global one, with the name of the model used."""
+        if tenant_id:
+            vectorizer = self._load(str(tenant_id))
+            if vectorizer is not None:
+                return "tenant", vectorizer
+        vectorizer = self._load(GLOBAL_MODEL)
+        if vectorizer is not None:
+            return GLOBAL_MODEL, vectorizer
+        return None, None
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+vectorizer_store = VectorizerStore()
+
+
+def score(vectorizer: TfidfVectorizer, resume_text: str, job_text: str, job_counts: Optional[Counter] = None) -> float:
+    """Pass the cached `job_counts` of a listed job to skip vectorising the job text."""
+    resume_vector = vectorizer.transform([resume_text])
+    job_vector = vector_from_counts(vectorizer, job_counts) if job_counts is not None else vectorizer.transform([job_text])
+    # Rows are L2-normalised by the vectorizer, so their dot product is the cosine similarity
+    return float(resume_vector.multiply(job_vector).sum())
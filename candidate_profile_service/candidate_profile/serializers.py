@@ -36,6 +36,7 @@ class InterviewSerializer(serializers.ModelSerializer):
         fields = ['id', 'application_id', 'scheduled_at', 'status', 'video_url', 'insights', 'created_at', 'updated_at']
 
 class CandidateSerializer(serializers.ModelSerializer):
+    """The full profile; read candidates through `Candidate.objects.with_profile()` to avoid a query per relation."""
     education = EducationSerializer(many=True, read_only=True)
     work_experience = WorkExperienceSerializer(many=True, read_only=True)
     skills = SkillSerializer(many=True, read_only=True)
@@ -48,4 +49,13 @@ class CandidateSerializer(serializers.ModelSerializer):
             'id', 'user_id', 'tenant_id', 'first_name', 'last_name', 'dob', 'gender', 'phone', 'location',
             'education', 'work_experience', 'skills', 'certifications', 'interviews', 'created_at', 'updated_at'
         ]
-        extra_kwargs = {'tenant_id': {'required': False, 'allow_null': True}}
\ No newline at end of file
+        extra_kwargs = {'tenant_id': {'required': False, 'allow_null': True}}
+
+class CandidateMatchSerializer(serializers.ModelSerializer):
+    """Only what the job service scores on; prefetch `skills` and `education` when serializing many."""
+    skills = serializers.SlugRelatedField(many=True, read_only=True, slug_field='skill_name')
+    education = serializers.SlugRelatedField(many=True, read_only=True, slug_field='degree')
+
+    class Meta:
+        model = Candidate
+        fields = ['id', 'first_name', 'last_name', 'skills', 'education']
@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Tuple
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from .logger import logger
+from .metrics import registry
+
+service_call_seconds = registry.histogram("service_call_seconds", "Latency of calls to other services.", ["call"])
+service_call_failures = registry.counter("service_call_failures_total", "Calls to other services that failed or missed their deadline.", ["call", "reason"])
+
+
+class ServiceError(Exception):
+    pass
+
+
+def build_session() -> requests.Session:
+    """Keep-alive connections to the other services, shared by every request thread in this process."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=settings.SERVICE_POOL_CONNECTIONS, pool_maxsize=settings.SERVICE_POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+session = build_session()
+# Requests are sync under WSGI, so concurrent calls within one request run on these threads
+_executor = ThreadPoolExecutor(max_workers=settings.SERVICE_FANOUT_WORKERS, thread_name_prefix="service-call")
+
+
+def get_json(url: str, headers: Dict[str, str], params=None, timeout: float = None) -> Any:
+    try:
+        response = session.get(url, params=params, headers=headers, timeout=timeout or settings.SERVICE_CALL_TIMEOUT)
+    except requests.RequestException as e:
+        raise ServiceError(str(e)) from e
+    if response.status_code != 200:
+        raise ServiceError(f"{response.status_code}: {response.text[:200]}")
+    return response.json()
+
+
+def submit(call: Callable[..., Any], *args) -> Future:
+    """Run `call` on the shared pool without waiting for it, e.g. to refresh a cache after responding."""
+    return _executor.submit(call, *args)
+
+
+def _timed(name: str, call: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    try:
+        return call()
+    finally:
+        service_call_seconds.observe(time.perf_counter() - started, call=name)
+
+
+class FanOut:
+    """Starts calls on the shared pool and collects whatever finished before a deadline.
+
+    Start the calls, do local work (ORM queries stay on the request thread), then `collect()`.
+    Each call should carry its own timeout no longer than the deadline so pool threads free up.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = time.monotonic() + deadline
+        self._futures = {}
+
+    def start(self, name: str, call: Callable[[], Any]):
+        self._futures[name] = _executor.submit(_timed, name, call)
+
+    def collect(self) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Results by name, and the reason for each call that has none."""
+        results, errors = {}, {}
+        for name, future in self._futures.items():
+            try:
+                results[name] = future.result(timeout=max(self.deadline - time.monotonic(), 0))
+            except FutureTimeout:
+                future.cancel()
+                errors[name] = "deadline exceeded"
+            except Exception as e:
+                errors[name] = str(e)
+        for name, reason in errors.items():
+            logger.warning(f"Service call {name} unavailable: {reason}")
+            service_call_failures.inc(call=name, reason="deadline" if reason == "deadline exceeded" else "error")
+        return results, errors
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .dashboard import refresh_interviews
+from .models import Interview, InterviewInsight
+from .profile_cache import profile_cache
+
+
+def interviews_changed(candidate_id):
+    # Interviews and their insights are part of both the dashboard and the serialized profile
+    def refresh():
+        refresh_interviews(candidate_id)
+        profile_cache.invalidate(candidate_id)
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Interview)
+@receiver(post_delete, sender=Interview)
+def refresh_dashboard_interviews(sender, instance, **kwargs):
+    interviews_changed(instance.candidate_id)
+
+
+@receiver(post_save, sender=InterviewInsight)
+@receiver(post_delete, sender=InterviewInsight)
+def refresh_dashboard_insights(sender, instance, **kwargs):
+    interview = Interview.objects.filter(id=instance.interview_id).only('candidate_id').first()
+    if interview is not None:
+        interviews_changed(interview.candidate_id)
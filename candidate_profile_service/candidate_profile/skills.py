@@ -0,0 +1,145 @@
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Canonical skill names and the spellings that should count as the same skill. Only spellings
+# and abbreviations of one skill belong here: related but distinct skills keep their own ids.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "javascript": ["js", "java script", "ecmascript", "es6", "es2015", "vanilla js"],
+    "typescript": ["ts"],
+    "python": ["python3", "py"],
+    "java": ["core java", "java se"],
+    "c++": ["cpp", "c plus plus"],
+    "c#": ["csharp", "c sharp"],
+    "go": ["golang"],
+    "ruby": [],
+    "php": [],
+    "rust": [],
+    "kotlin": [],
+    "swift": [],
+    "scala": [],
+    "sql": ["structured query language"],
+    "postgresql": ["postgres", "psql", "postgre sql"],
+    "mysql": ["my sql"],
+    "mongodb": ["mongo", "mongo db"],
+    "redis": [],
+    "elasticsearch": ["elastic search", "elastic"],
+    "django": ["django framework"],
+    "django rest framework": ["drf", "django rest"],
+    "flask": [],
+    "fastapi": ["fast api"],
+    "node.js": ["node", "nodejs", "node js"],
+    "express.js": ["express", "expressjs"],
+    "react": ["react.js", "reactjs", "react js"],
+    "angular": ["angular.js", "angularjs"],
+    "vue.js": ["vue", "vuejs"],
+    "next.js": ["nextjs", "next js"],
+    "spring boot": ["springboot"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "rest apis": ["rest", "restful", "rest api", "restful apis", "restful api"],
+    "graphql": ["graph ql"],
+    "docker": [],
+    "kubernetes": ["k8s", "kube"],
+    "terraform": [],
+    "ansible": [],
+    "aws": ["amazon web services"],
+    "azure": ["microsoft azure"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "ci/cd": ["cicd", "ci cd"],
+    "jenkins": [],
+    "git": [],
+    "linux": [],
+    "kafka": ["apache kafka"],
+    "rabbitmq": ["rabbit mq"],
+    "spark": ["apache spark"],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "natural language processing": ["nlp"],
+    "tensorflow": [],
+    "pytorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pandas": [],
+    "numpy": [],
+    "data analysis": ["data analytics"],
+    "microservices": ["micro services", "microservice architecture"],
+    "agile": [],
+}
+
+# Skills outside the dictionary are hashed into this many ids instead of growing the vocabulary
+UNKNOWN_SKILL_BUCKETS = 1 << 20
+
+VERSION_SUFFIX_RE = re.compile(r'\s+v?\d+(?:\.\d+)*$')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def clean_skill(skill: str) -> str:
+    """Lowercase, collapse whitespace and drop surrounding punctuation and a trailing version ("Python 3.11")."""
+    skill = WHITESPACE_RE.sub(" ", (skill or "").lower()).strip(" .,;:-•*")
+    return VERSION_SUFFIX_RE.sub("", skill)
+
+
+class SkillVocabulary:
+    """Maps skill spellings to integer ids: one id per canonical skill, shared by all of its aliases."""
+
+    def __init__(self, aliases: Dict[str, List[str]]):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for canonical, spellings in aliases.items():
+            skill_id = len(self.names)
+            self.names.append(canonical)
+            for spelling in (canonical, *spellings):
+                self._ids[clean_skill(spelling)] = skill_id
+        self.size = len(self.names) + UNKNOWN_SKILL_BUCKETS
+        # Job and candidate skill lists repeat the same strings, so cleaning each spelling once pays off
+        self.id_for = lru_cache(maxsize=65536)(self._id_for)
+
+    def normalize(self, skill: str) -> str:
+        cleaned = clean_skill(skill)
+        skill_id = self._ids.get(cleaned)
+        return self.names[skill_id] if skill_id is not None else cleaned
+
+    def _id_for(self, skill: str) -> Optional[int]:
+        cleaned = clean_skill(skill)
+        if not cleaned:
+            return None
+        skill_id = self._ids.get(cleaned)
+        if skill_id is None:
+            # crc32 rather than hash() so ids agree across processes
+            skill_id = len(self.names) + zlib.crc32(cleaned.encode()) % UNKNOWN_SKILL_BUCKETS
+        return skill_id
+
+    def ids(self, skills: Iterable[str]) -> set:
+        return {i for i in map(self.id_for, skills or []) if i is not None}
+
+    def matrix(self, skill_lists: Sequence[Iterable[str]]) -> csr_matrix:
+        """One binary row per skill list."""
+        indices, indptr = [], [0]
+        for skills in skill_lists:
+            indices.extend(self.ids(skills))
+            indptr.append(len(indices))
+        return csr_matrix(
+            (np.ones(len(indices)), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(skill_lists), self.size),
+        )
+
+
+vocabulary = SkillVocabulary(SKILL_ALIASES)
+
+
+def coverage_scores(candidate_skills: Iterable[str], required_skill_lists) -> np.ndarray:
+    """Percentage of each list's distinct skills that the candidate has, for all lists in one sparse product.
+
+    `required_skill_lists` may be a matrix from `vocabulary.matrix` so a job set is encoded once
+    and scored against many candidates.
+    """
+    required = required_skill_lists if isinstance(required_skill_lists, csr_matrix) else vocabulary.matrix(required_skill_lists)
+    if not required.shape[0]:
+        return np.zeros(0)
+    candidate = vocabulary.matrix([candidate_skills])
+    matched = (required @ candidate.T).toarray().ravel()
+    totals = np.maximum(required.getnnz(axis=1), 1)
+    return matched / totals * 100
@@ -1,9 +1,62 @@
-from django.test import TestCase
-from rest_framework.test import APIClient
-from .models import Candidate, Education
+from django.test import TestCase, SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from types import SimpleNamespace
+from .models import Candidate, CandidateDashboard, Certification, Education, Interview, InterviewInsight, Skill, WorkExperience, CVParseJob
+from .nlp import get_nlp, model_stats
+from .jobs import claim_next_job, cv_storage, enqueue_cv_parse, finish_job, requeue_stale_jobs, run_job
+from . import batch
+from .batch import _parse_chunk, candidate_id_from_filename, submit_batch
+from .parse_cache import parse_cache
+from .parser import ResumeParser, SectionDetector
+from .benchmark import benchmark_parser, generate_corpus, generate_pdf_corpus, load_corpus, run_text_stage, save_corpus
+from .relevance import fit_model, model_path, vectorizer_store
+from .job_vectors import term_counts, vector_from_counts
+from .profiling import add_stage_observer, remove_stage_observer
+from .skills import coverage_scores, vocabulary
+from .views import BatchCandidateProfilesView, BatchUploadCVView, DashboardView, GetCandidateProfileView, JobListView
+from .recommendations import ALL_TENANTS, jobs_version_key, recommendation_cache
+from .profile_cache import profile_cache, profile_entry
+from .dashboard import APPLICATION_DELETED, APPLICATION_SAVED, apply_application_event, build_dashboard, mark_recommendations_stale
+from audit.models import AuditLog
+from unittest import mock, skipIf
+from concurrent.futures import Future
+import time
+from django.core.files.base import ContentFile
+from django.conf import settings
+from django.db import connection
 from django.utils import timezone
+from django.core.management import call_command
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+import tempfile
+import zipfile
+import fitz
+import spacy
+import json
 import uuid
 
+def make_pdf(*pages):
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+class QueryCountMixin:
+    """Pins the number of queries an endpoint runs, and checks it stays the same as related rows grow."""
+
+    def assertQueryCount(self, expected, call, grow=None):
+        with self.assertNumQueries(expected):
+            response = call()
+        if grow is not None:
+            grow()
+            with self.assertNumQueries(expected):
+                call()
+        return response
+
 class CandidateTestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -68,4 +121,731 @@ class CandidateTestCase(TestCase):
         self.client.force_authenticate(user=None, token="dummy-token-no-tenant")
         response = self.client.post(f'/candidates/{self.candidate_without_tenant.id}/education/', data, format='json')
         self.assertEqual(response.status_code, 201)
-        self.assertIn("education_id", response.data)
\ No newline at end of file
+        self.assertIn("education_id", response.data)
+
+@override_settings(SPACY_MODEL="blank:en")
+class NLPModelRegistryTestCase(SimpleTestCase):
+    def test_model_loaded_once_per_process(self):
+        self.assertIs(get_nlp(), get_nlp())
+        self.assertIn("blank:en", model_stats())
+        self.assertIn("load_seconds", model_stats()["blank:en"])
+
+@override_settings(SPACY_MODEL="blank:en", MEDIA_ROOT=Path(tempfile.mkdtemp()), CV_JOB_TENANT_CONCURRENCY=1)
+class CVParseJobTestCase(TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=uuid.uuid4(), tenant_id=self.tenant_id, first_name="John", last_name="Doe")
+        self.filename = cv_storage().save("cv.pdf", ContentFile(make_pdf("John Doe\nPune, India\njohn@example.com | +91 9876543210\nSkills\nLanguages: Python, Django")))
+
+    def test_job_runs_and_stores_parsed_data(self):
+        job = enqueue_cv_parse(self.candidate, self.filename, "Engineer", "Build APIs", ["Python"])
+        claimed = claim_next_job()
+        self.assertEqual(claimed.id, job.id)
+        run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "succeeded")
+        self.assertIn("Django", job.parsed_data["skills"])
+
+    def test_stale_jobs_are_requeued_until_out_of_attempts(self):
+        job = enqueue_cv_parse(self.candidate, self.filename, "Engineer", "", [], max_attempts=2)
+        expired = timezone.now() - timedelta(seconds=settings.CV_JOB_LEASE + 1)
+        for expected in ("queued", "failed"):
+            claim_next_job()
+            CVParseJob.objects.filter(id=job.id).update(heartbeat_at=expired)
+            requeue_stale_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, expected)
+
+    def test_running_job_with_fresh_lease_is_left_alone(self):
+        job = enqueue_cv_parse(self.candidate, self.filename, "Engineer", "", [])
+        claim_next_job()
+        CVParseJob.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "running")
+
+    def test_unreadable_cv_fails_without_retry(self):
+        broken = cv_storage().save("broken.pdf", ContentFile(b"not a pdf"))
+        job = enqueue_cv_parse(self.candidate, broken, "Engineer", "", [])
+        run_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 1))
+
+    def test_crash_is_retried(self):
+        job = enqueue_cv_parse(self.candidate, self.filename, "Engineer", "", [])
+        with mock.patch("candidate_profile.jobs.ResumeParser.parse", side_effect=RuntimeError("boom")):
+            run_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ("queued", "boom"))
+
+    def test_outcome_of_a_reclaimed_job_is_dropped(self):
+        job = enqueue_cv_parse(self.candidate, self.filename, "Engineer", "", [])
+        claimed = claim_next_job()
+        CVParseJob.objects.filter(id=job.id).update(status="queued", available_at=timezone.now())
+        claim_next_job()
+        finish_job(claimed, None, "late failure")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), ("running", 2, ""))
+
+    def test_tenant_concurrency_limit(self):
+        enqueue_cv_parse(self.candidate, self.filename, "Engineer", "", [])
+        enqueue_cv_parse(self.candidate, self.filename, "Engineer", "", [])
+        self.assertIsNotNone(claim_next_job())
+        self.assertIsNone(claim_next_job())
+        self.assertEqual(CVParseJob.objects.filter(status="queued").count(), 1)
+
+@override_settings(METRICS_SCRAPE_TOKEN="scrape-secret")
+class MetricsEndpointTestCase(TestCase):
+    def test_scrape_token_without_jwt(self):
+        with mock.patch("candidate_profile.middleware.requests.post") as verify:
+            response = self.client.get('/metrics/', HTTP_AUTHORIZATION="Bearer scrape-secret")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b"# TYPE", response.content)
+            self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+            self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        verify.assert_not_called()
+
+    @override_settings(METRICS_SCRAPE_TOKEN="")
+    def test_refused_without_configured_token(self):
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+
+@override_settings(SPACY_MODEL="blank:en")
+class BatchParseTestCase(TestCase):
+    def test_candidate_id_from_archive_entry(self):
+        candidate_id = str(uuid.uuid4())
+        self.assertEqual(candidate_id_from_filename(f"batch/{candidate_id}_resume.pdf"), candidate_id)
+
+    def test_chunk_reports_per_file_results(self):
+        candidate = Candidate.objects.create(user_id=uuid.uuid4(), first_name="John", last_name="Doe")
+        items = [
+            {"filename": "good.pdf", "candidate_id": str(candidate.id),
+             "content": make_pdf("John Doe\nPune, India\njohn@example.com | +91 9876543210\nSkills\nLanguages: Python")},
+            {"filename": "broken.pdf", "candidate_id": str(candidate.id), "content": b"not a pdf"},
+        ]
+        results = _parse_chunk(items, "Engineer", "", ["Python"])
+        self.assertEqual([r["status"] for r in results], ["success", "error"])
+
+@override_settings(MEDIA_ROOT=Path(tempfile.mkdtemp()), SERVICE_TOKEN="service-secret", CV_PARSE_ASYNC=True,
+                   CV_BATCH_MAX_FILE_BYTES=1024, CV_BATCH_MAX_TOTAL_BYTES=1536)
+class BatchUploadCVViewTestCase(TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=uuid.uuid4(), tenant_id=self.tenant_id, first_name="John", last_name="Doe")
+        self.other_tenant = Candidate.objects.create(user_id=uuid.uuid4(), tenant_id=uuid.uuid4(), first_name="Max", last_name="Roe")
+
+    def archive(self, entries):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, content in entries.items():
+                zf.writestr(name, content)
+        buffer.seek(0)
+        buffer.name = "cvs.zip"
+        return buffer
+
+    def post(self, entries, tenant_id="tenant", token="service-secret"):
+        headers = {"HTTP_X_SERVICE_TOKEN": token} if token else {}
+        request = APIRequestFactory().post('/cv-batches/', {"archive": self.archive(entries)}, format='multipart', **headers)
+        request.user_id = uuid.uuid4()
+        request.tenant_id = self.tenant_id if tenant_id == "tenant" else tenant_id
+        force_authenticate(request, user=SimpleNamespace(is_authenticated=True, pk=request.user_id))
+        return BatchUploadCVView.as_view()(request)
+
+    def test_queues_a_job_per_cv_in_tenant(self):
+        response = self.post({f"{self.candidate.id}.pdf": b"%PDF", f"{self.other_tenant.id}.pdf": b"%PDF"})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["summary"]["queued"], 1)
+        self.assertEqual([r["status"] for r in response.data["results"]], ["queued", "failed"])
+        job = CVParseJob.objects.get()
+        self.assertEqual((job.candidate_id, job.status), (self.candidate.id, "queued"))
+        self.assertEqual(AuditLog.objects.get(action="Batch Upload CVs").tenant, str(self.tenant_id))
+
+    def test_requires_service_token_and_tenant(self):
+        self.assertEqual(self.post({f"{self.candidate.id}.pdf": b"%PDF"}, token=None).status_code, 403)
+        self.assertEqual(self.post({f"{self.candidate.id}.pdf": b"%PDF"}, token="wrong").status_code, 403)
+        self.assertEqual(self.post({f"{self.candidate.id}.pdf": b"%PDF"}, tenant_id=None).status_code, 400)
+        self.assertFalse(CVParseJob.objects.exists())
+
+    @override_settings(CV_PARSE_ASYNC=False, SPACY_MODEL="blank:en", CV_BATCH_MAX_FILE_BYTES=100000, CV_BATCH_MAX_TOTAL_BYTES=100000)
+    def test_parses_jobs_now_without_async(self):
+        pdf = make_pdf("John Doe\nPune, India\njohn@example.com | +91 9876543210\nSkills\nLanguages: Python")
+        def run_now(call, *args):
+            future = Future()
+            future.set_result(call(*args))
+            return future
+
+        # Parse in this process, where the test database is visible
+        with mock.patch("candidate_profile.batch.get_pool", return_value=SimpleNamespace(submit=run_now)):
+            response = self.post({f"{self.candidate.id}.pdf": pdf, f"{self.candidate.id}_old.pdf": b"not a pdf"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["status"] for r in response.data["results"]], ["succeeded", "failed"])
+        self.assertEqual(sorted(CVParseJob.objects.values_list("status", "attempts")), [("failed", 1), ("succeeded", 1)])
+
+    def test_refuses_oversized_entries_before_reading(self):
+        with mock.patch.object(zipfile.ZipFile, "read") as read:
+            self.assertEqual(self.post({f"{self.candidate.id}.pdf": b"0" * 2048}).status_code, 400)
+            self.assertEqual(self.post({f"{uuid.uuid4()}.pdf": b"0" * 1000, f"{uuid.uuid4()}.pdf": b"0" * 1000}).status_code, 400)
+        read.assert_not_called()
+
+@skipIf(connection.vendor == "sqlite", "pool processes cannot see an in-memory test database")
+@override_settings(MEDIA_ROOT=Path(tempfile.mkdtemp()), CV_PARSE_ASYNC=False, SPACY_MODEL="blank:en", CV_BATCH_PROCESSES=2)
+class BatchPoolTestCase(TransactionTestCase):
+    def setUp(self):
+        self.addCleanup(self.shutdown_pool)
+        self.tenant_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=uuid.uuid4(), tenant_id=self.tenant_id, first_name="John", last_name="Doe")
+
+    def shutdown_pool(self):
+        if batch._pool is not None:
+            batch._pool.shutdown()
+            batch._pool = None
+
+    def test_sync_batch_through_pool_keeps_parent_connection(self):
+        pdf = make_pdf("John Doe\nPune, India\njohn@example.com | +91 9876543210\nSkills\nLanguages: Python")
+        items = [{"filename": "cv.pdf", "candidate_id": str(self.candidate.id), "content": pdf}]
+        result = submit_batch(items, self.tenant_id, "Engineer", "", ["Python"])
+        self.assertEqual(result["summary"]["succeeded"], 1)
+        self.assertIsNotNone(result["summary"]["cvs_per_second"])
+        self.assertEqual(list(CVParseJob.objects.values_list("status", flat=True)), ["succeeded"])
+        self.assertTrue(Skill.objects.filter(candidate=self.candidate, source="cv").exists())
+
+@override_settings(SPACY_MODEL="blank:en")
+class ParseCacheTestCase(TestCase):
+    def setUp(self):
+        parse_cache.clear()
+        self.candidate = Candidate.objects.create(user_id=uuid.uuid4(), first_name="John", last_name="Doe")
+        self.pdf = make_pdf("John Doe\nPune, India\njohn@example.com | +91 9876543210\nSkills\nLanguages: Python, Django")
+
+    def test_stage_breakdown_and_profile(self):
+        seen = []
+        observer = lambda stage, seconds, candidate_id: seen.append(stage)
+        add_stage_observer(observer)
+        try:
+            parsed = ResumeParser(str(self.candidate.id), "Engineer", "Python APIs", ["Python"]).parse(self.pdf, profile=True)
+        finally:
+            remove_stage_observer(observer)
+        stages = parsed["metadata"]["stages"]["stages"]
+        self.assertEqual(set(stages), {"cache_lookup", "extract", "ner", "fields", "scoring", "db_save"})
+        self.assertEqual(set(seen), set(stages))
+        self.assertTrue(parsed["metadata"]["profile"])
+
+    def test_reupload_reuses_cached_stages_and_rescores(self):
+        first = ResumeParser(str(self.candidate.id), "Engineer", "Python APIs", ["Python"]).parse(self.pdf)
+        second = ResumeParser(str(self.candidate.id), "Engineer", "Go services", ["Go"]).parse(self.pdf)
+        self.assertEqual(first["metadata"]["cache"], "miss")
+        self.assertEqual(second["metadata"]["cache"], "hit")
+        self.assertEqual(first["metadata"]["sections_detected"], second["metadata"]["sections_detected"])
+        self.assertEqual(first["skill_match_score"], 100.0)
+        self.assertEqual(second["skill_match_score"], 100.0)
+        self.assertNotEqual(first["relevance_score"], second["relevance_score"])
+
+    def test_budget_change_misses_the_cache(self):
+        ResumeParser(str(self.candidate.id), "Engineer", "", []).parse(self.pdf)
+        with override_settings(PDF_MAX_CHARS=10):
+            parsed = ResumeParser(str(self.candidate.id), "Engineer", "", []).parse(self.pdf)
+        self.assertEqual(parsed["metadata"]["cache"], "miss")
+        self.assertTrue(parsed["metadata"]["extraction"]["truncated"])
+
+class SaveParsedDataTestCase(TestCase):
+    def setUp(self):
+        self.candidate = Candidate.objects.create(user_id=uuid.uuid4(), first_name="John", last_name="Doe", phone="123", location="Pune")
+        self.parser = ResumeParser(str(self.candidate.id), "Engineer", "", [])
+        self.parsed_data = {
+            "personal_info": {"first_name": "John", "last_name": "Doe", "phone": None, "location": None},
+            "education": [{"degree": "B.Tech", "institution": "IIT Bombay", "start_year": "2012"}],
+            "experience": [{"title": "Engineer", "company": "Acme", "duration": "Jan 2020 – Present"}],
+            "skills": ["Python", "Django"],
+            "certifications": [{"title": "AWS Certified"}],
+        }
+
+    def test_replace_does_not_duplicate_rows(self):
+        self.parser.save_to_db(self.parsed_data, mode="replace")
+        stats = self.parser.save_to_db(self.parsed_data, mode="replace")
+        self.assertEqual(self.candidate.skills.count(), 2)
+        self.assertEqual(self.candidate.work_experience.count(), 1)
+        self.assertEqual(stats["tables"][Skill._meta.db_table], {"inserted": 2, "deleted": 2, "unchanged": 0})
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.phone, "123")
+
+    def test_diff_only_writes_changes(self):
+        self.parser.save_to_db(self.parsed_data, mode="diff")
+        self.parsed_data["skills"] = ["Python", "Go"]
+        stats = self.parser.save_to_db(self.parsed_data, mode="diff")
+        self.assertEqual(stats["tables"][Skill._meta.db_table], {"inserted": 1, "deleted": 1, "unchanged": 1})
+        self.assertEqual(stats["tables"][WorkExperience._meta.db_table]["unchanged"], 1)
+        self.assertEqual(set(self.candidate.skills.values_list("skill_name", flat=True)), {"Python", "Go"})
+
+    def test_manual_rows_survive_reparses(self):
+        Skill.objects.create(candidate=self.candidate, skill_name="Kotlin")
+        Education.objects.create(candidate=self.candidate, degree="MBA", university="IIM", start_year=2018)
+        for mode in ("replace", "diff"):
+            self.parser.save_to_db(self.parsed_data, mode=mode)
+            self.assertEqual(set(self.candidate.skills.values_list("skill_name", flat=True)), {"Python", "Django", "Kotlin"})
+            self.assertEqual(set(self.candidate.education.values_list("degree", "source")), {("B.Tech", "cv"), ("MBA", "manual")})
+
+    def test_undated_entries_are_not_stored(self):
+        self.parsed_data["education"].append({"degree": "M.Tech", "institution": "IIT Delhi", "start_year": None})
+        self.parsed_data["experience"].append({"title": "Intern", "company": "Acme", "duration": ""})
+        stats = self.parser.save_to_db(self.parsed_data, mode="replace")
+        self.assertEqual(stats["tables"][Education._meta.db_table]["inserted"], 1)
+        self.assertEqual(list(self.candidate.work_experience.values_list("job_title", flat=True)), ["Engineer"])
+
+class StreamingExtractionTestCase(SimpleTestCase):
+    def setUp(self):
+        self.parser = ResumeParser("candidate", "Engineer", "", [])
+        self.pdf = make_pdf("John Doe\nSkills\nPython", "Work Experience\nEngineer", "Education\nB.Tech")
+
+    def test_sections_match_full_text_scan(self):
+        text, bounds = self.parser.extract_text_and_sections(self.pdf)
+        self.assertEqual(bounds, self.parser.find_section_bounds(text.split('\n')))
+        self.assertEqual(self.parser.extraction["pages"], 3)
+        self.assertIsNone(self.parser.extraction["truncated"])
+
+    @override_settings(PDF_MAX_PAGES=2)
+    def test_page_budget(self):
+        text = self.parser.extract_text_from_pdf(self.pdf)
+        self.assertNotIn("Education", text)
+        self.assertEqual(self.parser.extraction["truncated"], "pages")
+        self.assertEqual(self.parser.extraction["page_count"], 3)
+
+    @override_settings(PDF_MAX_CHARS=10)
+    def test_char_budget(self):
+        self.assertEqual(len(self.parser.extract_text_from_pdf(self.pdf)), 10)
+        self.assertEqual(self.parser.extraction["truncated"], "chars")
+
+    def test_detector_fed_in_pieces(self):
+        detector = SectionDetector(ResumeParser.HEADER_RE)
+        detector.feed(["John Doe", "Skills"])
+        detector.feed(["Python", "Education", "B.Tech"])
+        self.assertEqual(detector.close(), {"Skills": (2, 3), "Education": (4, 5)})
+
+class RelevanceModelTestCase(SimpleTestCase):
+    def setUp(self):
+        self.model_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(TFIDF_MODEL_DIR=self.model_dir.name, TFIDF_MIN_DOCUMENTS=2)
+        self.settings_override.enable()
+        vectorizer_store.clear()
+        self.documents = [item["text"] for item in generate_corpus(30)] + ["Backend engineer building Django REST APIs"]
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.model_dir.cleanup()
+        vectorizer_store.clear()
+
+    def test_falls_back_to_pairwise_without_model(self):
+        parser = ResumeParser("candidate", "Engineer", "Python Django", [], tenant_id="tenant-a")
+        self.assertGreater(parser.calculate_relevance_score("Python Django developer"), 0)
+        self.assertEqual(parser.relevance_model, "pairwise")
+
+    def test_tenant_model_is_used_and_reloaded(self):
+        fit_model(None, self.documents)
+        parser = ResumeParser("candidate", "Engineer", "Python Django", [], tenant_id="tenant-a")
+        self.assertGreater(parser.calculate_relevance_score("Python Django developer"), 0)
+        self.assertEqual(parser.relevance_model, "global")
+
+        fit_model("tenant-a", self.documents)
+        self.assertTrue(model_path("tenant-a").exists())
+        parser.calculate_relevance_score("Python Django developer")
+        self.assertEqual(parser.relevance_model, "tenant")
+
+    def test_cached_job_counts_match_transform(self):
+        fit_model(None, self.documents)
+        _, vectorizer = vectorizer_store.get()
+        job_text = "Backend engineer building Django REST APIs in Python"
+        expected = vectorizer.transform([job_text]).toarray()
+        self.assertTrue(((vector_from_counts(vectorizer, term_counts(job_text)).toarray() - expected) ** 2).sum() < 1e-12)
+
+    def test_small_corpus_is_not_fitted(self):
+        self.assertIsNone(fit_model("tenant-b", ["only one document"]))
+        self.assertFalse(model_path("tenant-b").exists())
+
+class SkillNormalizationTestCase(SimpleTestCase):
+    def test_aliases_share_an_id(self):
+        self.assertEqual({vocabulary.id_for(skill) for skill in ["JS", "Javascript", "ECMAScript", " javascript. "]},
+                         {vocabulary.id_for("JavaScript")})
+        self.assertEqual(vocabulary.normalize("Python 3.11"), "python")
+        self.assertNotEqual(vocabulary.id_for("Java"), vocabulary.id_for("JavaScript"))
+
+    def test_related_skills_keep_their_own_ids(self):
+        for skill, other in [("Scrum", "Agile"), ("Spring", "Spring Boot"), ("Next", "Next.js"), ("GitHub", "Git"), ("GitLab", "Git")]:
+            self.assertNotEqual(vocabulary.id_for(skill), vocabulary.id_for(other), skill)
+        self.assertEqual(vocabulary.id_for("K8s"), vocabulary.id_for("Kubernetes"))
+
+    def test_coverage_scores_for_many_jobs(self):
+        scores = coverage_scores(["JS", "Django", "Postgres"], [["JavaScript", "React"], ["PostgreSQL", "Django"], [], ["Go"]])
+        self.assertEqual(scores.tolist(), [50.0, 100.0, 0.0, 0.0])
+
+@override_settings(SPACY_MODEL="blank:en", NER_SCOPE="header", NER_HEADER_LINES=2)
+class HeaderNERTestCase(SimpleTestCase):
+    def setUp(self):
+        self.parser = ResumeParser("candidate", "Engineer", "", [])
+        self.lines = ["John Doe", "Pune, India", "Summary", "Engineer", "Personal Details", "DOB 1990", "Skills", "Python"]
+        self.bounds = self.parser.find_section_bounds(self.lines)
+        self.ner = spacy.blank("en")
+        self.ner.add_pipe("entity_ruler").add_patterns([{"label": "PERSON", "pattern": "John Doe"}, {"label": "GPE", "pattern": "Pune"}])
+
+    def test_header_block(self):
+        self.assertEqual(self.parser.header_text(self.lines, self.bounds).split("\n"), ["John Doe", "Pune, India", "DOB 1990"])
+        no_headers = ["John Doe", "Pune, India", "Built things"]
+        self.assertEqual(self.parser.header_text(no_headers, self.parser.find_section_bounds(no_headers)), "John Doe\nPune, India")
+
+    def test_name_and_location_in_header_skip_full_text(self):
+        text = "\n".join(self.lines)
+        header_doc = self.ner(self.parser.header_text(self.lines, self.bounds))
+        entities, scope = self.parser.extract_entities(text, self.lines, self.bounds, doc=header_doc, doc_scope="header")
+        self.assertEqual((entities, scope), ([("John Doe", "PERSON"), ("Pune", "GPE")], "header"))
+
+    def test_falls_back_to_full_text_without_location(self):
+        lines = ["John Doe", "Summary", "Engineer", "Skills", "Python", "Address", "Pune"]
+        bounds = self.parser.find_section_bounds(lines)
+        header_doc = self.ner(self.parser.header_text(lines, bounds))
+        with mock.patch.object(ResumeParser, "nlp", new=self.ner):
+            entities, scope = self.parser.extract_entities("\n".join(lines), lines, bounds, doc=header_doc, doc_scope="header")
+        self.assertEqual(scope, "full")
+        self.assertIn(("Pune", "GPE"), entities)
+
+    def test_falls_back_to_full_text_without_name(self):
+        _, scope = self.parser.extract_entities("\n".join(self.lines), self.lines, self.bounds)
+        self.assertEqual(scope, "full")
+
+@override_settings(SPACY_MODEL="blank:en")
+class ParserBenchmarkTestCase(TestCase):
+    def test_corpus_round_trip_and_dry_run(self):
+        corpus = generate_pdf_corpus(4, seed=7)
+        with tempfile.TemporaryDirectory() as directory:
+            save_corpus(corpus, directory)
+            loaded = load_corpus(directory)
+        self.assertEqual([item["expected"] for item in loaded], [item["expected"] for item in corpus])
+
+        result = benchmark_parser(loaded, warmup=0)
+        self.assertEqual(result["meta"]["errors"], 0)
+        self.assertEqual(result["accuracy"]["email"], 1.0)
+        self.assertLessEqual(result["latency_ms"]["p50"], result["latency_ms"]["p99"])
+        self.assertFalse(Skill.objects.exists())
+
+class ResumeTextStageTestCase(SimpleTestCase):
+    def setUp(self):
+        self.parser = ResumeParser("candidate", "Engineer", "", [])
+
+    def test_section_bounds(self):
+        lines = ["John Doe", "Technical Skills", "Python", "Work Experience", "Engineer", "Education", "B.Tech"]
+        bounds = self.parser.find_section_bounds(lines)
+        self.assertEqual(bounds, {"Technical Skills": (2, 3), "Work Experience": (4, 5), "Education": (6, 7)})
+
+    def test_synthetic_corpus_fields(self):
+        for item in generate_corpus(20):
+            result = run_text_stage(self.parser, item["text"])
+            self.assertEqual(result["personal_info"]["email"], item["expected"]["email"])
+            self.assertTrue(set(item["expected"]["skills"]) <= set(result["skills"]))
+            self.assertTrue(result["experience"])
+            self.assertEqual(len(result["certifications"]), 2)
+
+class CandidateProfileQueriesTestCase(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=self.user_id, first_name="Jane", last_name="Doe")
+        self.add_profile_rows()
+
+    def add_profile_rows(self):
+        Skill.objects.create(candidate=self.candidate, skill_name=f"Skill {uuid.uuid4().hex[:6]}")
+        Education.objects.create(candidate=self.candidate, degree="B.Tech", university="MIT", start_year=2015)
+        WorkExperience.objects.create(candidate=self.candidate, company_name="Acme", job_title="Engineer", start_date="2020-01-01")
+        Certification.objects.create(candidate=self.candidate, title="AWS", issued_by="Amazon")
+        interview = Interview.objects.create(candidate=self.candidate, application_id=uuid.uuid4(), scheduled_at=timezone.now())
+        InterviewInsight.objects.create(
+            interview=interview, overall_score=80, communication_score=70, technical_score=90, problem_solving_score=75
+        )
+        Interview.objects.create(candidate=self.candidate, application_id=uuid.uuid4(), scheduled_at=timezone.now())
+
+    def get_profile(self):
+        request = APIRequestFactory().get(f'/candidates/{self.candidate.id}/')
+        request.user_id, request.tenant_id = self.user_id, None
+        force_authenticate(request, user=SimpleNamespace(is_authenticated=True, pk=self.user_id))
+        return GetCandidateProfileView.as_view()(request, candidate_id=self.candidate.id)
+
+    def test_profile_queries_do_not_grow_with_profile(self):
+        # Candidate, five prefetches (interviews joined with insights) and the audit row
+        response = self.assertQueryCount(7, self.get_profile, grow=self.add_profile_rows)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["interviews"]), 2)
+        self.assertEqual(sum(interview["insights"] is not None for interview in response.data["interviews"]), 1)
+        self.assertEqual(len(self.get_profile().data["skills"]), 2)
+
+class FakeRedis:
+    """The few Redis commands the profile and recommendation caches use, in a dict."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        value = self.values.get(key)
+        return str(value).encode() if isinstance(value, int) else value
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.setex(key, ex, str(value))
+        return True
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+class ProfileCacheTestCase(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=self.user_id, first_name="Jane", last_name="Doe")
+        Skill.objects.create(candidate=self.candidate, skill_name="Python")
+        patcher = mock.patch.object(profile_cache, "client", FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_profile(self, user_id=None, **headers):
+        request = APIRequestFactory().get(f'/candidates/{self.candidate.id}/', **headers)
+        request.user_id, request.tenant_id = user_id or self.user_id, None
+        force_authenticate(request, user=SimpleNamespace(is_authenticated=True, pk=request.user_id))
+        return GetCandidateProfileView.as_view()(request, candidate_id=self.candidate.id)
+
+    def test_hits_skip_the_profile_queries(self):
+        first = self.get_profile()
+        # Only the audit row
+        second = self.assertQueryCount(1, self.get_profile)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(self.get_profile(user_id=uuid.uuid4()).status_code, 403)
+
+    def test_if_none_match_revalidates(self):
+        etag = self.get_profile()["ETag"]
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.get_profile(HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_writes_invalidate(self):
+        etag = self.get_profile()["ETag"]
+        Skill.objects.create(candidate=self.candidate, skill_name="Django")
+        # Cached until a write bumps the version stamp
+        self.assertEqual(self.get_profile(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        profile_cache.invalidate(self.candidate.id)
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["skills"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Interview.objects.create(candidate=self.candidate, application_id=uuid.uuid4(), scheduled_at=timezone.now())
+        self.assertEqual(len(self.get_profile().data["interviews"]), 1)
+
+    def test_read_racing_a_write_is_not_served(self):
+        version, _ = profile_cache.lookup(None, self.candidate.id)
+        profile_cache.invalidate(self.candidate.id)
+        profile_cache.store(None, self.candidate.id, version, profile_entry(self.user_id, {"stale": True}))
+        self.assertEqual(profile_cache.lookup(None, self.candidate.id), (version + 1, None))
+
+class JobRecommendationCacheTestCase(TestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=self.user_id, first_name="Jane", last_name="Doe")
+        Skill.objects.create(candidate=self.candidate, skill_name="Python")
+        self.redis = FakeRedis()
+        self.jobs = [{"id": "j1", "title": "Backend", "key_skills": ["Python"]}]
+        for patcher in (
+            mock.patch.object(recommendation_cache, "client", self.redis),
+            # Background refreshes run before the response so the test can see them
+            mock.patch("candidate_profile.recommendations.submit", side_effect=lambda call, *args: call(*args)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def list_jobs(self, **params):
+        request = APIRequestFactory().get('/jobs/', {"candidate_id": str(self.candidate.id), **params})
+        request.user_id, request.tenant_id = self.user_id, None
+        force_authenticate(request, user=SimpleNamespace(is_authenticated=True, pk=self.user_id))
+        jobs = [dict(job) for job in self.jobs]
+        with mock.patch("candidate_profile.services.session.get", return_value=mock.Mock(status_code=200, json=lambda: jobs)) as get:
+            response = JobListView.as_view()(request)
+        return [job["id"] for job in response.data["results"]], get.call_count
+
+    def test_cached_until_jobs_change_then_served_stale_while_refreshing(self):
+        self.assertEqual(self.list_jobs(), (["j1"], 1))
+        self.assertEqual(self.list_jobs(), (["j1"], 0))
+
+        self.jobs.append({"id": "j2", "title": "Data", "key_skills": ["Python"]})
+        self.redis.incr(jobs_version_key(ALL_TENANTS))
+        # The stale list is returned while the refresh runs
+        self.assertEqual(self.list_jobs(), (["j1"], 1))
+        self.assertEqual(self.list_jobs(), (["j1", "j2"], 0))
+
+    def test_keyed_by_skill_set_and_search(self):
+        self.list_jobs()
+        Skill.objects.create(candidate=self.candidate, skill_name="Django")
+        self.assertEqual(self.list_jobs()[1], 1)
+        self.assertEqual(self.list_jobs(search="backend")[1], 1)
+        self.assertEqual(self.list_jobs(search="Backend ")[1], 0)
+
+    def test_refresh_is_claimed_once(self):
+        self.list_jobs()
+        self.redis.incr(jobs_version_key(ALL_TENANTS))
+        key = next(key for key in self.redis.values if key.startswith("jobrecs:") and not key.endswith(":refreshing"))
+        self.assertTrue(recommendation_cache.claim_refresh(key))
+        # Another process holds the claim: no second fetch
+        self.assertEqual(self.list_jobs(), (["j1"], 0))
+
+    def test_without_redis_every_request_fetches(self):
+        with mock.patch.object(recommendation_cache, "client", None):
+            self.assertEqual(self.list_jobs()[1], 1)
+            self.assertEqual(self.list_jobs()[1], 1)
+
+class BatchCandidateProfilesTestCase(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=uuid.uuid4(), tenant_id=self.tenant_id, first_name="Jane", last_name="Doe")
+        Skill.objects.create(candidate=self.candidate, skill_name="Python")
+        Education.objects.create(candidate=self.candidate, degree="B.Tech", university="MIT", start_year=2015)
+        self.other_tenant = Candidate.objects.create(user_id=uuid.uuid4(), tenant_id=uuid.uuid4(), first_name="Max", last_name="Roe")
+
+    def post(self, ids, tenant_id="tenant", token="service-secret"):
+        headers = {"HTTP_X_SERVICE_TOKEN": token} if token else {}
+        request = APIRequestFactory().post('/candidates/batch/', {"ids": ids}, format='json', **headers)
+        request.user_id = uuid.uuid4()
+        request.tenant_id = self.tenant_id if tenant_id == "tenant" else tenant_id
+        force_authenticate(request, user=SimpleNamespace(is_authenticated=True, pk=request.user_id))
+        with override_settings(SERVICE_TOKEN="service-secret"):
+            return BatchCandidateProfilesView.as_view()(request)
+
+    def test_returns_slim_projections_in_tenant(self):
+        def grow():
+            Skill.objects.create(candidate=self.candidate, skill_name="Django")
+            Education.objects.create(candidate=self.candidate, degree="M.Tech", university="MIT", start_year=2019)
+
+        # Candidates, skills, education and the audit row
+        response = self.assertQueryCount(4, lambda: self.post([str(self.candidate.id), str(self.other_tenant.id)]), grow=grow)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["candidates"], [
+            {"id": str(self.candidate.id), "first_name": "Jane", "last_name": "Doe", "skills": ["Python"], "education": ["B.Tech"]}
+        ])
+        self.assertEqual(response.data["missing"], [str(self.other_tenant.id)])
+
+    def test_rejects_bad_ids(self):
+        self.assertEqual(self.post("not-a-list").status_code, 400)
+        self.assertEqual(self.post(["nope"]).status_code, 400)
+
+    def test_requires_service_token_and_tenant(self):
+        self.assertEqual(self.post([str(self.candidate.id)], token=None).status_code, 403)
+        self.assertEqual(self.post([str(self.candidate.id)], token="wrong").status_code, 403)
+        self.assertEqual(self.post([str(self.candidate.id)], tenant_id=None).status_code, 400)
+
+class DashboardReadModelTestCase(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.candidate = Candidate.objects.create(user_id=self.user_id, first_name="Jane", last_name="Doe")
+        Skill.objects.create(candidate=self.candidate, skill_name="Python")
+        self.jobs = [{"id": "j", "title": "Backend", "key_skills": ["Python"]}]
+
+    def application_event(self, application_id="a", status="applied", updated_at=None, event_type=APPLICATION_SAVED):
+        now = timezone.now()
+        updated_at = (updated_at or now).isoformat()
+        application = {"id": application_id, "candidate_id": str(self.user_id), "status": status,
+                       "applied_at": now.isoformat(), "updated_at": updated_at}
+        return {"type": event_type, "application_id": application_id, "candidate_id": str(self.user_id),
+                "updated_at": updated_at, "data": json.dumps(application)}
+
+    def fake_get(self, delay=0):
+        def get(url, **kwargs):
+            time.sleep(delay)
+            return mock.Mock(status_code=200, json=lambda: self.jobs)
+        return get
+
+    def dashboard(self, delay=0):
+        request = APIRequestFactory().get(f'/candidates/{self.candidate.id}/dashboard/')
+        request.user_id, request.tenant_id = self.user_id, None
+        force_authenticate(request, user=SimpleNamespace(is_authenticated=True, pk=self.user_id))
+        with mock.patch("candidate_profile.services.session.get", side_effect=self.fake_get(delay)) as get:
+            response = DashboardView.as_view()(request, candidate_id=self.candidate.id)
+        return response, get.call_count
+
+    def test_application_events_update_stats(self):
+        self.assertTrue(apply_application_event(self.application_event(status="applied")))
+        self.assertTrue(apply_application_event(self.application_event(status="shortlisted", updated_at=timezone.now() + timedelta(seconds=1))))
+        # Replayed older events do not undo newer ones
+        apply_application_event(self.application_event(status="applied", updated_at=timezone.now() - timedelta(days=1)))
+        apply_application_event(self.application_event("b"))
+
+        response, _ = self.dashboard()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["stats"]["jobs_applied"], 2)
+        self.assertEqual(response.data["stats"]["recruiter_actions"], 1)
+        self.assertEqual(len(response.data["recent_applications"]), 2)
+
+        apply_application_event(self.application_event("b", event_type=APPLICATION_DELETED, updated_at=timezone.now() + timedelta(seconds=1)))
+        # A save replayed after the delete does not bring the application back
+        apply_application_event(self.application_event("b"))
+        response, _ = self.dashboard()
+        self.assertEqual(response.data["stats"]["jobs_applied"], 1)
+        self.assertEqual(len(response.data["recent_applications"]), 1)
+
+    def test_event_for_unknown_candidate_is_dropped(self):
+        event = self.application_event()
+        event["candidate_id"] = str(uuid.uuid4())
+        self.assertFalse(apply_application_event(event))
+
+    def test_recommendations_are_kept_until_skills_change(self):
+        response, calls = self.dashboard()
+        self.assertEqual(calls, 1)
+        self.assertEqual([job["id"] for job in response.data["recommended_jobs"]], ["j"])
+        self.assertEqual(response.data["unavailable"], [])
+
+        # Fresh recommendations: the candidate and its dashboard row in one query
+        response, calls = self.assertQueryCount(1, self.dashboard, grow=lambda: apply_application_event(self.application_event("b")))
+        self.assertEqual(calls, 0)
+        self.assertEqual([job["id"] for job in response.data["recommended_jobs"]], ["j"])
+
+        mark_recommendations_stale(self.candidate.id)
+        _, calls = self.dashboard()
+        self.assertEqual(calls, 1)
+
+    @override_settings(DASHBOARD_DEADLINE=0.2)
+    def test_slow_recommendations_give_partial_dashboard(self):
+        started = time.monotonic()
+        response, _ = self.dashboard(delay=1.0)
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["unavailable"], ["recommended_jobs"])
+        self.assertIsNone(response.data["recommended_jobs"])
+
+    def test_interviews_update_dashboard(self):
+        build_dashboard(self.candidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            Interview.objects.create(candidate=self.candidate, application_id=uuid.uuid4(), scheduled_at=timezone.now() + timedelta(days=2))
+            interview = Interview.objects.create(
+                candidate=self.candidate, application_id=uuid.uuid4(), scheduled_at=timezone.now(),
+                status='COMPLETED', video_url="https://example.com/video.mp4"
+            )
+            InterviewInsight.objects.create(
+                interview=interview, overall_score=80, communication_score=70, technical_score=90, problem_solving_score=75,
+                skills_detected=["Python"]
+            )
+
+        dashboard = CandidateDashboard.objects.get(candidate=self.candidate)
+        self.assertEqual(len(dashboard.interview_schedules), 1)
+        self.assertEqual(dashboard.video_url, "https://example.com/video.mp4")
+        self.assertEqual(dashboard.insights["overall_score"], 80)
+
+    def test_rebuild_command(self):
+        apply_application_event(self.application_event())
+        Interview.objects.create(candidate=self.candidate, application_id=uuid.uuid4(), scheduled_at=timezone.now())
+        CandidateDashboard.objects.filter(candidate=self.candidate).update(interview_schedules=[])
+
+        call_command("rebuild_dashboards", stdout=StringIO())
+        dashboard = CandidateDashboard.objects.get(candidate=self.candidate)
+        self.assertEqual(len(dashboard.interview_schedules), 1)
+        self.assertEqual(len(dashboard.applications), 1)
+
+        call_command("rebuild_dashboards", "--reset-applications", "--candidate", str(self.candidate.id), stdout=StringIO())
+        self.assertEqual(CandidateDashboard.objects.get(candidate=self.candidate).applications, {})
@@ -2,8 +2,11 @@ from django.urls import path
 from .views import (
     CreateCandidateProfileView,
     GetCandidateProfileView,
+    BatchCandidateProfilesView,
     UpdateCandidateProfileView,
     UploadCVView,
+    CVParseJobStatusView,
+    BatchUploadCVView,
     AddEducationView,
     AddWorkExperienceView,
     AddSkillView,
@@ -20,15 +23,19 @@ from .views import (
     StartInterviewView,
     DashboardView,
     NotificationListView,
-    MarkNotificationReadView
+    MarkNotificationReadView,
+    MetricsView
 )
 
 urlpatterns = [
     # Core Profile Operations
     path('candidates/', CreateCandidateProfileView.as_view(), name='create_candidate'),
+    path('candidates/batch/', BatchCandidateProfilesView.as_view(), name='batch_get_candidates'),
     path('candidates/<uuid:candidate_id>/', GetCandidateProfileView.as_view(), name='get_candidate'),
     path('candidates/<uuid:candidate_id>/update/', UpdateCandidateProfileView.as_view(), name='update_candidate'),
     path('candidates/<uuid:candidate_id>/upload-cv/', UploadCVView.as_view(), name='upload_cv'),
+    path('candidates/<uuid:candidate_id>/cv-jobs/<uuid:job_id>/', CVParseJobStatusView.as_view(), name='cv_job_status'),
+    path('cv-batches/', BatchUploadCVView.as_view(), name='batch_upload_cv'),
 
     # Add Related Data
     path('candidates/<uuid:candidate_id>/education/', AddEducationView.as_view(), name='add_education'),
@@ -58,4 +65,7 @@ urlpatterns = [
     # Notifications
     path('candidates/<uuid:candidate_id>/notifications/', NotificationListView.as_view(), name='notification_list'),
     path('notifications/<uuid:notification_id>/mark-read/', MarkNotificationReadView.as_view(), name='mark_notification_read'),
+
+    # Operations
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
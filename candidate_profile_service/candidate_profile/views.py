@@ -3,23 +3,33 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import filters
-from django.core.files.storage import FileSystemStorage
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django.utils import timezone
-from datetime import timedelta
-from .models import Candidate, Education, WorkExperience, Skill, Certification, Interview, InterviewInsight
+from .models import Candidate, CandidateDashboard, Education, WorkExperience, Skill, Certification, Interview, InterviewInsight, CVParseJob
 from .serializers import (
-    CandidateSerializer, EducationSerializer, WorkExperienceSerializer,
-    SkillSerializer, CertificationSerializer, InterviewSerializer, InterviewInsightSerializer
+    CandidateSerializer, CandidateMatchSerializer, EducationSerializer, WorkExperienceSerializer,
+    SkillSerializer, CertificationSerializer, InterviewSerializer
 )
 from .logger import logger
 from audit.models import AuditLog
-from .parser import ResumeParser
+from .jobs import cv_storage, enqueue_cv_parse, run_inline
+from .batch import BatchUploadError, check_batch_size, read_archive, submit_batch
+from .permissions import is_metrics_scrape, is_service_request
+from .metrics import registry as metrics_registry
+from .profiling import profile_requested
+from .services import FanOut, ServiceError
+from .recommendations import fetch_recommended_jobs, recommendation_cache, score_recommended_jobs, service_headers
+from .profile_cache import profile_cache, profile_entry
+from .dashboard import build_dashboard, dashboard_payload, mark_recommendations_stale, recommendations_stale, store_recommendations
 from django.conf import settings
-from django.views.decorators.cache import cache_page
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from django.utils.decorators import method_decorator
 from ratelimit.decorators import ratelimit
 import requests
 import random
+import json
+import uuid
 
 # Custom Pagination Class
 class StandardResultsSetPagination(PageNumberPagination):
@@ -84,20 +94,27 @@ class CreateCandidateProfileView(APIView):
 class GetCandidateProfileView(APIView):
     def get(self, request, candidate_id):
         try:
-            filters = {'id': candidate_id}
-            if hasattr(request, 'tenant_id') and request.tenant_id:
-                filters['tenant_id'] = request.tenant_id
-            candidate = Candidate.objects.get(**filters)
-            if str(candidate.user_id) != str(request.user_id):
+            tenant_id = request.tenant_id if hasattr(request, 'tenant_id') else None
+            version, entry = profile_cache.lookup(tenant_id, candidate_id)
+            if entry is None:
+                filters = {'id': candidate_id}
+                if tenant_id:
+                    filters['tenant_id'] = tenant_id
+                candidate = Candidate.objects.with_profile().get(**filters)
+                entry = profile_entry(candidate.user_id, CandidateSerializer(candidate).data)
+                profile_cache.store(tenant_id, candidate_id, version, entry)
+            if entry["user_id"] != str(request.user_id):
                 logger.warning(f"Unauthorized access to candidate {candidate_id} by user {request.user_id}")
                 return Response({"error": "Unauthorized", "details": "You do not own this profile"}, status=status.HTTP_403_FORBIDDEN)
 
-            serializer = CandidateSerializer(candidate)
             AuditLog.objects.create(
-                user_id=request.user_id, action="Get Candidate Profile", tenant_id=request.tenant_id,
+                user_id=request.user_id, action="Get Candidate Profile", tenant=str(tenant_id or ''),
                 details={"candidate_id": str(candidate_id)}
             )
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            etags = parse_etags(request.headers.get('If-None-Match', ''))
+            if entry["etag"] in etags or '*' in etags:
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": entry["etag"]})
+            return Response(json.loads(entry["body"]), status=status.HTTP_200_OK, headers={"ETag": entry["etag"]})
         except Candidate.DoesNotExist:
             logger.warning(f"Candidate not found: {candidate_id}")
             return Response({"error": "Not found", "details": "Candidate does not exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -105,6 +122,41 @@ class GetCandidateProfileView(APIView):
             logger.error(f"Profile retrieval failed: {e}")
             return Response({"error": "Retrieval failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class BatchCandidateProfilesView(APIView):
+    """Slim skill and education projections of many candidates, for the job service's matcher."""
+    def post(self, request):
+        try:
+            if not is_service_request(request):
+                logger.warning(f"Batch profile fetch refused for user {request.user_id}: no service token")
+                return Response({"error": "Unauthorized", "details": "Service token required"}, status=status.HTTP_403_FORBIDDEN)
+            if not (hasattr(request, 'tenant_id') and request.tenant_id):
+                return Response({"error": "Invalid request", "details": "Batch profile fetches must be scoped to a tenant"}, status=status.HTTP_400_BAD_REQUEST)
+            ids = request.data.get('ids')
+            if not isinstance(ids, list) or not ids:
+                return Response({"error": "Invalid request", "details": "ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > settings.CANDIDATE_BATCH_MAX_IDS:
+                return Response({"error": "Invalid request", "details": f"At most {settings.CANDIDATE_BATCH_MAX_IDS} ids per request"}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                ids = {uuid.UUID(str(candidate_id)) for candidate_id in ids}
+            except ValueError:
+                return Response({"error": "Invalid request", "details": "ids must be UUIDs"}, status=status.HTTP_400_BAD_REQUEST)
+
+            candidates = Candidate.objects.filter(id__in=ids, tenant_id=request.tenant_id).only('id', 'first_name', 'last_name').prefetch_related(
+                Prefetch('skills', queryset=Skill.objects.only('candidate_id', 'skill_name')),
+                Prefetch('education', queryset=Education.objects.only('candidate_id', 'degree')),
+            )
+            data = CandidateMatchSerializer(candidates, many=True).data
+            missing = ids - {candidate.id for candidate in candidates}
+
+            AuditLog.objects.create(
+                user_id=request.user_id, action="Batch Get Candidate Profiles", tenant=str(request.tenant_id or ''),
+                details={"requested": len(ids), "returned": len(data)}
+            )
+            return Response({"candidates": data, "missing": sorted(str(candidate_id) for candidate_id in missing)}, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Batch profile retrieval failed: {e}")
+            return Response({"error": "Retrieval failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class UpdateCandidateProfileView(APIView):
     def put(self, request, candidate_id):
         try:
@@ -120,6 +172,7 @@ class UpdateCandidateProfileView(APIView):
             serializer.is_valid(raise_exception=True)
 
             serializer.save()
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Update Candidate Profile", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate_id)}
@@ -159,20 +212,44 @@ class UploadCVView(APIView):
                 logger.warning(f"No CV file provided for candidate {candidate_id}")
                 return Response({"error": "No file provided", "details": "CV file is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-            fs = FileSystemStorage(location=settings.MEDIA_ROOT / 'cvs')
+            fs = cv_storage()
             filename = fs.save(f"{candidate_id}_{cv_file.name}", cv_file)
 
             job_role = request.data.get('job_role', 'Unknown')
             job_description = request.data.get('job_description', '')
             key_skills = request.data.get('key_skills', [])
-            parser = ResumeParser(str(candidate_id), job_role, job_description, key_skills)
-            cv_file.seek(0)
-            pdf_content = cv_file.read()
-            parsed_data = parser.parse(pdf_content)
-
-            if parsed_data["metadata"]["status"] == "error":
-                logger.error(f"CV parsing failed: {parsed_data['error']}")
-                return Response({"error": "Parsing failed", "details": parsed_data["error"]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            # Jobs from the job service reuse its cached job-side term counts for relevance scoring
+            job_listing_id = request.data.get('job_listing_id') or None
+            profile = profile_requested(request)
+
+            if settings.CV_PARSE_ASYNC:
+                job = enqueue_cv_parse(candidate, filename, job_role, job_description, key_skills,
+                                       job_listing_id=job_listing_id, profile=profile)
+                send_notification(
+                    user_id=request.user_id,
+                    tenant_id=request.tenant_id,
+                    message=f"Your CV ({cv_file.name}) has been uploaded and is being parsed.",
+                    recipient=request.user_id,
+                    request=request
+                )
+                AuditLog.objects.create(
+                    user_id=request.user_id, action="Upload CV", tenant=str(request.tenant_id or ''),
+                    details={"candidate_id": str(candidate_id), "filename": filename, "job_id": str(job.id)}
+                )
+                logger.info(f"CV uploaded and queued for candidate: {candidate_id}")
+                return Response({
+                    "message": "CV uploaded, parsing queued",
+                    "file_path": fs.url(filename),
+                    "job_id": str(job.id),
+                    "status_url": f"/candidates/{candidate_id}/cv-jobs/{job.id}/"
+                }, status=status.HTTP_202_ACCEPTED)
+
+            job = run_inline(enqueue_cv_parse(candidate, filename, job_role, job_description, key_skills,
+                                              max_attempts=1, job_listing_id=job_listing_id, profile=profile))
+            if job.status != 'succeeded':
+                logger.error(f"CV parsing failed: {job.error}")
+                return Response({"error": "Parsing failed", "details": job.error}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            parsed_data = job.parsed_data
 
             # Send notification
             send_notification(
@@ -184,13 +261,14 @@ class UploadCVView(APIView):
             )
 
             AuditLog.objects.create(
-                user_id=request.user_id, action="Upload and Parse CV", tenant_id=request.tenant_id,
+                user_id=request.user_id, action="Upload and Parse CV", tenant=str(request.tenant_id or ''),
                 details={"candidate_id": str(candidate_id), "filename": filename}
             )
             logger.info(f"CV uploaded and parsed for candidate: {candidate_id}")
             return Response({
                 "message": "CV uploaded and parsed successfully",
                 "file_path": fs.url(filename),
+                "job_id": str(job.id),
                 "parsed_data": parsed_data
             }, status=status.HTTP_200_OK)
         except Candidate.DoesNotExist:
@@ -200,6 +278,86 @@ class UploadCVView(APIView):
             logger.error(f"CV upload failed: {e}")
             return Response({"error": "Upload failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class CVParseJobStatusView(APIView):
+    def get(self, request, candidate_id, job_id):
+        try:
+            filters = {'id': job_id, 'candidate_id': candidate_id}
+            if hasattr(request, 'tenant_id') and request.tenant_id:
+                filters['tenant_id'] = request.tenant_id
+            job = CVParseJob.objects.select_related('candidate').get(**filters)
+            if str(job.candidate.user_id) != str(request.user_id):
+                logger.warning(f"Unauthorized access to CV job {job_id} by user {request.user_id}")
+                return Response({"error": "Unauthorized", "details": "You do not own this profile"}, status=status.HTTP_403_FORBIDDEN)
+
+            data = {
+                "job_id": str(job.id),
+                "candidate_id": str(job.candidate_id),
+                "status": job.status,
+                "attempts": job.attempts,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            }
+            if job.status == 'succeeded':
+                data["parsed_data"] = job.parsed_data
+            elif job.error:
+                data["error"] = job.error
+            return Response(data, status=status.HTTP_200_OK)
+        except CVParseJob.DoesNotExist:
+            logger.warning(f"CV parse job not found: {job_id}")
+            return Response({"error": "Not found", "details": "CV parse job does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"CV job status retrieval failed: {e}")
+            return Response({"error": "Retrieval failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class BatchUploadCVView(APIView):
+    """Bulk CV ingestion for other services; every entry becomes a CV parse job in the caller's tenant."""
+    def post(self, request):
+        try:
+            if not is_service_request(request):
+                logger.warning(f"CV batch upload refused for user {request.user_id}: no service token")
+                return Response({"error": "Unauthorized", "details": "Service token required"}, status=status.HTTP_403_FORBIDDEN)
+            tenant_id = request.tenant_id if hasattr(request, 'tenant_id') else None
+            if not tenant_id:
+                return Response({"error": "Invalid batch", "details": "Batch uploads must be scoped to a tenant"}, status=status.HTTP_400_BAD_REQUEST)
+
+            archive = request.FILES.get('archive')
+            if archive:
+                items = read_archive(archive)
+            else:
+                cv_files = request.FILES.getlist('cvs')
+                candidate_ids = request.data.getlist('candidate_ids')
+                if len(cv_files) != len(candidate_ids):
+                    logger.warning(f"CV batch upload with {len(cv_files)} files and {len(candidate_ids)} candidate ids")
+                    return Response({"error": "Invalid batch", "details": "Provide one candidate_id per CV file"}, status=status.HTTP_400_BAD_REQUEST)
+                check_batch_size([(cv_file.name, cv_file.size) for cv_file in cv_files])
+                items = [
+                    {"filename": cv_file.name, "candidate_id": candidate_id, "content": cv_file.read()}
+                    for cv_file, candidate_id in zip(cv_files, candidate_ids)
+                ]
+            if not items:
+                logger.warning("Empty CV batch upload")
+                return Response({"error": "No file provided", "details": "Upload a zip archive or a list of CV files"}, status=status.HTTP_400_BAD_REQUEST)
+
+            job_role = request.data.get('job_role', 'Unknown')
+            job_description = request.data.get('job_description', '')
+            key_skills = request.data.getlist('key_skills') if hasattr(request.data, 'getlist') else request.data.get('key_skills', [])
+            job_listing_id = request.data.get('job_listing_id') or None
+            result = submit_batch(items, tenant_id, job_role, job_description, key_skills, job_listing_id=job_listing_id)
+
+            AuditLog.objects.create(
+                user_id=request.user_id, action="Batch Upload CVs", tenant=str(tenant_id or ''),
+                details=result["summary"]
+            )
+            logger.info(f"CV batch processed: {result['summary']}")
+            return Response(result, status=status.HTTP_202_ACCEPTED if settings.CV_PARSE_ASYNC else status.HTTP_200_OK)
+        except BatchUploadError as e:
+            logger.warning(f"CV batch upload rejected: {e}")
+            return Response({"error": "Invalid batch", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"CV batch upload failed: {e}")
+            return Response({"error": "Batch upload failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class AddEducationView(APIView):
     def post(self, request, candidate_id):
         try:
@@ -215,6 +373,7 @@ class AddEducationView(APIView):
             serializer.is_valid(raise_exception=True)
 
             education = serializer.save(candidate=candidate)
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Add Education", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate_id), "education_id": str(education.id)}
@@ -253,6 +412,7 @@ class AddWorkExperienceView(APIView):
             serializer.is_valid(raise_exception=True)
 
             work_exp = serializer.save(candidate=candidate)
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Add Work Experience", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate_id), "work_experience_id": str(work_exp.id)}
@@ -291,6 +451,8 @@ class AddSkillView(APIView):
             serializer.is_valid(raise_exception=True)
 
             skill = serializer.save(candidate=candidate)
+            mark_recommendations_stale(candidate.id)
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Add Skill", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate_id), "skill_id": str(skill.id)}
@@ -329,6 +491,7 @@ class AddCertificationView(APIView):
             serializer.is_valid(raise_exception=True)
 
             certification = serializer.save(candidate=candidate)
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Add Certification", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate_id), "certification_id": str(certification.id)}
@@ -366,6 +529,7 @@ class EditPersonalInfoView(APIView):
             serializer.is_valid(raise_exception=True)
 
             serializer.save()
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Edit Personal Info", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate_id)}
@@ -401,7 +565,9 @@ class EditEducationView(APIView):
             serializer = EducationSerializer(education, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
 
-            serializer.save()
+            # An edited row is the candidate's now, so later CV parses leave it alone
+            serializer.save(source='manual')
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Edit Education", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate.id), "education_id": str(education_id)}
@@ -437,7 +603,8 @@ class EditWorkExperienceView(APIView):
             serializer = WorkExperienceSerializer(work_exp, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
 
-            serializer.save()
+            serializer.save(source='manual')
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Edit Work Experience", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate.id), "work_experience_id": str(work_experience_id)}
@@ -473,7 +640,9 @@ class EditSkillView(APIView):
             serializer = SkillSerializer(skill, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
 
-            serializer.save()
+            serializer.save(source='manual')
+            mark_recommendations_stale(candidate.id)
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Edit Skill", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate.id), "skill_id": str(skill_id)}
@@ -509,7 +678,8 @@ class EditCertificationView(APIView):
             serializer = CertificationSerializer(certification, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
 
-            serializer.save()
+            serializer.save(source='manual')
+            profile_cache.invalidate(candidate.id)
             AuditLog.objects.create(
                 user_id=request.user_id, action="Edit Certification", tenant_id=request.tenant_id,
                 details={"candidate_id": str(candidate.id), "certification_id": str(certification_id)}
@@ -538,8 +708,7 @@ class JobListView(APIView):
     filter_backends = [filters.SearchFilter]
     search_fields = ['title', 'company__name', 'location', 'description']
 
-    @ratelimit(key='ip', rate='100/h', method='GET', block=True)
-    @cache_page(60 * 15)
+    @method_decorator(ratelimit(key='ip', rate='100/h', method='GET', block=True))
     def get(self, request):
         try:
             candidate_id = request.query_params.get('candidate_id')
@@ -555,41 +724,17 @@ class JobListView(APIView):
                 logger.warning(f"Unauthorized access to candidate {candidate_id} by user {request.user_id}")
                 return Response({"error": "Unauthorized", "details": "You do not own this profile"}, status=status.HTTP_403_FORBIDDEN)
 
-            job_service_url = f"{settings.JOB_SERVICE_URL}/jobs/list/"
-            headers = {
-                "Authorization": f"Bearer {request.headers.get('Authorization', '').replace('Bearer ', '')}"
-                if request.headers.get('Authorization')
-                else ""
-            }
-            response = requests.get(job_service_url, headers=headers, timeout=5)
-            if response.status_code != 200:
-                logger.warning(f"Failed to fetch jobs from job service: {response.text}")
-                return Response({"error": "Failed to fetch jobs"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            jobs = response.json()
-
-            candidate_skills = [skill.skill_name.lower() for skill in candidate.skills.all()]
-
-            recommended_jobs = []
-            for job in jobs:
-                job_skills = [skill.lower() for skill in job.get('key_skills', [])]
-                match_count = sum(1 for skill in candidate_skills if skill in job_skills)
-                match_score = (match_count / max(len(job_skills), 1)) * 100
-                if match_score > 30:
-                    job['match_score'] = match_score
-                    recommended_jobs.append(job)
-
-            recommended_jobs.sort(key=lambda x: x['match_score'], reverse=True)
-
+            candidate_skills = [skill.skill_name for skill in candidate.skills.all()]
             search_query = request.query_params.get('search', '')
-            if search_query:
-                recommended_jobs = [
-                    job for job in recommended_jobs
-                    if (search_query.lower() in job['title'].lower() or
-                        search_query.lower() in job['company']['name'].lower() or
-                        search_query.lower() in job['location'].lower() or
-                        search_query.lower() in job['description'].lower())
-                ]
+            try:
+                # Per tenant, candidate, skill set and search; job changes are picked up by a background refresh
+                recommended_jobs = recommendation_cache.recommended_jobs(
+                    service_headers(request), request.tenant_id if hasattr(request, 'tenant_id') else None,
+                    candidate.id, candidate_skills, search_query
+                )
+            except ServiceError as e:
+                logger.warning(f"Failed to fetch jobs from job service: {e}")
+                return Response({"error": "Failed to fetch jobs"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             paginator = self.pagination_class()
             page = paginator.paginate_queryset(recommended_jobs, request)
@@ -793,90 +938,43 @@ class StartInterviewView(APIView):
             return Response({"error": "Start failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class DashboardView(APIView):
-    @ratelimit(key='ip', rate='50/h', method='GET', block=True)
+    @method_decorator(ratelimit(key='ip', rate='50/h', method='GET', block=True))
     def get(self, request, candidate_id):
         try:
             filters = {'id': candidate_id}
             if hasattr(request, 'tenant_id') and request.tenant_id:
                 filters['tenant_id'] = request.tenant_id
-            candidate = Candidate.objects.get(**filters)
+            candidate = Candidate.objects.select_related('dashboard').get(**filters)
             if str(candidate.user_id) != str(request.user_id):
                 logger.warning(f"Unauthorized access to dashboard for candidate {candidate_id} by user {request.user_id}")
                 return Response({"error": "Unauthorized", "details": "You do not own this profile"}, status=status.HTTP_403_FORBIDDEN)
 
-            job_service_url = f"{settings.JOB_SERVICE_URL}/applications/"
-            headers = {
-                "Authorization": f"Bearer {request.headers.get('Authorization', '').replace('Bearer ', '')}"
-                if request.headers.get('Authorization')
-                else ""
-            }
-            response = requests.get(job_service_url, headers=headers, timeout=5)
-            if response.status_code != 200:
-                logger.warning(f"Failed to fetch applications from job service: {response.text}")
-                return Response({"error": "Failed to fetch applications"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            applications = [app for app in response.json() if str(app['candidate_id']) == str(candidate.user_id)]
-
-            last_30_days = timezone.now() - timedelta(days=30)
-            jobs_applied = len([
-                app for app in applications
-                if timezone.datetime.fromisoformat(app['applied_at']) >= last_30_days
-            ])
-            recruiter_actions = len([
-                app for app in applications
-                if (timezone.datetime.fromisoformat(app['updated_at']) >= last_30_days and
-                    app['status'] in ['shortlisted', 'interviewed', 'offered', 'rejected'])
-            ])
-            interview_schedules = Interview.objects.filter(
-                candidate=candidate, scheduled_at__gte=last_30_days, status='SCHEDULED'
-            ).count()
-
-            latest_interview = Interview.objects.filter(
-                candidate=candidate, status='COMPLETED', video_url__isnull=False
-            ).order_by('-updated_at').first()
-            video_url = latest_interview.video_url if latest_interview else None
-
-            insights = None
-            if latest_interview and hasattr(latest_interview, 'insights'):
-                insights_serializer = InterviewInsightSerializer(latest_interview.insights)
-                insights = insights_serializer.data
-
-            candidate_skills = [skill.skill_name.lower() for skill in candidate.skills.all()]
-            job_service_url = f"{settings.JOB_SERVICE_URL}/jobs/list/"
-            response = requests.get(job_service_url, headers=headers, timeout=5)
-            if response.status_code != 200:
-                logger.warning(f"Failed to fetch jobs from job service: {response.text}")
-                return Response({"error": "Failed to fetch jobs"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            jobs = response.json()[:5]
-            recommended_jobs = []
-            for job in jobs:
-                job_skills = [skill.lower() for skill in job.get('key_skills', [])]
-                match_count = sum(1 for skill in candidate_skills if skill in job_skills)
-                match_score = (match_count / max(len(job_skills), 1)) * 100
-                if match_score > 30:
-                    job['match_score'] = match_score
-                    recommended_jobs.append(job)
-            recommended_jobs.sort(key=lambda x: x['match_score'], reverse=True)
-
-            recent_applications = sorted(
-                [app for app in applications],
-                key=lambda x: timezone.datetime.fromisoformat(x['applied_at']),
-                reverse=True
-            )[:5]
+            # Applications, interviews and insights are kept current by events; see dashboard.py
+            try:
+                dashboard = candidate.dashboard
+            except CandidateDashboard.DoesNotExist:
+                dashboard = build_dashboard(candidate)
+
+            now = timezone.now()
+            unavailable = []
+            if recommendations_stale(dashboard, now):
+                candidate_skills = list(candidate.skills.values_list('skill_name', flat=True))
+                deadline = settings.DASHBOARD_DEADLINE
+                calls = FanOut(deadline)
+                headers = service_headers(request)
+                calls.start("recommended_jobs", lambda: fetch_recommended_jobs(
+                    headers, candidate.id, candidate_skills, settings.RECOMMENDED_JOBS_K, timeout=deadline
+                ))
+                results, errors = calls.collect()
+                if "recommended_jobs" in results:
+                    jobs = score_recommended_jobs(candidate_skills, results["recommended_jobs"])[:settings.DASHBOARD_RECOMMENDED_JOBS]
+                    store_recommendations(dashboard, jobs, now)
+                elif dashboard.recommended_jobs is None:
+                    # Older recommendations are still shown; the section is only left out when there are none
+                    unavailable.append("recommended_jobs")
 
             logger.info(f"Retrieved dashboard data for candidate {candidate_id}")
-            return Response({
-                "stats": {
-                    "jobs_applied": jobs_applied,
-                    "recruiter_actions": recruiter_actions,
-                    "interview_schedules": interview_schedules
-                },
-                "video_url": video_url,
-                "insights": insights,
-                "recommended_jobs": recommended_jobs,
-                "recent_applications": recent_applications
-            }, status=status.HTTP_200_OK)
+            return Response({**dashboard_payload(dashboard, now), "unavailable": unavailable}, status=status.HTTP_200_OK)
         except Candidate.DoesNotExist:
             logger.warning(f"Candidate not found: {candidate_id}")
             return Response({"error": "Not found", "details": "Candidate does not exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -951,4 +1049,19 @@ class MarkNotificationReadView(APIView):
             return Response({"message": "Notification marked as read"}, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Notification mark read failed: {e}")
-            return Response({"error": "Mark read failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": "Mark read failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class MetricsView(APIView):
+    """Prometheus scrape endpoint, outside JWT auth and throttling; only the metrics scrape token gets in."""
+    permission_classes = []
+    throttle_classes = []
+
+    def get(self, request):
+        try:
+            if not is_metrics_scrape(request):
+                logger.warning("Metrics scrape refused: missing or wrong scrape token")
+                return Response({"error": "Unauthorized", "details": "Metrics scrape token required"}, status=status.HTTP_403_FORBIDDEN)
+            return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+        except Exception as e:
+            logger.error(f"Metrics rendering failed: {e}")
+            return Response({"error": "Metrics unavailable", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -164,4 +164,73 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 JOB_SERVICE_URL= os.getenv('JOB_SERVICE_URL')
 NOTIFICATION_SERVICE_URL= os.getenv('NOTIFICATION_SERVICE_URL')
-INTERVIEW_SERVICE_URL= os.getenv('INTERVIEW_SERVICE_URL')
\ No newline at end of file
+INTERVIEW_SERVICE_URL= os.getenv('INTERVIEW_SERVICE_URL')
+SERVICE_TOKEN = os.getenv('SERVICE_TOKEN', '')  # sent by other services in X-Service-Token; service-only endpoints refuse all calls when unset
+METRICS_SCRAPE_TOKEN = os.getenv('METRICS_SCRAPE_TOKEN', '')  # bearer token Prometheus sends to /metrics/; the endpoint refuses all scrapes when unset
+
+# Jobs asked of the job service's recommendation index, before the skill-coverage filter
+RECOMMENDED_JOBS_K = int(os.getenv('RECOMMENDED_JOBS_K', 100))
+DASHBOARD_RECOMMENDED_JOBS = int(os.getenv('DASHBOARD_RECOMMENDED_JOBS', 5))
+
+SERVICE_CALL_TIMEOUT = float(os.getenv('SERVICE_CALL_TIMEOUT', 5))
+SERVICE_POOL_CONNECTIONS = int(os.getenv('SERVICE_POOL_CONNECTIONS', 10))  # hosts kept in the pool
+SERVICE_POOL_MAXSIZE = int(os.getenv('SERVICE_POOL_MAXSIZE', 20))  # keep-alive connections per host
+SERVICE_FANOUT_WORKERS = int(os.getenv('SERVICE_FANOUT_WORKERS', 16))
+DASHBOARD_DEADLINE = float(os.getenv('DASHBOARD_DEADLINE', 2.5))  # seconds; slower calls are left out of the dashboard
+
+SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_lg')
+SPACY_FALLBACK_MODEL = os.getenv('SPACY_FALLBACK_MODEL', 'en_core_web_sm')
+SPACY_EXCLUDED_COMPONENTS = [c for c in os.getenv('SPACY_EXCLUDED_COMPONENTS', 'parser,lemmatizer').split(',') if c]
+SPACY_WARM_UP = os.getenv('SPACY_WARM_UP', 'True') == 'True'
+
+CV_PARSE_ASYNC = os.getenv('CV_PARSE_ASYNC', 'True') == 'True'
+CV_WORKER_PROCESSES = int(os.getenv('CV_WORKER_PROCESSES', 2))
+CV_JOB_MAX_ATTEMPTS = int(os.getenv('CV_JOB_MAX_ATTEMPTS', 3))
+CV_JOB_RETRY_BACKOFF = int(os.getenv('CV_JOB_RETRY_BACKOFF', 30))
+CV_JOB_TENANT_CONCURRENCY = int(os.getenv('CV_JOB_TENANT_CONCURRENCY', 2))
+CV_JOB_HEARTBEAT_INTERVAL = int(os.getenv('CV_JOB_HEARTBEAT_INTERVAL', 30))  # seconds between lease renewals while a job runs
+CV_JOB_LEASE = int(os.getenv('CV_JOB_LEASE', 120))  # seconds without a renewal before a running job is requeued
+
+CV_BATCH_PROCESSES = int(os.getenv('CV_BATCH_PROCESSES', 0))  # 0 = one process per CPU
+CV_BATCH_CHUNK_SIZE = int(os.getenv('CV_BATCH_CHUNK_SIZE', 8))
+CV_BATCH_PIPE_SIZE = int(os.getenv('CV_BATCH_PIPE_SIZE', 8))
+CV_BATCH_MAX_FILES = int(os.getenv('CV_BATCH_MAX_FILES', 500))
+CV_BATCH_MAX_FILE_BYTES = int(os.getenv('CV_BATCH_MAX_FILE_BYTES', 10 * 1024 * 1024))  # per CV, uncompressed
+CV_BATCH_MAX_TOTAL_BYTES = int(os.getenv('CV_BATCH_MAX_TOTAL_BYTES', 500 * 1024 * 1024))  # per batch, uncompressed
+
+CANDIDATE_BATCH_MAX_IDS = int(os.getenv('CANDIDATE_BATCH_MAX_IDS', 500))
+
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv('PARSE_CACHE_MAX_ENTRIES', 256))
+PARSE_CACHE_TTL = int(os.getenv('PARSE_CACHE_TTL', 7 * 24 * 3600))
+PARSE_CACHE_USE_REDIS = os.getenv('PARSE_CACHE_USE_REDIS', 'True') == 'True'
+
+CV_SAVE_MODE = os.getenv('CV_SAVE_MODE', 'replace')  # replace | diff
+CV_SAVE_BATCH_SIZE = int(os.getenv('CV_SAVE_BATCH_SIZE', 500))
+
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 30))  # 0 = no limit
+PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', 200000))  # 0 = no limit
+
+TFIDF_MODEL_DIR = os.getenv('TFIDF_MODEL_DIR', str(BASE_DIR / 'models' / 'tfidf'))
+TFIDF_MIN_DOCUMENTS = int(os.getenv('TFIDF_MIN_DOCUMENTS', 20))
+TFIDF_MAX_FEATURES = int(os.getenv('TFIDF_MAX_FEATURES', 20000))
+
+PARSE_PROFILE = os.getenv('PARSE_PROFILE', 'False') == 'True'  # cProfile every parse
+PARSE_PROFILE_HEADER_ENABLED = os.getenv('PARSE_PROFILE_HEADER_ENABLED', str(DEBUG)) == 'True'  # honour X-Profile-Parse: 1
+PARSE_PROFILE_TOP = int(os.getenv('PARSE_PROFILE_TOP', 25))
+PARSE_PROFILE_DIR = os.getenv('PARSE_PROFILE_DIR', '')  # also dump .prof files here when set
+
+NER_SCOPE = os.getenv('NER_SCOPE', 'header')  # header | full
+NER_HEADER_LINES = int(os.getenv('NER_HEADER_LINES', 15))
+
+# Dashboard read model (candidate_profile/dashboard.py), fed by the job service's application events
+APPLICATION_EVENTS_STREAM = os.getenv('APPLICATION_EVENTS_STREAM', 'events:applications')  # same as the job service
+DASHBOARD_EVENTS_GROUP = os.getenv('DASHBOARD_EVENTS_GROUP', 'candidate-dashboard')
+DASHBOARD_EVENTS_BATCH = int(os.getenv('DASHBOARD_EVENTS_BATCH', 100))
+DASHBOARD_RECOMMENDATIONS_TTL = int(os.getenv('DASHBOARD_RECOMMENDATIONS_TTL', 3600))  # seconds; skill edits refresh them sooner
+
+PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', 3600))  # seconds; profile writes invalidate sooner
+
+# /jobs/ recommendations (candidate_profile/recommendations.py), served stale while refreshed in the background
+JOB_RECOMMENDATION_CACHE_TTL = int(os.getenv('JOB_RECOMMENDATION_CACHE_TTL', 24 * 3600))  # longest an entry is served
+JOB_RECOMMENDATION_STALE_AFTER = int(os.getenv('JOB_RECOMMENDATION_STALE_AFTER', 900))  # refresh even without job changes
+JOB_RECOMMENDATION_REFRESH_TIMEOUT = int(os.getenv('JOB_RECOMMENDATION_REFRESH_TIMEOUT', 30))  # seconds a refresh holds its claim
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'candidate_profile_service.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.SPACY_WARM_UP:
+    # Load the spaCy model here instead of on the first CV upload. Workers forked after this import
+    # (uWSGI without lazy-apps, gunicorn --preload) share it; otherwise each worker loads its own copy
+    from candidate_profile.nlp import warm_up
+    warm_up()
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_migrate
 
 
 class JobListingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'job_listing'
+
+    def ready(self):
+        from . import signals
+        pre_migrate.connect(signals.create_trigram_extension, sender=self)
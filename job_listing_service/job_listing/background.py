@@ -0,0 +1,33 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+from django.db import close_old_connections
+from .logger import logger
+
+
+class CoalescingQueue:
+    """Runs `task(key)` on one background thread; a key that is still waiting is not queued twice."""
+
+    def __init__(self, name: str, task: Callable[[Hashable], object]):
+        self.name = name
+        self.task = task
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable):
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._run, key)
+
+    def _run(self, key: Hashable):
+        with self._lock:
+            self._pending.discard(key)
+        try:
+            self.task(key)
+        except Exception as e:
+            logger.error(f"{self.name} failed for {key}: {e}", exc_info=True)
+        finally:
+            close_old_connections()
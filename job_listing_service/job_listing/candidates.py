@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+import requests
+from django.conf import settings
+from .logger import logger
+
+# Keep-alive connections to the candidate service, reused across requests in this process
+session = requests.Session()
+
+# Last full profile seen per candidate with its ETag, revalidated on every use
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def auth_headers(request) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {request.headers.get('Authorization', '').replace('Bearer ', '')}"}
+
+
+def candidate_text(profile: Dict) -> str:
+    """The free text a candidate is scored on: name and degrees, from a slim batch projection."""
+    return " ".join([profile.get('first_name', ''), profile.get('last_name', ''), " ".join(profile.get('education', []))])
+
+
+def fetch_candidate_profiles(candidate_ids: Iterable, headers: Dict[str, str]) -> Dict[str, Dict]:
+    """Slim profiles by candidate id from `POST /candidates/batch/`, one call per chunk.
+
+    A chunk that fails is logged and left out, like a single failed profile fetch. The endpoint
+    only answers services, so the shared `SERVICE_TOKEN` is sent along with the caller's token.
+    """
+    headers = {**headers, "X-Service-Token": settings.SERVICE_TOKEN}
+    candidate_ids = list(dict.fromkeys(str(candidate_id) for candidate_id in candidate_ids))
+    chunk_size = settings.CANDIDATE_BATCH_SIZE
+    profiles = {}
+    for start in range(0, len(candidate_ids), chunk_size):
+        chunk = candidate_ids[start:start + chunk_size]
+        try:
+            response = session.post(
+                f"{settings.CANDIDATE_PROFILE_SERVICE_URL}/candidates/batch/",
+                json={"ids": chunk}, headers=headers, timeout=settings.CANDIDATE_BATCH_TIMEOUT,
+            )
+        except requests.RequestException as e:
+            logger.warning(f"Candidate batch fetch failed for {len(chunk)} candidates: {e}")
+            continue
+        if response.status_code != 200:
+            logger.warning(f"Candidate batch fetch failed for {len(chunk)} candidates: {response.text}")
+            continue
+        for profile in response.json().get('candidates', []):
+            profiles[profile['id']] = profile
+    return profiles
+
+
+def fetch_candidate_profile(candidate_id, headers: Dict[str, str]) -> Optional[Dict]:
+    """The full profile from `GET /candidates/<id>/`, or None when the candidate service refuses.
+
+    The last copy seen is sent back as `If-None-Match`, so an unchanged profile costs the
+    candidate service a cache lookup and comes back as an empty 304.
+    """
+    key = str(candidate_id)
+    with _profiles_lock:
+        cached = _profiles.get(key)
+    request_headers = dict(headers)
+    if cached is not None:
+        request_headers["If-None-Match"] = cached[0]
+
+    response = session.get(f"{settings.CANDIDATE_PROFILE_SERVICE_URL}/candidates/{key}/", headers=request_headers,
+                           timeout=settings.CANDIDATE_BATCH_TIMEOUT)
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+    if response.status_code != 200:
+        logger.warning(f"Failed to fetch candidate profile {key}: {response.text}")
+        return None
+
+    profile = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        with _profiles_lock:
+            _profiles[key] = (etag, profile)
+            _profiles.move_to_end(key)
+            while len(_profiles) > settings.CANDIDATE_PROFILE_CACHE_MAX_ENTRIES:
+                _profiles.popitem(last=False)
+    return profile
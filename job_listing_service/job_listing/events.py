@@ -0,0 +1,80 @@
+import json
+from typing import Dict, Iterable
+import redis
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+from .logger import logger
+from .models import Application
+from .redis_client import redis_client
+from .serializers import ApplicationSerializer
+
+# Shared with candidate_profile_service (candidate_profile/dashboard.py): change both together
+APPLICATION_SAVED = "saved"
+APPLICATION_DELETED = "deleted"
+
+# Shared with candidate_profile_service (candidate_profile/recommendations.py): change both together
+ALL_TENANTS = "all"
+
+
+def jobs_version_key(tenant_id) -> str:
+    return f"jobs:version:{tenant_id}"
+
+
+def publishing_enabled() -> bool:
+    return redis_client is not None
+
+
+def application_event(application, deleted: bool = False) -> Dict[str, str]:
+    """A stream entry describing an application as it is now; the candidate dashboard keeps the latest per id.
+
+    A deletion is stamped with the time of the delete, so it is newer than every save before it.
+    """
+    event = {
+        "type": APPLICATION_DELETED if deleted else APPLICATION_SAVED,
+        "application_id": str(application.id),
+        "candidate_id": str(application.candidate_id),
+        "updated_at": (timezone.now() if deleted else application.updated_at).isoformat(),
+    }
+    if not deleted:
+        event["data"] = json.dumps(ApplicationSerializer(application).data, cls=JSONEncoder)
+    return event
+
+
+def publish_application_events(events: Iterable[Dict[str, str]]) -> int:
+    """Append events to the application stream in one round trip. Returns how many were written."""
+    if not publishing_enabled():
+        return 0
+    pipeline = redis_client.pipeline(transaction=False)
+    count = 0
+    for event in events:
+        pipeline.xadd(settings.APPLICATION_EVENTS_STREAM, event, maxlen=settings.APPLICATION_EVENTS_MAXLEN, approximate=True)
+        count += 1
+    try:
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Publishing {count} application events failed: {e}")
+        return 0
+    return count
+
+
+def publish_applications_saved(application_ids: Iterable) -> int:
+    """Publish the current state of applications changed by bulk updates, which send no signals."""
+    application_ids = list(application_ids)
+    if not publishing_enabled() or not application_ids:
+        return 0
+    applications = Application.objects.filter(id__in=application_ids).select_related('job__company')
+    return publish_application_events([application_event(application) for application in applications])
+
+
+def bump_jobs_version(tenant_id):
+    """Tell cached job recommendations for the tenant, and those not scoped to one, that jobs changed."""
+    if not publishing_enabled():
+        return
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.incr(jobs_version_key(tenant_id))
+        pipeline.incr(jobs_version_key(ALL_TENANTS))
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Jobs version bump failed for tenant {tenant_id}: {e}")
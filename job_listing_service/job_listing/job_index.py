@@ -0,0 +1,212 @@
+import fcntl
+import os
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import joblib
+import numpy as np
+from django.conf import settings
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import Normalizer
+from .background import CoalescingQueue
+from .events import bump_jobs_version
+from .logger import logger
+from .models import Job
+
+INDEX_FORMAT = 1
+SEARCH_MODES = ("auto", "exact", "lsh")
+
+
+def index_dir(tenant_id) -> Path:
+    return Path(settings.JOB_INDEX_DIR) / str(tenant_id)
+
+
+def job_document(job) -> str:
+    return f"{' '.join(job.key_skills or [])} {job.title} {job.description}"
+
+
+class JobIndex:
+    """Unit-length job embeddings (TF-IDF reduced with SVD) with exact and random-projection LSH search."""
+
+    def __init__(self, ids: Sequence[str], embeddings: np.ndarray, model=None):
+        self.ids = list(ids)
+        self.embeddings = embeddings
+        self.model = model
+        self._tables = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.model.transform([text]).astype(np.float32).ravel()
+
+    def search(self, text: str, k: int, mode: str = "auto") -> List[Tuple[str, float]]:
+        """The `k` most similar jobs to `text` as (job id, cosine similarity), best first."""
+        if not self.ids or k <= 0:
+            return []
+        query = self.embed(text)
+        if mode == "auto":
+            mode = "lsh" if len(self.ids) > settings.JOB_INDEX_EXACT_MAX else "exact"
+        rows = self._lsh_candidates(query) if mode == "lsh" else None
+        # Too few colliding jobs to fill the page: an exact scan is cheap next to a short answer
+        if rows is not None and len(rows) < k:
+            rows = None
+        return self._top(query, k, rows)
+
+    def _top(self, query: np.ndarray, k: int, rows: Optional[np.ndarray]) -> List[Tuple[str, float]]:
+        embeddings = self.embeddings if rows is None else self.embeddings[rows]
+        similarities = embeddings @ query
+        k = min(k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        positions = top if rows is None else rows[top]
+        return [(self.ids[i], float(similarities[j])) for i, j in zip(positions, top)]
+
+    def _lsh_tables(self):
+        if self._tables is None:
+            with self._lock:
+                if self._tables is None:
+                    rng = np.random.default_rng(settings.JOB_INDEX_LSH_SEED)
+                    dimensions = self.embeddings.shape[1]
+                    weights = 1 << np.arange(settings.JOB_INDEX_LSH_BITS, dtype=np.int64)
+                    tables = []
+                    for _ in range(settings.JOB_INDEX_LSH_TABLES):
+                        planes = rng.standard_normal((dimensions, settings.JOB_INDEX_LSH_BITS)).astype(np.float32)
+                        codes = ((self.embeddings @ planes) > 0) @ weights
+                        order = np.argsort(codes, kind="stable")
+                        bucket_codes, starts = np.unique(codes[order], return_index=True)
+                        buckets = dict(zip(bucket_codes.tolist(), np.split(order, starts[1:])))
+                        tables.append((planes, weights, buckets))
+                    self._tables = tables
+        return self._tables
+
+    def _lsh_candidates(self, query: np.ndarray) -> np.ndarray:
+        """Rows sharing a hyperplane bucket with the query in any table."""
+        matches = []
+        for planes, weights, buckets in self._lsh_tables():
+            code = int(((query @ planes) > 0) @ weights)
+            if code in buckets:
+                matches.append(buckets[code])
+        return np.unique(np.concatenate(matches)) if matches else np.zeros(0, dtype=np.int64)
+
+
+def build_index(tenant_id) -> JobIndex:
+    """Fit the tenant's embedding model on its jobs and embed every job."""
+    jobs = list(Job.objects.filter(company__tenant_id=tenant_id).only('id', 'title', 'description', 'key_skills'))
+    ids = [str(job.id) for job in jobs]
+    if not jobs:
+        return JobIndex([], np.zeros((0, 1), dtype=np.float32))
+
+    documents = [job_document(job) for job in jobs]
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, max_features=settings.JOB_INDEX_MAX_FEATURES)
+    tfidf = vectorizer.fit_transform(documents)
+    # SVD needs fewer components than both documents and terms; tiny tenants keep the raw TF-IDF space
+    components = min(settings.JOB_INDEX_DIMENSIONS, tfidf.shape[0] - 1, tfidf.shape[1] - 1)
+    if components >= 2:
+        svd = TruncatedSVD(n_components=components, random_state=0)
+        model = make_pipeline(vectorizer, svd, Normalizer(copy=False))
+        embeddings = Normalizer(copy=False).transform(svd.fit_transform(tfidf))
+    else:
+        model = make_pipeline(vectorizer, Normalizer(copy=False))
+        embeddings = tfidf.toarray()
+    return JobIndex(ids, np.ascontiguousarray(embeddings, dtype=np.float32), model)
+
+
+def save_index(tenant_id, index: JobIndex) -> Path:
+    """Write the embeddings, then swap in the metadata that points at them, so readers never see half an index.
+
+    Saves of one tenant's index are serialized with a lock file, so a concurrent rebuild
+    cannot delete the embeddings another one's metadata is about to point at.
+    """
+    directory = index_dir(tenant_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / "index.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        embeddings_name = f"embeddings-{uuid.uuid4().hex}.npy"
+        np.save(directory / embeddings_name, index.embeddings)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        joblib.dump({"format": INDEX_FORMAT, "ids": index.ids, "model": index.model, "embeddings": embeddings_name}, tmp_path)
+        meta_path = directory / "index.joblib"
+        os.replace(tmp_path, meta_path)
+
+        # Only the files the current metadata points at are kept; processes that still map
+        # an older one keep reading it after the unlink
+        for stale in directory.glob("embeddings-*.npy"):
+            if stale.name != embeddings_name:
+                stale.unlink(missing_ok=True)
+    logger.info(f"Saved job index for tenant {tenant_id}: {len(index)} jobs")
+    return meta_path
+
+
+def rebuild_index(tenant_id) -> JobIndex:
+    index = build_index(tenant_id)
+    save_index(tenant_id, index)
+    # Recommendations cached before the rebuild were computed on the old index
+    bump_jobs_version(tenant_id)
+    return index
+
+
+class JobIndexStore:
+    """Memory-maps each tenant's saved index on first use and reloads it when a rebuild replaces it."""
+
+    def __init__(self):
+        self._indexes: Dict[str, Tuple[int, JobIndex]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, tenant_id) -> Optional[JobIndex]:
+        key = str(tenant_id)
+        meta_path = index_dir(key) / "index.joblib"
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._indexes.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            try:
+                meta = joblib.load(meta_path)
+                if meta.get("format") != INDEX_FORMAT:
+                    return None
+                embeddings = np.load(meta_path.parent / meta["embeddings"], mmap_mode="r")
+            except Exception as e:
+                logger.error(f"Failed to load job index {meta_path}: {e}")
+                return cached[1] if cached else None
+            index = JobIndex(meta["ids"], embeddings, meta["model"])
+            self._indexes[key] = (mtime, index)
+            return index
+
+    def get(self, tenant_id) -> Optional[JobIndex]:
+        """The tenant's saved index, or None while the first build, queued by this call, is running."""
+        index = self._load(tenant_id)
+        if index is None:
+            enqueue_index_rebuild(tenant_id)
+            # Already built when JOB_INDEX_ASYNC is off
+            index = self._load(tenant_id)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+job_index_store = JobIndexStore()
+_queue = CoalescingQueue("job-index", rebuild_index)
+
+
+def enqueue_index_rebuild(tenant_id):
+    """Rebuild after job changes; bursts of edits in one tenant are folded into one rebuild."""
+    if not settings.JOB_INDEX_ASYNC:
+        rebuild_index(tenant_id)
+        return
+    _queue.submit(tenant_id)
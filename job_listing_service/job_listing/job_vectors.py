@@ -0,0 +1,185 @@
+import json
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+import redis
+from django.conf import settings
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from .logger import logger
+from .redis_client import redis_client
+
+# Shared with candidate_profile_service (candidate_profile/job_vectors.py): bump both together
+CACHE_VERSION = 1
+MAX_FEATURES = 5000
+
+# Same preprocessing, tokenisation and stop words as the TfidfVectorizer used for scoring
+analyze = TfidfVectorizer(stop_words="english").build_analyzer()
+
+
+def term_counts(text: str) -> Counter:
+    return Counter(analyze(text or ""))
+
+
+def cache_key(job_id) -> str:
+    return f"jobvec:v{CACHE_VERSION}:{job_id}"
+
+
+def job_version(job) -> str:
+    return job.updated_at.isoformat()
+
+
+def job_features(job) -> Dict:
+    """Term counts of each job text field, tagged with the job version they were computed from."""
+    return {
+        "version": job_version(job),
+        "title": term_counts(job.title),
+        "description": term_counts(job.description),
+        "skills": term_counts(" ".join(job.key_skills or [])),
+    }
+
+
+def pairwise_tfidf_cosine(a: Counter, b: Counter, max_features: int = MAX_FEATURES) -> float:
+    """Cosine similarity of two documents under a TfidfVectorizer fitted on just those two.
+
+    Matches `fit_transform([a, b])` with smooth IDF and L2 norm: terms in both documents get
+    an IDF of 1, terms in one get ln(3/2) + 1. Only term counts are needed, so a cached
+    job side is never re-tokenised.
+    """
+    vocabulary = a.keys() | b.keys()
+    if len(vocabulary) > max_features:
+        vocabulary = set(sorted(vocabulary, key=lambda term: (-(a[term] + b[term]), term))[:max_features])
+    single_idf = math.log(1.5) + 1
+    dot = norm_a = norm_b = 0.0
+    for term in vocabulary:
+        idf = 1.0 if term in a and term in b else single_idf
+        weight_a, weight_b = a[term] * idf, b[term] * idf
+        dot += weight_a * weight_b
+        norm_a += weight_a * weight_a
+        norm_b += weight_b * weight_b
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / math.sqrt(norm_a * norm_b)
+
+
+def pairwise_tfidf_cosines(job: Counter, candidates: List[Counter], max_features: int = MAX_FEATURES) -> np.ndarray:
+    """`pairwise_tfidf_cosine(job, candidate)` for every candidate, as a few sparse products.
+
+    Each pair still gets its own two-document IDF: with s = ln(3/2) + 1, a pair's norms are
+    s^2 times the raw squared norms minus (s^2 - 1) times the squared counts of shared terms,
+    and the dot product runs over shared terms only. Pairs whose vocabulary exceeds
+    `max_features` fall back to the scalar function so truncation stays identical.
+    """
+    if not candidates:
+        return np.zeros(0)
+    vocabulary = {term: i for i, term in enumerate(job)}
+    indices, data, indptr = [], [], [0]
+    for counts in candidates:
+        for term, count in counts.items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(count)
+        indptr.append(len(indices))
+    matrix = csr_matrix((np.asarray(data, dtype=np.float64), indices, indptr), shape=(len(candidates), len(vocabulary)))
+
+    job_vector = np.zeros(len(vocabulary))
+    job_vector[:len(job)] = list(job.values())
+    in_job = (job_vector > 0).astype(np.float64)
+    squared = matrix.multiply(matrix)
+    present = matrix.sign()
+
+    single_idf_sq = (math.log(1.5) + 1) ** 2
+    dot = matrix @ job_vector
+    shared_job_sq = present @ (job_vector ** 2)
+    shared_candidate_sq = squared @ in_job
+    norm_job = single_idf_sq * float(job_vector @ job_vector) - (single_idf_sq - 1) * shared_job_sq
+    norm_candidate = single_idf_sq * np.asarray(squared.sum(axis=1)).ravel() - (single_idf_sq - 1) * shared_candidate_sq
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where((norm_job > 0) & (norm_candidate > 0), dot / np.sqrt(norm_job * norm_candidate), 0.0)
+
+    union_sizes = len(job) + matrix.getnnz(axis=1) - (present @ in_job)
+    for row in np.flatnonzero(union_sizes > max_features):
+        scores[row] = pairwise_tfidf_cosine(job, candidates[row], max_features)
+    return scores
+
+
+class JobVectorCache:
+    """Job-side term counts per job version, in process and in the Redis shared with the candidate service."""
+
+    def __init__(self, max_entries: int, ttl: int, client=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.client = client
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job) -> Dict:
+        version = job_version(job)
+        with self._lock:
+            entry = self._entries.get(job.id)
+            if entry is not None and entry["version"] == version:
+                self._entries.move_to_end(job.id)
+                return entry
+
+        entry = self._read(job.id)
+        if entry is None or entry["version"] != version:
+            return self.refresh(job)
+        self._remember(job.id, entry)
+        return entry
+
+    def peek(self, job_id) -> Optional[Dict]:
+        """Whatever entry is stored for the job, of any version."""
+        with self._lock:
+            entry = self._entries.get(job_id)
+        return entry if entry is not None else self._read(job_id)
+
+    def refresh(self, job) -> Dict:
+        entry = job_features(job)
+        self._remember(job.id, entry)
+        if self.client is not None:
+            try:
+                self.client.setex(cache_key(job.id), self.ttl, json.dumps(entry))
+            except redis.RedisError as e:
+                logger.warning(f"Job vector cache write failed for {job.id}: {e}")
+        return entry
+
+    def invalidate(self, job_id):
+        with self._lock:
+            self._entries.pop(job_id, None)
+        if self.client is not None:
+            try:
+                self.client.delete(cache_key(job_id))
+            except redis.RedisError as e:
+                logger.warning(f"Job vector cache delete failed for {job_id}: {e}")
+
+    def _read(self, job_id) -> Optional[Dict]:
+        if self.client is None:
+            return None
+        try:
+            raw = self.client.get(cache_key(job_id))
+        except redis.RedisError as e:
+            logger.warning(f"Job vector cache read failed for {job_id}: {e}")
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return {"version": entry["version"], **{field: Counter(entry[field]) for field in ("title", "description", "skills")}}
+
+    def _remember(self, job_id, entry: Dict):
+        with self._lock:
+            self._entries[job_id] = entry
+            self._entries.move_to_end(job_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+job_vector_cache = JobVectorCache(
+    max_entries=settings.JOB_VECTOR_CACHE_MAX_ENTRIES,
+    ttl=settings.JOB_VECTOR_CACHE_TTL,
+    client=redis_client,
+)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from job_listing.job_index import rebuild_index
+from job_listing.models import Company
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job embedding indexes behind /jobs/recommend/. Job edits rebuild an existing index automatically."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', action='append', dest='tenants', help="Rebuild only this tenant (repeatable).")
+
+    def handle(self, *args, **options):
+        tenants = options['tenants']
+        if tenants is None:
+            tenants = Company.objects.values_list('tenant_id', flat=True).distinct()
+
+        for tenant_id in tenants:
+            index = rebuild_index(tenant_id)
+            self.stdout.write(self.style.SUCCESS(f"{tenant_id}: {len(index)} jobs indexed"))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from job_listing.events import application_event, publish_application_events
+from job_listing.models import Application
+from job_listing.redis_client import redis_client
+
+
+class Command(BaseCommand):
+    help = "Publish the current state of applications as events, to backfill the candidate service's dashboards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help="Only applications to this tenant's jobs.")
+        parser.add_argument('--candidate', action='append', dest='candidates', help="Only this candidate's applications (repeatable).")
+
+    def handle(self, *args, **options):
+        if redis_client is None:
+            raise CommandError("Redis is not available")
+        applications = Application.objects.select_related('job__company').order_by('id')
+        if options['tenant']:
+            applications = applications.filter(job__company__tenant_id=options['tenant'])
+        if options['candidates']:
+            applications = applications.filter(candidate_id__in=options['candidates'])
+
+        batch_size = settings.APPLICATION_EVENTS_BATCH_SIZE
+        published, batch = 0, []
+        for application in applications.iterator(chunk_size=batch_size):
+            batch.append(application_event(application))
+            if len(batch) == batch_size:
+                published += publish_application_events(batch)
+                batch = []
+        published += publish_application_events(batch)
+        self.stdout.write(self.style.SUCCESS(f"Published {published} application events"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from job_listing.models import Application
+from job_listing.rescoring import rescore_job
+
+
+class Command(BaseCommand):
+    help = "Recompute stored application match scores from their saved candidate term counts. Saving a job does this automatically."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', action='append', dest='jobs', help="Re-score only this job (repeatable).")
+
+    def handle(self, *args, **options):
+        jobs = options['jobs']
+        if jobs is None:
+            jobs = Application.objects.filter(candidate_features__isnull=False).values_list('job_id', flat=True).distinct()
+
+        for job_id in jobs:
+            updated = rescore_job(job_id)
+            self.stdout.write(self.style.SUCCESS(f"{job_id}: {updated} scores changed"))
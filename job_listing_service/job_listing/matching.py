@@ -1,21 +1,59 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+from .job_vectors import job_vector_cache, pairwise_tfidf_cosine, pairwise_tfidf_cosines, term_counts
 from .logger import logger
 
-def calculate_match_score(job_skills: list, candidate_skills: list, job_description: str, candidate_profile: str) -> float:
-    """Calculate a match score between a job and a candidate."""
+def job_term_counts(job_features: Dict) -> Counter:
+    return job_features["skills"] + job_features["description"]
+
+def candidate_term_counts(candidate_skills: list, candidate_profile: str) -> Counter:
+    """The candidate side of a match score; stored on the application so it can be re-scored without the profile."""
+    return term_counts(f"{' '.join(candidate_skills)} {candidate_profile}")
+
+def score_term_counts(job_counts: Counter, candidate_counts: Counter) -> float:
+    return round(pairwise_tfidf_cosine(job_counts, candidate_counts) * 100, 2)
+
+def score_term_counts_many(job_counts: Counter, candidate_counts: List[Counter]) -> np.ndarray:
+    """`score_term_counts` for many candidates in one vectorized pass."""
+    return np.round(pairwise_tfidf_cosines(job_counts, candidate_counts) * 100, 2)
+
+def calculate_match_score(job_skills: list, candidate_skills: list, job_description: str, candidate_profile: str,
+                          job_features: Optional[Dict] = None, candidate_counts: Optional[Counter] = None) -> float:
+    """Calculate a match score between a job and a candidate.
+
+    Pass the job's cached `job_features` to skip re-tokenising the job side for every candidate.
+    """
     try:
-        job_text = f"{' '.join(job_skills)} {job_description}"
-        candidate_text = f"{' '.join(candidate_skills)} {candidate_profile}"
-        
-        vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
-        documents = [job_text, candidate_text]
-        tfidf_matrix = vectorizer.fit_transform(documents)
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        
-        score = round(similarity * 100, 2)
+        if job_features is not None:
+            job_counts = job_term_counts(job_features)
+        else:
+            job_counts = term_counts(f"{' '.join(job_skills)} {job_description}")
+        if candidate_counts is None:
+            candidate_counts = candidate_term_counts(candidate_skills, candidate_profile)
+
+        score = score_term_counts(job_counts, candidate_counts)
         logger.debug(f"Match score calculated: {score}%")
         return score
     except Exception as e:
         logger.warning(f"Failed to calculate match score: {str(e)}")
-        return 0.0
\ No newline at end of file
+        return 0.0
+
+def top_matches(candidate_ids: List, scores: np.ndarray, k: Optional[int] = None) -> List[Dict]:
+    """The `k` highest scores, best first; only those are sorted."""
+    if k is not None and k < len(candidate_ids):
+        top = np.argpartition(-scores, k - 1)[:k] if k > 0 else np.zeros(0, dtype=int)
+    else:
+        top = np.arange(len(candidate_ids))
+    top = top[np.lexsort((top, -scores[top]))]
+    return [{"candidate_id": str(candidate_ids[i]), "match_score": float(scores[i])} for i in top]
+
+def rank_candidates(job, candidates: Dict[str, Counter], k: Optional[int] = None) -> List[Dict]:
+    """The `k` best matches for a job, best first, scored like `calculate_match_score`.
+
+    `candidates` maps candidate id to `candidate_term_counts`. The job side comes from the
+    job vector cache and all candidates are scored together.
+    """
+    ids = list(candidates)
+    scores = score_term_counts_many(job_term_counts(job_vector_cache.get(job)), [candidates[i] for i in ids])
+    return top_matches(ids, scores, k)
@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Cast
 import uuid
 
 class Company(models.Model):
@@ -20,6 +23,23 @@ class Job(models.Model):
     key_skills = models.JSONField(default=list)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by Postgres on every write; title ranks above skills, skills above the rest
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector(Cast('key_skills', models.TextField()), weight='B', config='english')
+            + SearchVector('description', 'location', weight='C', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='job_search_vector_idx'),
+            # Fuzzy title matches; needs the pg_trgm extension
+            GinIndex(fields=['title'], opclasses=['gin_trgm_ops'], name='job_title_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company.name}"
@@ -40,6 +60,16 @@ class Application(models.Model):
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     match_score = models.FloatField(null=True, blank=True)
+    # Candidate-side term counts the score was computed from, so job edits can re-score without the profile
+    candidate_features = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Ranked applicants of a job, read in keyset pages
+            models.Index(fields=['job', '-match_score', 'id'], name='application_job_rank_idx'),
+            # A candidate's applications, newest first
+            models.Index(fields=['candidate_id', '-applied_at', 'id'], name='application_candidate_idx'),
+        ]
 
     def __str__(self):
         return f"Application for {self.job.title} by {self.candidate_id}"
\ No newline at end of file
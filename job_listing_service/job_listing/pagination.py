@@ -0,0 +1,56 @@
+import base64
+import json
+from typing import List, Optional, Sequence, Tuple
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence) -> str:
+    # UUIDs and datetimes round-trip as strings, which the ORM parses back in lookups
+    return base64.urlsafe_b64encode(json.dumps(list(values), default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def after(ordering: Sequence[str], values: Sequence) -> Q:
+    """Rows strictly after `values` in `ordering` (e.g. ["-match_score", "id"]), as one OR of prefixes."""
+    condition = Q(pk__in=[])
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        step = Q(**{f"{name}__lt" if field.startswith('-') else f"{name}__gt": values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+def keyset_page(queryset, ordering: Sequence[str], cursor: Optional[str], page_size: int) -> Tuple[List, Optional[str]]:
+    """One page of `queryset` in `ordering` and the cursor of the next page, or None on the last page.
+
+    The last ordering field must be unique so every row has a distinct position; with an index
+    on the ordering fields each page is a range scan however deep it is.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(after(ordering, decode_cursor(cursor, len(ordering))))
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor([getattr(rows[-1], field.lstrip('-')) for field in ordering])
+
+
+def paginate_requested(params) -> bool:
+    """List endpoints return plain lists unless the caller asks for a page."""
+    return 'cursor' in params or 'page_size' in params
@@ -0,0 +1,15 @@
+import redis
+from django.conf import settings
+from .logger import logger
+
+try:
+    redis_client = redis.StrictRedis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=0,
+        socket_timeout=5
+    )
+    redis_client.ping()
+except (redis.ConnectionError, AttributeError) as e:
+    logger.error(f"Redis connection failed: {e}. Falling back to in-process caches only.")
+    redis_client = None
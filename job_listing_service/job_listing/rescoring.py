@@ -0,0 +1,77 @@
+from collections import Counter
+from typing import Dict, Sequence
+from django.conf import settings
+from django.db import transaction
+from .background import CoalescingQueue
+from .events import publish_applications_saved, publishing_enabled
+from .job_vectors import job_vector_cache
+from .logger import logger
+from .matching import job_term_counts, score_term_counts
+from .models import Application, Job
+
+
+def scoring_inputs_changed(previous, current) -> bool:
+    return previous["skills"] != current["skills"] or previous["description"] != current["description"]
+
+
+def rescore_job(job_id) -> int:
+    """Recompute match scores of a job's applications from their stored candidate term counts.
+
+    Applications scored before term counts were stored are skipped until the candidate re-applies
+    or is re-matched. Returns the number of rows whose score changed.
+    """
+    try:
+        job = Job.objects.get(id=job_id)
+    except Job.DoesNotExist:
+        return 0
+    job_counts = job_term_counts(job_vector_cache.get(job))
+    batch_size = settings.JOB_RESCORE_BATCH_SIZE
+
+    applications = Application.objects.filter(job_id=job_id, candidate_features__isnull=False).only('id', 'match_score', 'candidate_features')
+    changed, updated = [], 0
+    for application in applications.iterator(chunk_size=batch_size):
+        score = score_term_counts(job_counts, Counter(application.candidate_features))
+        if score != application.match_score:
+            application.match_score = score
+            changed.append(application)
+        if len(changed) >= batch_size:
+            updated += save_scores(changed, ['match_score'])
+            changed = []
+    if changed:
+        updated += save_scores(changed, ['match_score'])
+    logger.info(f"Re-scored applications for job {job_id}: {updated} scores changed")
+    return updated
+
+
+def store_scores(applications: Sequence[Application], candidate_counts: Dict[str, Counter], scores: Dict[str, float]) -> int:
+    """Save freshly computed scores and the counts behind them on the applications they belong to."""
+    changed = []
+    for application in applications:
+        candidate_id = str(application.candidate_id)
+        if candidate_id not in scores:
+            continue
+        if application.match_score != scores[candidate_id] or application.candidate_features != candidate_counts[candidate_id]:
+            application.match_score = scores[candidate_id]
+            application.candidate_features = candidate_counts[candidate_id]
+            changed.append(application)
+    return save_scores(changed, ['match_score', 'candidate_features'])
+
+
+def save_scores(applications: Sequence[Application], fields) -> int:
+    """Bulk update re-scored applications and tell the candidate dashboards about their new scores."""
+    updated = Application.objects.bulk_update(applications, fields, batch_size=settings.JOB_RESCORE_BATCH_SIZE)
+    if publishing_enabled():
+        application_ids = [application.id for application in applications]
+        transaction.on_commit(lambda: publish_applications_saved(application_ids))
+    return updated
+
+
+_queue = CoalescingQueue("job-rescore", rescore_job)
+
+
+def enqueue_rescore(job_id):
+    """Re-score in the background; saves of a job that is already waiting are folded into one run."""
+    if not settings.JOB_RESCORE_ASYNC:
+        rescore_job(job_id)
+        return
+    _queue.submit(job_id)
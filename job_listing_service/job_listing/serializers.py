@@ -1,21 +1,34 @@
 from rest_framework import serializers
 from .models import Company, Job, Application
 
+class FieldsMixin:
+    """Serializes only the fields named in `fields`, when given."""
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = ['id', 'name', 'tenant_id', 'created_at']
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(FieldsMixin, serializers.ModelSerializer):
     company = CompanySerializer(read_only=True)
 
     class Meta:
         model = Job
         fields = ['id', 'company', 'title', 'description', 'location', 'salary_range', 'key_skills', 'created_at', 'updated_at']
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class ApplicationSerializer(FieldsMixin, serializers.ModelSerializer):
     job = JobSerializer(read_only=True)
 
     class Meta:
         model = Application
-        fields = ['id', 'job', 'candidate_id', 'status', 'applied_at', 'updated_at', 'match_score']
\ No newline at end of file
+        fields = ['id', 'job', 'candidate_id', 'status', 'applied_at', 'updated_at', 'match_score']
+
+class RankedApplicationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Application
+        fields = ['id', 'candidate_id', 'status', 'applied_at', 'match_score']
@@ -0,0 +1,68 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .events import application_event, bump_jobs_version, publish_application_events, publishing_enabled
+from .job_index import enqueue_index_rebuild, index_dir
+from .job_vectors import job_vector_cache
+from .models import Application, Job
+from .rescoring import enqueue_rescore, scoring_inputs_changed
+
+
+@receiver(post_save, sender=Job)
+def refresh_job_vectors(sender, instance, created, **kwargs):
+    previous = job_vector_cache.peek(instance.id)
+    # Overwrites the shared entry so the candidate service never scores against an old version
+    current = job_vector_cache.refresh(instance)
+    if not created and (previous is None or scoring_inputs_changed(previous, current)):
+        job_id = instance.id
+        transaction.on_commit(lambda: enqueue_rescore(job_id))
+    refresh_job_index(instance)
+    publish_jobs_version(instance)
+
+
+@receiver(post_delete, sender=Job)
+def drop_job_vectors(sender, instance, **kwargs):
+    job_vector_cache.invalidate(instance.id)
+    refresh_job_index(instance)
+    publish_jobs_version(instance)
+
+
+def refresh_job_index(job):
+    # Tenants that never asked for recommendations get their index built on first use instead
+    tenant_id = job.company.tenant_id
+    if (index_dir(tenant_id) / "index.joblib").exists():
+        transaction.on_commit(lambda: enqueue_index_rebuild(tenant_id))
+
+
+def publish_jobs_version(job):
+    # Cached recommendations in the candidate service are served stale and refreshed after this
+    if not publishing_enabled():
+        return
+    tenant_id = job.company.tenant_id
+    transaction.on_commit(lambda: bump_jobs_version(tenant_id))
+
+
+@receiver(post_save, sender=Application)
+def publish_application_saved(sender, instance, **kwargs):
+    if not publishing_enabled():
+        return
+    # Built now so the event carries this transaction's view of the application
+    event = application_event(instance)
+    transaction.on_commit(lambda: publish_application_events([event]))
+
+
+@receiver(post_delete, sender=Application)
+def publish_application_deleted(sender, instance, **kwargs):
+    if not publishing_enabled():
+        return
+    event = application_event(instance, deleted=True)
+    transaction.on_commit(lambda: publish_application_events([event]))
+
+
+def create_trigram_extension(sender, using, **kwargs):
+    # Job.title's trigram index needs pg_trgm; created before migrate builds any index
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
@@ -1,3 +1,392 @@
-from django.test import TestCase
+from collections import Counter
+from django.test import TestCase, SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from types import SimpleNamespace
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from unittest import mock
+from . import candidates
+from .candidates import fetch_candidate_profile, fetch_candidate_profiles
+from .events import ALL_TENANTS, APPLICATION_DELETED, APPLICATION_SAVED, bump_jobs_version, jobs_version_key
+from .job_vectors import job_vector_cache, pairwise_tfidf_cosine, pairwise_tfidf_cosines, term_counts
+from .matching import calculate_match_score, candidate_term_counts, rank_candidates
+from .models import Application, Company, Job
+from .rescoring import rescore_job
+from .signals import create_trigram_extension
+from .views import ApplyForJobView, ListApplicationsView, ListJobsView, RankedApplicationsView, RecommendJobsView, SearchJobsView
+from .job_index import build_index, index_dir, job_index_store, save_index
+import joblib
+import json
+import numpy as np
+import tempfile
+import threading
+import uuid
 
-# Create your tests here.
+class PairwiseTfidfTestCase(SimpleTestCase):
+    def test_matches_two_document_vectorizer(self):
+        pairs = [
+            ("Python Django REST APIs backend services", "Senior backend engineer, Python and Django, REST APIs"),
+            ("Kubernetes Terraform AWS", "Frontend developer React TypeScript"),
+            ("data data data pipelines Spark", "Spark data engineer building pipelines"),
+        ]
+        for job_text, candidate_text in pairs:
+            matrix = TfidfVectorizer(stop_words="english", max_features=5000).fit_transform([job_text, candidate_text])
+            expected = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
+            self.assertAlmostEqual(pairwise_tfidf_cosine(term_counts(job_text), term_counts(candidate_text)), expected)
+
+    def test_vectorized_matches_pairwise(self):
+        job = term_counts("Python Django REST APIs backend services python")
+        candidates = [term_counts(text) for text in [
+            "Senior backend engineer, Python and Django, REST APIs", "Frontend developer React TypeScript", "", "python python django",
+        ]]
+        expected = [pairwise_tfidf_cosine(job, candidate) for candidate in candidates]
+        for score, want in zip(pairwise_tfidf_cosines(job, candidates), expected):
+            self.assertAlmostEqual(score, want)
+        truncated = pairwise_tfidf_cosines(job, candidates, max_features=3)
+        self.assertAlmostEqual(truncated[0], pairwise_tfidf_cosine(job, candidates[0], max_features=3))
+
+@override_settings(CANDIDATE_BATCH_SIZE=2, SERVICE_TOKEN="service-secret")
+class CandidateBatchFetchTestCase(SimpleTestCase):
+    def test_fetches_in_chunks_and_skips_failed_chunks(self):
+        ok = mock.Mock(status_code=200, json=lambda: {"candidates": [{"id": "a", "skills": ["Python"]}, {"id": "b", "skills": []}]})
+        failed = mock.Mock(status_code=503, text="unavailable")
+        with mock.patch("job_listing.candidates.session.post", side_effect=[ok, failed]) as post:
+            profiles = fetch_candidate_profiles(["a", "b", "a", "c"], {})
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(post.call_args_list[1].kwargs["json"], {"ids": ["c"]})
+        self.assertEqual(post.call_args_list[0].kwargs["headers"], {"X-Service-Token": "service-secret"})
+        self.assertEqual(sorted(profiles), ["a", "b"])
+
+    def test_profile_is_revalidated_with_etag(self):
+        profile = {"id": "a", "first_name": "Jane"}
+        fresh = mock.Mock(status_code=200, json=lambda: profile, headers={"ETag": '"v1"'})
+        unchanged = mock.Mock(status_code=304, headers={"ETag": '"v1"'})
+        self.addCleanup(candidates._profiles.clear)
+        with mock.patch("job_listing.candidates.session.get", side_effect=[fresh, unchanged]) as get:
+            self.assertEqual(fetch_candidate_profile("a", {"Authorization": "Bearer t"}), profile)
+            self.assertEqual(fetch_candidate_profile("a", {"Authorization": "Bearer t"}), profile)
+        self.assertNotIn("If-None-Match", get.call_args_list[0].kwargs["headers"])
+        self.assertEqual(get.call_args_list[1].kwargs["headers"], {"Authorization": "Bearer t", "If-None-Match": '"v1"'})
+
+class JobVectorCacheTestCase(TestCase):
+    def setUp(self):
+        job_vector_cache.clear()
+        company = Company.objects.create(name="Acme", tenant_id=uuid.uuid4())
+        self.job = Job.objects.create(company=company, title="Backend Engineer", description="Build Django APIs", key_skills=["Python"])
+
+    def test_save_refreshes_cached_features(self):
+        self.assertEqual(job_vector_cache.get(self.job)["description"], term_counts("Build Django APIs"))
+        self.job.description = "Operate Kubernetes clusters"
+        self.job.save()
+        features = job_vector_cache.get(self.job)
+        self.assertEqual(features["description"], term_counts("Operate Kubernetes clusters"))
+
+    def test_cached_score_matches_uncached(self):
+        args = (self.job.key_skills, ["Python", "Django"], self.job.description, "John Doe B.Tech")
+        self.assertEqual(calculate_match_score(*args), calculate_match_score(*args, job_features=job_vector_cache.get(self.job)))
+
+@override_settings(JOB_RESCORE_ASYNC=False)
+class RescoreApplicationsTestCase(TestCase):
+    def setUp(self):
+        job_vector_cache.clear()
+        company = Company.objects.create(name="Acme", tenant_id=uuid.uuid4())
+        self.job = Job.objects.create(company=company, title="Backend Engineer", description="Build Django APIs", key_skills=["Python"])
+        self.skills, self.profile = ["Kubernetes", "Terraform"], "Operate Kubernetes clusters on AWS"
+        counts = candidate_term_counts(self.skills, self.profile)
+        score = calculate_match_score(self.job.key_skills, self.skills, self.job.description, self.profile)
+        self.application = Application.objects.create(job=self.job, candidate_id=uuid.uuid4(), match_score=score, candidate_features=counts)
+        self.legacy = Application.objects.create(job=self.job, candidate_id=uuid.uuid4(), match_score=42.0)
+
+    def test_editing_job_rescores_stored_applications(self):
+        self.job.description = "Operate Kubernetes clusters"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        self.application.refresh_from_db()
+        expected = calculate_match_score(self.job.key_skills, self.skills, self.job.description, self.profile)
+        self.assertGreater(expected, 0)
+        self.assertEqual(self.application.match_score, expected)
+        self.legacy.refresh_from_db()
+        self.assertEqual(self.legacy.match_score, 42.0)
+
+    def test_rescored_applications_are_published(self):
+        self.job.description = "Operate Kubernetes clusters"
+        with mock.patch("job_listing.rescoring.publishing_enabled", return_value=True), \
+                mock.patch("job_listing.events.publishing_enabled", return_value=True), \
+                mock.patch("job_listing.events.publish_application_events") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.job.save()
+        events = publish.call_args.args[0]
+        self.assertEqual([event["application_id"] for event in events], [str(self.application.id)])
+        self.application.refresh_from_db()
+        self.assertEqual(json.loads(events[0]["data"])["match_score"], self.application.match_score)
+
+    def test_unrelated_edit_does_not_rescore(self):
+        job_vector_cache.get(self.job)
+        self.job.title = "Platform Engineer"
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.job.save()
+        self.assertEqual(callbacks, [])
+
+    def test_rescore_is_idempotent(self):
+        self.assertEqual(rescore_job(self.job.id), 0)
+        self.assertEqual(Counter(Application.objects.get(id=self.application.id).candidate_features), candidate_term_counts(self.skills, self.profile))
+
+class RankCandidatesTestCase(TestCase):
+    def setUp(self):
+        job_vector_cache.clear()
+        company = Company.objects.create(name="Acme", tenant_id=uuid.uuid4())
+        self.job = Job.objects.create(company=company, title="Backend Engineer", description="Build Django REST APIs", key_skills=["Python", "Django"])
+        self.profiles = {
+            "django": (["Python", "Django"], "Jane Doe B.Tech"),
+            "frontend": (["React"], "Max Roe B.Sc"),
+            "python": (["Python"], "Ann Poe M.Sc"),
+            "none": ([], ""),
+        }
+        self.candidates = {candidate_id: candidate_term_counts(*profile) for candidate_id, profile in self.profiles.items()}
+
+    def test_scores_match_pairwise_scale(self):
+        ranked = rank_candidates(self.job, self.candidates)
+        self.assertEqual([match["candidate_id"] for match in ranked][:2], ["django", "python"])
+        for match in ranked:
+            skills, text = self.profiles[match["candidate_id"]]
+            self.assertEqual(match["match_score"], calculate_match_score(self.job.key_skills, skills, self.job.description, text))
+
+    def test_top_k(self):
+        full = rank_candidates(self.job, self.candidates)
+        self.assertEqual(rank_candidates(self.job, self.candidates, k=2), full[:2])
+        self.assertEqual(rank_candidates(self.job, self.candidates, k=0), [])
+        self.assertEqual(rank_candidates(self.job, {}, k=5), [])
+
+def call_view(view, tenant_id, method='get', path='/', data=None, **kwargs):
+    request = getattr(APIRequestFactory(), method)(path, data, format='json' if method != 'get' else None)
+    request.user_id, request.tenant_id = uuid.uuid4(), tenant_id
+    force_authenticate(request, user=SimpleNamespace(is_authenticated=True, pk=request.user_id))
+    return view.as_view()(request, **kwargs)
+
+class RankedApplicationsTestCase(TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        company = Company.objects.create(name="Acme", tenant_id=self.tenant_id)
+        self.job = Job.objects.create(company=company, title="Backend Engineer", description="Build Django APIs", key_skills=["Python"])
+        scores = [90.0, 75.5, 75.5, 40.0, 10.0]
+        self.applications = [
+            Application.objects.create(job=self.job, candidate_id=uuid.uuid4(), match_score=score, status='shortlisted' if i % 2 else 'applied')
+            for i, score in enumerate(scores)
+        ]
+        Application.objects.create(job=self.job, candidate_id=uuid.uuid4())
+
+    def ranked(self, **params):
+        return call_view(RankedApplicationsView, self.tenant_id, path='/', data=params, job_id=self.job.id)
+
+    def test_pages_follow_score_order(self):
+        seen, cursor = [], None
+        while True:
+            response = self.ranked(page_size=2, **({"cursor": cursor} if cursor else {}))
+            self.assertEqual(response.status_code, 200)
+            seen += [row["match_score"] for row in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [90.0, 75.5, 75.5, 40.0, 10.0])
+
+    def test_filters(self):
+        response = self.ranked(status='shortlisted', min_score=50)
+        self.assertEqual([row["match_score"] for row in response.data["results"]], [75.5])
+        self.assertEqual(self.ranked(cursor="garbage").status_code, 400)
+
+    def test_apply_stores_score_and_features(self):
+        profile = {"first_name": "Jane", "last_name": "Doe", "skills": [{"skill_name": "Python"}], "education": [{"degree": "B.Tech"}]}
+        with mock.patch("job_listing.candidates.session.get", return_value=mock.Mock(status_code=200, json=lambda: profile, headers={})):
+            response = call_view(ApplyForJobView, self.tenant_id, method='post', data={}, job_id=self.job.id)
+        self.assertEqual(response.status_code, 201)
+        application = Application.objects.get(id=response.data["application_id"])
+        self.assertEqual(application.job_id, self.job.id)
+        self.assertEqual(application.match_score, response.data["match_score"])
+        self.assertEqual(Counter(application.candidate_features), candidate_term_counts(["Python"], "Jane Doe B.Tech"))
+
+class JobIndexTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(JOB_INDEX_DIR=self.directory.name, JOB_INDEX_ASYNC=False)
+        self.settings_override.enable()
+        job_index_store.clear()
+        self.tenant_id = uuid.uuid4()
+        self.company = Company.objects.create(name="Acme", tenant_id=self.tenant_id)
+        for title, skills in [("Backend Engineer", ["Python", "Django"]), ("Frontend Engineer", ["React", "TypeScript"]),
+                              ("Data Engineer", ["Spark", "Kafka", "Python"]), ("DevOps Engineer", ["Kubernetes", "Terraform"])]:
+            Job.objects.create(company=self.company, title=title, description=f"{title} role", key_skills=skills)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def test_recommend_ranks_by_similarity(self):
+        response = call_view(RecommendJobsView, self.tenant_id, data={"candidate_id": str(uuid.uuid4()), "skills": ["React", "TypeScript"], "k": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]["title"], "Frontend Engineer")
+        self.assertGreaterEqual(response.data[0]["similarity"], response.data[1]["similarity"])
+
+    def test_job_edits_rebuild_existing_index(self):
+        self.assertEqual(len(job_index_store.get(self.tenant_id)), 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(company=self.company, title="Mobile Engineer", description="iOS", key_skills=["Swift"])
+        self.assertEqual(len(job_index_store.get(self.tenant_id)), 5)
+        hits = job_index_store.get(self.tenant_id).search("Swift", 1)
+        self.assertEqual(Job.objects.get(id=hits[0][0]).title, "Mobile Engineer")
+
+    def test_first_request_queues_build_and_falls_back_to_search(self):
+        with override_settings(JOB_INDEX_ASYNC=True), mock.patch("job_listing.job_index._queue.submit") as submit:
+            response = call_view(RecommendJobsView, self.tenant_id, data={"candidate_id": str(uuid.uuid4()), "skills": ["Kubernetes"], "k": 2})
+        submit.assert_called_once_with(self.tenant_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job["title"] for job in response.data], ["DevOps Engineer"])
+        self.assertFalse((index_dir(self.tenant_id) / "index.joblib").exists())
+
+    def test_concurrent_saves_keep_the_embeddings_in_use(self):
+        index = build_index(self.tenant_id)
+        threads = [threading.Thread(target=save_index, args=(self.tenant_id, index)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        meta = joblib.load(index_dir(self.tenant_id) / "index.joblib")
+        self.assertEqual([path.name for path in index_dir(self.tenant_id).glob("embeddings-*.npy")], [meta["embeddings"]])
+        self.assertEqual(len(job_index_store.get(self.tenant_id)), 4)
+
+    def test_lsh_finds_close_neighbour_without_full_scan(self):
+        rng = np.random.default_rng(1)
+        index = build_index(self.tenant_id)
+        index.embeddings = rng.standard_normal((2000, 16)).astype(np.float32)
+        index.embeddings /= np.linalg.norm(index.embeddings, axis=1, keepdims=True)
+        index.ids = [str(i) for i in range(2000)]
+        query = index.embeddings[7] + 0.01 * rng.standard_normal(16).astype(np.float32)
+        with mock.patch.object(index, "embed", return_value=query):
+            self.assertEqual(index.search("", 1, "lsh"), index.search("", 1, "exact"))
+        self.assertLess(len(index._lsh_candidates(query)), len(index.ids))
+
+class ListViewsTestCase(TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        company = Company.objects.create(name="Acme", tenant_id=self.tenant_id)
+        self.jobs = [Job.objects.create(company=company, title=f"Job {i}", description="Build things", key_skills=["Python"]) for i in range(3)]
+        self.candidate_id = uuid.uuid4()
+        for job in self.jobs:
+            Application.objects.create(job=job, candidate_id=self.candidate_id)
+        Application.objects.create(job=self.jobs[0], candidate_id=uuid.uuid4(), status='shortlisted')
+
+    def list_applications(self, **params):
+        return call_view(ListApplicationsView, self.tenant_id, data=params)
+
+    def test_unpaginated_list_is_unchanged(self):
+        response = self.list_applications()
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(response.data[0]["job"]["company"]["name"], "Acme")
+
+    def test_filters_and_projection(self):
+        response = self.list_applications(candidate_id=str(self.candidate_id), fields="id,status")
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(set(response.data[0]), {"id", "status"})
+        self.assertEqual(len(self.list_applications(status="shortlisted").data), 1)
+        self.assertEqual(len(self.list_applications(applied_after="2999-01-01T00:00:00Z").data), 0)
+        self.assertEqual(self.list_applications(fields="id,secret").status_code, 400)
+        self.assertEqual(self.list_applications(applied_after="yesterday").status_code, 400)
+        self.assertEqual(self.list_applications(candidate_id="nope").status_code, 400)
+
+    def test_keyset_pages_cover_everything_once(self):
+        seen, cursor = [], None
+        while True:
+            response = call_view(ListJobsView, self.tenant_id, data={"page_size": 2, "fields": "id", **({"cursor": cursor} if cursor else {})})
+            seen += [row["id"] for row in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(str(job.id) for job in self.jobs))
+
+    def test_projection_skips_joins(self):
+        with self.assertNumQueries(1):
+            self.list_applications(fields="id,candidate_id,status")
+
+class TrigramExtensionTestCase(SimpleTestCase):
+    def test_created_on_postgres_before_migrating(self):
+        connection = mock.MagicMock(vendor="postgresql")
+        with mock.patch("job_listing.signals.connections", {"default": connection}):
+            create_trigram_extension(sender=None, using="default")
+        connection.cursor().__enter__().execute.assert_called_once_with("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    def test_skipped_on_other_databases(self):
+        connection = mock.MagicMock(vendor="sqlite")
+        with mock.patch("job_listing.signals.connections", {"default": connection}):
+            create_trigram_extension(sender=None, using="default")
+        connection.cursor.assert_not_called()
+
+class SearchJobsTestCase(TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        company = Company.objects.create(name="Acme", tenant_id=self.tenant_id)
+        Job.objects.create(company=company, title="Backend Engineer", description="Design REST services", key_skills=["Python", "Django"])
+        Job.objects.create(company=company, title="Data Analyst", description="Dashboards for the backend team", key_skills=["SQL"])
+        Job.objects.create(company=company, title="Designer", description="Product design", key_skills=["Figma"])
+        other = Company.objects.create(name="Other", tenant_id=uuid.uuid4())
+        Job.objects.create(company=other, title="Backend Engineer", description="Elsewhere", key_skills=["Go"])
+
+    def search(self, **params):
+        return call_view(SearchJobsView, self.tenant_id, data=params)
+
+    def test_title_matches_rank_first(self):
+        response = self.search(q="backend")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job["title"] for job in response.data], ["Backend Engineer", "Data Analyst"])
+
+    def test_skills_and_stemming(self):
+        self.assertEqual([job["title"] for job in self.search(q="django").data], ["Backend Engineer"])
+        self.assertEqual([job["title"] for job in self.search(q="designing").data][0], "Designer")
+
+    def test_fuzzy_title(self):
+        self.assertIn("Designer", [job["title"] for job in self.search(q="Desinger").data])
+
+class ApplicationEventsTestCase(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name="Acme", tenant_id=uuid.uuid4())
+        self.job = Job.objects.create(company=company, title="Backend Engineer", description="Build Django APIs", key_skills=["Python"])
+
+    def test_saves_and_deletes_are_published_after_commit(self):
+        with mock.patch("job_listing.signals.publishing_enabled", return_value=True), \
+                mock.patch("job_listing.signals.publish_application_events") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                application = Application.objects.create(job=self.job, candidate_id=uuid.uuid4())
+                self.assertFalse(publish.called)
+            with self.captureOnCommitCallbacks(execute=True):
+                application_id = application.id
+                application.delete()
+
+        saved, deleted = [call.args[0][0] for call in publish.call_args_list]
+        self.assertEqual(saved["type"], APPLICATION_SAVED)
+        self.assertEqual(saved["candidate_id"], str(application.candidate_id))
+        data = json.loads(saved["data"])
+        self.assertEqual((data["id"], data["status"], data["job"]["title"]), (str(application_id), "applied", "Backend Engineer"))
+        self.assertEqual((deleted["type"], deleted["application_id"]), (APPLICATION_DELETED, str(application_id)))
+        self.assertNotIn("data", deleted)
+
+    def test_nothing_is_built_without_redis(self):
+        with mock.patch("job_listing.signals.application_event") as build:
+            Application.objects.create(job=self.job, candidate_id=uuid.uuid4())
+        self.assertFalse(build.called)
+
+class JobsVersionTestCase(TestCase):
+    def test_job_changes_bump_the_tenant_jobs_version_after_commit(self):
+        company = Company.objects.create(name="Acme", tenant_id=uuid.uuid4())
+        with mock.patch("job_listing.signals.publishing_enabled", return_value=True), \
+                mock.patch("job_listing.signals.bump_jobs_version") as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                job = Job.objects.create(company=company, title="Backend Engineer", description="Build Django APIs", key_skills=["Python"])
+                self.assertFalse(bump.called)
+            with self.captureOnCommitCallbacks(execute=True):
+                job.delete()
+        self.assertEqual([call.args for call in bump.call_args_list], [(company.tenant_id,), (company.tenant_id,)])
+
+    def test_bump_covers_tenant_and_all_tenants(self):
+        client = mock.Mock()
+        with mock.patch("job_listing.events.redis_client", client):
+            bump_jobs_version("t1")
+        client.pipeline.return_value.incr.assert_has_calls([mock.call(jobs_version_key("t1")), mock.call(jobs_version_key(ALL_TENANTS))])
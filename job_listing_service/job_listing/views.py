@@ -2,11 +2,70 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .models import Company, Job, Application
-from .serializers import CompanySerializer, JobSerializer, ApplicationSerializer
+from .serializers import CompanySerializer, JobSerializer, ApplicationSerializer, RankedApplicationSerializer
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
 from .logger import logger
 from audit.models import AuditLog
-from .matching import calculate_match_score
-import requests
+from .matching import calculate_match_score, candidate_term_counts, job_term_counts, score_term_counts_many, top_matches
+from .pagination import InvalidCursor, keyset_page, paginate_requested
+from .rescoring import store_scores
+from .candidates import auth_headers, candidate_text, fetch_candidate_profile, fetch_candidate_profiles
+from .job_vectors import job_vector_cache
+from .job_index import SEARCH_MODES, job_index_store
+
+class InvalidQuery(ValueError):
+    pass
+
+def timestamp_param(params, name):
+    value = params.get(name)
+    if value is None:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise InvalidQuery(f"{name} must be an ISO 8601 datetime")
+    return parsed
+
+def fields_param(params, serializer_class):
+    if not params.get('fields'):
+        return None
+    fields = params.get('fields').split(',')
+    unknown = set(fields) - set(serializer_class.Meta.fields)
+    if unknown:
+        raise InvalidQuery(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+def page_size_param(params):
+    try:
+        page_size = int(params.get('page_size', settings.LIST_PAGE_SIZE))
+    except ValueError:
+        raise InvalidQuery("page_size must be an integer")
+    if page_size < 1:
+        raise InvalidQuery("page_size must be positive")
+    return min(page_size, settings.LIST_MAX_PAGE_SIZE)
+
+def list_response(request, queryset, ordering, serializer_class, fields):
+    """The whole list, or one keyset page of it as `{results, next_cursor}` when the caller asks for pages."""
+    if not paginate_requested(request.query_params):
+        return Response(serializer_class(queryset.order_by(*ordering), many=True, fields=fields).data, status=status.HTTP_200_OK)
+    rows, next_cursor = keyset_page(queryset, ordering, request.query_params.get('cursor'), page_size_param(request.query_params))
+    return Response({"results": serializer_class(rows, many=True, fields=fields).data, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
+
+def search_recommendations(tenant_id, skills, k):
+    """The `k` tenant jobs mentioning most of `skills`, by full-text rank, for tenants whose index is not built yet."""
+    if not skills:
+        return []
+    query = SearchQuery(" or ".join(f'"{skill}"' for skill in skills), config='english', search_type='websearch')
+    jobs = (
+        Job.objects.filter(company__tenant_id=tenant_id, search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .select_related('company')
+        .order_by('-rank', 'id')[:k]
+    )
+    return [{**JobSerializer(job).data, "similarity": round(job.rank, 4)} for job in jobs]
 
 class CreateCompanyView(APIView):
     def post(self, request):
@@ -68,11 +127,25 @@ class GetJobView(APIView):
 class ListJobsView(APIView):
     def get(self, request):
         try:
+            params = request.query_params
+            fields = fields_param(params, JobSerializer)
             jobs = Job.objects.filter(company__tenant_id=request.tenant_id)
-            serializer = JobSerializer(jobs, many=True)
+            if fields is None or 'company' in fields:
+                jobs = jobs.select_related('company')
+            if params.get('company_id'):
+                jobs = jobs.filter(company_id=params.get('company_id'))
+            updated_after = timestamp_param(params, 'updated_after')
+            if updated_after:
+                jobs = jobs.filter(updated_at__gte=updated_after)
+
+            response = list_response(request, jobs, ['-created_at', 'id'], JobSerializer, fields)
             request.audit_action = "List Jobs"
             request.audit_details = {"tenant_id": str(request.tenant_id)}
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return response
+        except (InvalidQuery, InvalidCursor) as e:
+            return Response({"error": "Invalid request", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({"error": "Invalid request", "details": e.messages}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Job listing failed: {e}")
             return Response({"error": "Listing failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -86,19 +159,16 @@ class ApplyForJobView(APIView):
             data['candidate_id'] = request.user_id
             
             # Fetch candidate profile for matching
-            profile_response = requests.get(
-                f"http://candidate-profile-service/candidates/{request.user_id}/",
-                headers={"Authorization": f"Bearer {request.headers.get('Authorization', '').replace('Bearer ', '')}"}
-            )
-            if profile_response.status_code != 200:
-                logger.warning(f"Failed to fetch candidate profile: {profile_response.text}")
+            candidate_profile = fetch_candidate_profile(request.user_id, auth_headers(request))
+            if candidate_profile is None:
                 return Response({"error": "Profile fetch failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-            candidate_profile = profile_response.json()
+
             candidate_skills = [skill['skill_name'] for skill in candidate_profile.get('skills', [])]
             candidate_text = " ".join([candidate_profile.get('first_name', ''), candidate_profile.get('last_name', ''),
                                       " ".join([edu['degree'] for edu in candidate_profile.get('education', [])])])
-            match_score = calculate_match_score(job.key_skills, candidate_skills, job.description, candidate_text)
+            candidate_counts = candidate_term_counts(candidate_skills, candidate_text)
+            match_score = calculate_match_score(job.key_skills, candidate_skills, job.description, candidate_text,
+                                                job_features=job_vector_cache.get(job), candidate_counts=candidate_counts)
             data['match_score'] = match_score
 
             serializer = ApplicationSerializer(data=data)
@@ -106,7 +176,7 @@ class ApplyForJobView(APIView):
                 logger.warning(f"Application validation failed: {serializer.errors}")
                 return Response({"error": "Validation failed", "details": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-            application = serializer.save()
+            application = serializer.save(job=job, candidate_features=candidate_counts)
             request.audit_action = "Apply for Job"
             request.audit_details = {"application_id": str(application.id), "job_id": str(job_id)}
             logger.info(f"Application created: {application.id}")
@@ -121,11 +191,32 @@ class ApplyForJobView(APIView):
 class ListApplicationsView(APIView):
     def get(self, request):
         try:
+            params = request.query_params
+            fields = fields_param(params, ApplicationSerializer)
             applications = Application.objects.filter(job__company__tenant_id=request.tenant_id)
-            serializer = ApplicationSerializer(applications, many=True)
+            if fields is None or 'job' in fields:
+                applications = applications.select_related('job__company')
+            if params.get('candidate_id'):
+                applications = applications.filter(candidate_id=params.get('candidate_id'))
+            if params.get('job_id'):
+                applications = applications.filter(job_id=params.get('job_id'))
+            if params.get('status'):
+                applications = applications.filter(status__in=params.get('status').split(','))
+            applied_after = timestamp_param(params, 'applied_after')
+            if applied_after:
+                applications = applications.filter(applied_at__gte=applied_after)
+            updated_after = timestamp_param(params, 'updated_after')
+            if updated_after:
+                applications = applications.filter(updated_at__gte=updated_after)
+
+            response = list_response(request, applications, ['-applied_at', 'id'], ApplicationSerializer, fields)
             request.audit_action = "List Applications"
             request.audit_details = {"tenant_id": str(request.tenant_id)}
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return response
+        except (InvalidQuery, InvalidCursor) as e:
+            return Response({"error": "Invalid request", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({"error": "Invalid request", "details": e.messages}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Application listing failed: {e}")
             return Response({"error": "Listing failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -154,24 +245,25 @@ class UpdateApplicationStatusView(APIView):
 class GetMatchingCandidatesView(APIView):
     def get(self, request, job_id):
         try:
+            k = request.query_params.get('k')
+            if k is not None:
+                if not k.isdigit():
+                    return Response({"error": "Invalid request", "details": "k must be a non-negative integer"}, status=status.HTTP_400_BAD_REQUEST)
+                k = int(k)
             job = Job.objects.get(id=job_id, company__tenant_id=request.tenant_id)
-            applications = Application.objects.filter(job=job)
-            matches = []
-
-            for app in applications:
-                profile_response = requests.get(
-                    f"http://candidate-profile-service/candidates/{app.candidate_id}/",
-                    headers={"Authorization": f"Bearer {request.headers.get('Authorization', '').replace('Bearer ', '')}"}
-                )
-                if profile_response.status_code == 200:
-                    candidate_profile = profile_response.json()
-                    candidate_skills = [skill['skill_name'] for skill in candidate_profile.get('skills', [])]
-                    candidate_text = " ".join([candidate_profile.get('first_name', ''), candidate_profile.get('last_name', ''),
-                                              " ".join([edu['degree'] for edu in candidate_profile.get('education', [])])])
-                    match_score = calculate_match_score(job.key_skills, candidate_skills, job.description, candidate_text)
-                    matches.append({"candidate_id": str(app.candidate_id), "match_score": match_score})
-
-            matches.sort(key=lambda x: x['match_score'], reverse=True)
+            applications = list(Application.objects.filter(job=job).only('id', 'candidate_id', 'match_score', 'candidate_features'))
+            profiles = fetch_candidate_profiles([app.candidate_id for app in applications], auth_headers(request))
+
+            candidate_ids = list(profiles)
+            candidate_counts = {
+                candidate_id: candidate_term_counts(profiles[candidate_id].get('skills', []), candidate_text(profiles[candidate_id]))
+                for candidate_id in candidate_ids
+            }
+            scores = score_term_counts_many(job_term_counts(job_vector_cache.get(job)), [candidate_counts[i] for i in candidate_ids])
+            # Profiles may have changed since the candidates applied; keep the stored ranking current
+            store_scores(applications, candidate_counts, dict(zip(candidate_ids, scores.tolist())))
+            matches = top_matches(candidate_ids, scores, k)
+
             request.audit_action = "Get Matching Candidates"
             request.audit_details = {"job_id": str(job_id)}
             return Response(matches, status=status.HTTP_200_OK)
@@ -180,4 +272,121 @@ class GetMatchingCandidatesView(APIView):
             return Response({"error": "Not found", "details": "Job does not exist"}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.error(f"Matching candidates retrieval failed: {e}")
-            return Response({"error": "Retrieval failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": "Retrieval failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class RankedApplicationsView(APIView):
+    """A job's applications by stored match score, best first, in keyset pages."""
+    ordering = ['-match_score', 'id']
+
+    def get(self, request, job_id):
+        try:
+            params = request.query_params
+            try:
+                page_size = min(int(params.get('page_size', settings.RANKED_APPLICATIONS_PAGE_SIZE)), settings.RANKED_APPLICATIONS_MAX_PAGE_SIZE)
+                min_score = float(params['min_score']) if 'min_score' in params else None
+            except ValueError:
+                return Response({"error": "Invalid request", "details": "page_size and min_score must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+            if page_size < 1:
+                return Response({"error": "Invalid request", "details": "page_size must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+            job = Job.objects.get(id=job_id, company__tenant_id=request.tenant_id)
+            applications = Application.objects.filter(job=job, match_score__isnull=False).only('id', 'candidate_id', 'status', 'applied_at', 'match_score')
+            if params.get('status'):
+                applications = applications.filter(status__in=params.get('status').split(','))
+            if min_score is not None:
+                applications = applications.filter(match_score__gte=min_score)
+
+            rows, next_cursor = keyset_page(applications, self.ordering, params.get('cursor'), page_size)
+            request.audit_action = "List Ranked Applications"
+            request.audit_details = {"job_id": str(job_id)}
+            return Response({"results": RankedApplicationSerializer(rows, many=True).data, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
+        except InvalidCursor as e:
+            return Response({"error": "Invalid request", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Job.DoesNotExist:
+            logger.warning(f"Job not found: {job_id}")
+            return Response({"error": "Not found", "details": "Job does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"Ranked applications retrieval failed: {e}")
+            return Response({"error": "Retrieval failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class RecommendJobsView(APIView):
+    """The tenant's jobs most similar to a candidate, from the job embedding index."""
+    def get(self, request):
+        try:
+            params = request.query_params
+            candidate_id = params.get('candidate_id')
+            if not candidate_id:
+                return Response({"error": "Candidate ID required"}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                k = min(int(params.get('k', settings.JOB_RECOMMEND_K)), settings.JOB_RECOMMEND_MAX_K)
+            except ValueError:
+                return Response({"error": "Invalid request", "details": "k must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+            mode = params.get('mode', settings.JOB_INDEX_SEARCH_MODE)
+            if mode not in SEARCH_MODES:
+                return Response({"error": "Invalid request", "details": f"mode must be one of {', '.join(SEARCH_MODES)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Callers that already hold the candidate's skills pass them to skip the profile round trip
+            skills = params.getlist('skills')
+            if not skills:
+                profile = fetch_candidate_profiles([candidate_id], auth_headers(request)).get(str(candidate_id))
+                if profile is None:
+                    logger.warning(f"Candidate not found for recommendations: {candidate_id}")
+                    return Response({"error": "Not found", "details": "Candidate does not exist"}, status=status.HTTP_404_NOT_FOUND)
+                skills = profile.get('skills', [])
+
+            index = job_index_store.get(request.tenant_id)
+            if index is None:
+                # The tenant's first index build is queued; answer from the full-text index meanwhile
+                logger.info(f"Job index for tenant {request.tenant_id} not built yet, recommending from search")
+                results = search_recommendations(request.tenant_id, skills, k)
+            else:
+                hits = index.search(" ".join(skills), k, mode)
+                jobs = Job.objects.filter(id__in=[job_id for job_id, _ in hits], company__tenant_id=request.tenant_id).select_related('company')
+                jobs_by_id = {str(job.id): job for job in jobs}
+
+                results = []
+                for job_id, similarity in hits:
+                    # Jobs deleted since the index was built are skipped until the rebuild lands
+                    if job_id in jobs_by_id:
+                        results.append({**JobSerializer(jobs_by_id[job_id]).data, "similarity": round(similarity, 4)})
+            request.audit_action = "Recommend Jobs"
+            request.audit_details = {"candidate_id": str(candidate_id), "k": k, "source": "search" if index is None else "index"}
+            return Response(results, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Job recommendation failed: {e}")
+            return Response({"error": "Recommendation failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class SearchJobsView(APIView):
+    """Full-text search over the tenant's jobs, with fuzzy title matches for typos."""
+    def get(self, request):
+        try:
+            params = request.query_params
+            q = params.get('q', '').strip()
+            if not q:
+                return Response({"error": "Invalid request", "details": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                limit = min(int(params.get('limit', settings.JOB_SEARCH_LIMIT)), settings.JOB_SEARCH_MAX_LIMIT)
+            except ValueError:
+                return Response({"error": "Invalid request", "details": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+            fields = fields_param(params, JobSerializer)
+
+            query = SearchQuery(q, config='english', search_type='websearch')
+            jobs = (
+                Job.objects.filter(company__tenant_id=request.tenant_id)
+                .filter(Q(search_vector=query) | Q(title__trigram_similar=q))
+                .annotate(rank=SearchRank(F('search_vector'), query), similarity=TrigramSimilarity('title', q))
+                .select_related('company')
+                .order_by('-rank', '-similarity', 'id')[:limit]
+            )
+            results = [
+                {**JobSerializer(job, fields=fields).data, "rank": round(job.rank, 4), "similarity": round(job.similarity, 4)}
+                for job in jobs
+            ]
+            request.audit_action = "Search Jobs"
+            request.audit_details = {"q": q}
+            return Response(results, status=status.HTTP_200_OK)
+        except InvalidQuery as e:
+            return Response({"error": "Invalid request", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Job search failed: {e}")
+            return Response({"error": "Search failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
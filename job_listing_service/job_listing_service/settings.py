@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'job_listing',
     'audit',
@@ -155,4 +156,42 @@ EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS') == 'True'
-RECIPIENT_LIST = os.getenv('RECIPIENT_LIST').split(',')
\ No newline at end of file
+RECIPIENT_LIST = os.getenv('RECIPIENT_LIST').split(',')
+
+JOB_VECTOR_CACHE_MAX_ENTRIES = int(os.getenv('JOB_VECTOR_CACHE_MAX_ENTRIES', 1024))
+JOB_VECTOR_CACHE_TTL = int(os.getenv('JOB_VECTOR_CACHE_TTL', 7 * 24 * 3600))
+
+JOB_RESCORE_ASYNC = os.getenv('JOB_RESCORE_ASYNC', 'True') == 'True'
+JOB_RESCORE_BATCH_SIZE = int(os.getenv('JOB_RESCORE_BATCH_SIZE', 500))
+
+CANDIDATE_PROFILE_SERVICE_URL = os.getenv('CANDIDATE_PROFILE_SERVICE_URL', 'http://candidate-profile-service')
+SERVICE_TOKEN = os.getenv('SERVICE_TOKEN', '')  # sent as X-Service-Token to the candidate service's service-only endpoints
+CANDIDATE_BATCH_SIZE = int(os.getenv('CANDIDATE_BATCH_SIZE', 200))
+CANDIDATE_BATCH_TIMEOUT = float(os.getenv('CANDIDATE_BATCH_TIMEOUT', 10))
+CANDIDATE_PROFILE_CACHE_MAX_ENTRIES = int(os.getenv('CANDIDATE_PROFILE_CACHE_MAX_ENTRIES', 1024))  # profiles kept for If-None-Match revalidation
+
+RANKED_APPLICATIONS_PAGE_SIZE = int(os.getenv('RANKED_APPLICATIONS_PAGE_SIZE', 50))
+RANKED_APPLICATIONS_MAX_PAGE_SIZE = int(os.getenv('RANKED_APPLICATIONS_MAX_PAGE_SIZE', 200))
+
+JOB_INDEX_DIR = os.getenv('JOB_INDEX_DIR', str(BASE_DIR / 'indexes' / 'jobs'))
+JOB_INDEX_ASYNC = os.getenv('JOB_INDEX_ASYNC', 'True') == 'True'
+JOB_INDEX_DIMENSIONS = int(os.getenv('JOB_INDEX_DIMENSIONS', 128))
+JOB_INDEX_MAX_FEATURES = int(os.getenv('JOB_INDEX_MAX_FEATURES', 50000))
+JOB_INDEX_SEARCH_MODE = os.getenv('JOB_INDEX_SEARCH_MODE', 'auto')  # auto | exact | lsh
+JOB_INDEX_EXACT_MAX = int(os.getenv('JOB_INDEX_EXACT_MAX', 50000))  # auto mode scans exactly up to this many jobs
+JOB_INDEX_LSH_TABLES = int(os.getenv('JOB_INDEX_LSH_TABLES', 8))
+JOB_INDEX_LSH_BITS = int(os.getenv('JOB_INDEX_LSH_BITS', 8))
+JOB_INDEX_LSH_SEED = int(os.getenv('JOB_INDEX_LSH_SEED', 0))
+JOB_RECOMMEND_K = int(os.getenv('JOB_RECOMMEND_K', 20))
+JOB_RECOMMEND_MAX_K = int(os.getenv('JOB_RECOMMEND_MAX_K', 200))
+
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', 100))
+LIST_MAX_PAGE_SIZE = int(os.getenv('LIST_MAX_PAGE_SIZE', 500))
+
+JOB_SEARCH_LIMIT = int(os.getenv('JOB_SEARCH_LIMIT', 20))
+JOB_SEARCH_MAX_LIMIT = int(os.getenv('JOB_SEARCH_MAX_LIMIT', 100))
+
+# Application events read by the candidate service's dashboards (job_listing/events.py)
+APPLICATION_EVENTS_STREAM = os.getenv('APPLICATION_EVENTS_STREAM', 'events:applications')
+APPLICATION_EVENTS_MAXLEN = int(os.getenv('APPLICATION_EVENTS_MAXLEN', 100000))  # approximate stream cap
+APPLICATION_EVENTS_BATCH_SIZE = int(os.getenv('APPLICATION_EVENTS_BATCH_SIZE', 500))